@@ -0,0 +1,199 @@
+"""Regression checks for results the caches would otherwise keep wrong for the life of the process.
+
+    python -m benchmarks.checks                 # run every check
+    python -m benchmarks.checks -k calendar     # names containing "calendar"
+
+Each check raises AssertionError with what differed; the run exits with
+status 1 when any check fails.
+"""
+import argparse
+import sys
+import traceback
+from dataclasses import replace
+from datetime import date
+from functools import partial
+
+
+# ===== Checks =====
+def check_calendar_year_boundary():
+    # Holidays observed in the neighbouring year (US New Year 2033 falls on
+    # Sat 2033-01-01 and is observed Fri 2032-12-31) must be known on a fresh
+    # calendar whose window ends on Dec 31, not only after a later call widens it.
+    from utils.date import add_workdays, expand_holidays, holidays_for_year
+    from utils.workdays import WorkdayCalendar
+
+    reference = expand_holidays("United States", range(2020, 2046))
+    for year in range(2026, 2041):
+        for start, n in ((date(year, 12, 30), 1), (date(year, 12, 29), 2), (date(year + 1, 1, 3), -2)):
+            fresh = WorkdayCalendar(holiday_source=partial(holidays_for_year, "United States"))
+            got = fresh.add_workdays(start, n)
+            want = add_workdays(start, n, reference)
+            assert got == want, f"add_workdays({start}, {n}) = {got} on a fresh calendar, expected {want}"
+    fresh = WorkdayCalendar(holiday_source=partial(holidays_for_year, "United States"))
+    assert fresh.add_workdays(date(2032, 12, 30), 1) == date(2033, 1, 3)
+
+
+def check_project_tranche_mw():
+    # A blank tranche date drops its MW with it, so capacities stay on their tranche
+    from engine.project import spec_from_inputs
+
+    spec = spec_from_inputs({
+        "power_tranches": "2026-12-01;;2027-06-01", "power_tranche_mw": "300;200;100",
+    }, today=date(2026, 1, 1))
+    assert spec.power_tranches == (date(2026, 12, 1), date(2027, 6, 1)), spec.power_tranches
+    assert spec.power_tranche_mw == (300.0, 100.0), spec.power_tranche_mw
+    try:
+        spec_from_inputs({"power_tranches": "2026-12-01", "power_tranche_mw": "300;200"})
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("more capacities than tranches was accepted")
+
+
+def _zero_spread_matches(spec):
+    # With no spread and no slips every Monte Carlo iteration is the deterministic schedule
+    import numpy as np
+
+    from engine.montecarlo import RiskSpec, Triangular, simulate_rfs
+    from engine.schedule import schedule_project
+
+    risk = simulate_rfs(spec, RiskSpec(iterations=50, duration_spread=Triangular(1.0, 1.0, 1.0), seed=0))
+    want = np.array([h["RFS"].toordinal() for b in schedule_project(spec) for h in b["halls"]], dtype=np.int64)
+    got = np.concatenate(risk.rfs_samples, axis=1)
+    assert (got == want).all(), f"{int((got != want).any(axis=0).sum())} halls differ from schedule_project"
+    last = risk.buildings
+    assert (last["P50 RFS"] == last["Deterministic RFS"]).all()
+
+
+def check_montecarlo_crews():
+    from benchmarks.run import make_spec
+
+    for crews in (1, 3, 500):
+        _zero_spread_matches(replace(make_spec(6, 8), commissioning_crews=crews))
+
+
+def check_montecarlo_mw_tranches():
+    # Halls take their tranche by MW capacity, not by count, in the sampler too
+    from benchmarks.run import make_spec
+    from engine.power import allocate_halls
+
+    spec = make_spec(6, 8)
+    spec = replace(
+        spec, power_tranche_mw=(400.0, 250.0, 300.0, None),
+        # Late and out of order, so the tranches set the RFS dates and their order matters
+        power_tranches=(date(2029, 3, 1), date(2028, 1, 15), date(2028, 8, 1), date(2029, 9, 1)),
+        buildings=tuple(replace(b, mw_total=b.mw_total * (1 + i % 3)) for i, b in enumerate(spec.buildings)),
+    )
+    by_mw, _ = allocate_halls(spec)
+    by_count, _ = allocate_halls(replace(spec, power_tranche_mw=()))
+    assert (by_mw != by_count).any(), "MW capacities do not bind; the check would prove nothing"
+    _zero_spread_matches(spec)
+    _zero_spread_matches(replace(spec, gates=replace(spec.gates, temp_power=date(2026, 9, 1))))
+
+
+def check_montecarlo_tranche_slips():
+    # Halls keep their tranche when slips reorder the deliveries: moving a tranche
+    # no hall is on must not change any sample.
+    import numpy as np
+
+    from benchmarks.run import make_spec
+    from engine.montecarlo import RiskSpec, Triangular, simulate_rfs
+    from engine.power import allocate_halls
+
+    tranches = (date(2028, 1, 1), date(2028, 3, 1), date(2028, 5, 1), date(2028, 7, 1))
+    spec = replace(make_spec(2, 8), power_tranches=tranches)
+    idx, _ = allocate_halls(spec)
+    assert 3 not in idx, "a hall is on the last tranche; the check would prove nothing"
+    risk = RiskSpec(iterations=500, power_slip_days=Triangular(0, 0, 300), seed=7)
+    before = simulate_rfs(spec, risk).rfs_samples
+    after = simulate_rfs(replace(spec, power_tranches=tranches[:3] + (date(2031, 1, 1),)), risk).rfs_samples
+    for b, (x, y) in enumerate(zip(before, after), start=1):
+        assert (x == y).all(), f"Building {b}: {int((x != y).any(axis=1).sum())} iterations changed"
+
+
+def check_optimize_unsorted_tranches():
+    # Tranches entered out of date order, one before the NTP: the optimizer must move
+    # each tranche by its own latest date and keep the allocation order
+    from datetime import timedelta
+
+    from engine.optimize import _last_rfs, optimize_offset_tranches
+    from engine.power import allocate_halls, tranche_order
+    from engine.project import spec_from_inputs
+    from engine.store import schedule_store
+
+    for mw in ("", "200;100;300;"):
+        spec = spec_from_inputs({
+            "num_buildings": 4, "perm_power": "2026-06-01", "power_tranche_mw": mw,
+            "power_tranches": "2028-03-01;2025-06-01;2027-09-01;2027-12-01",
+        }, today=date(2026, 1, 1))
+        targets = {f"Building {i}": date(2028, 1, 1) + timedelta(days=120 * i) for i in range(1, 5)}
+
+        def meets(tranches):
+            rfs = _last_rfs(schedule_store(replace(result.spec(spec), power_tranches=tranches)))
+            return all(r <= targets[b.name].toordinal() for b, r in zip(spec.buildings, rfs))
+
+        result = optimize_offset_tranches(spec, targets)
+        early = tuple(min(d, spec.gates.ntp) for d in spec.power_tranches)
+        order = tranche_order(early)
+        assert result.feasible and meets(result.power_tranches)
+        assert tranche_order(result.power_tranches) == order, f"allocation order changed: {result.power_tranches}"
+        used = set(allocate_halls(result.spec(spec))[0].tolist())
+        for k, i in enumerate(order):
+            later = list(result.power_tranches)
+            later[i] += timedelta(days=1)
+            if k in used and tranche_order(later) == order:
+                assert not meets(tuple(later)), f"tranche {i + 1} could be delivered later than {result.power_tranches[i]}"
+
+
+def check_optimize_crews():
+    # With shared crews a wider offset can pull an earlier building's RFS in, so the
+    # schedule's own RFS dates as targets must come back feasible, at least as wide
+    from engine.optimize import _last_rfs, optimize_offset_tranches
+    from engine.project import spec_from_inputs
+    from engine.store import schedule_store
+
+    for crews in (1, 2, 3):
+        spec = spec_from_inputs({"num_buildings": 3, "commissioning_crews": crews}, today=date(2026, 1, 1))
+        rfs = _last_rfs(schedule_store(spec))
+        targets = {b.name: date.fromordinal(int(r)) for b, r in zip(spec.buildings, rfs)}
+        result = optimize_offset_tranches(spec, targets)
+        assert result.feasible, f"{crews} crews: the schedule as entered was reported infeasible"
+        assert result.building_offset >= spec.building_offset, f"{crews} crews: offset narrowed to {result.building_offset}"
+        got = _last_rfs(schedule_store(result.spec(spec)))
+        assert (got <= rfs).all(), f"{crews} crews: offset {result.building_offset} misses the targets"
+
+
+CHECKS = [
+    ("calendar.year_boundary", check_calendar_year_boundary),
+    ("project.tranche_mw", check_project_tranche_mw),
+    ("montecarlo.crews", check_montecarlo_crews),
+    ("montecarlo.mw_tranches", check_montecarlo_mw_tranches),
+    ("montecarlo.tranche_slips", check_montecarlo_tranche_slips),
+    ("optimize.unsorted_tranches", check_optimize_unsorted_tranches),
+    ("optimize.crews", check_optimize_crews),
+]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the regression checks.")
+    parser.add_argument("-k", dest="pattern", help="Only checks whose name contains this")
+    args = parser.parse_args(argv)
+
+    failed = 0
+    for name, check in CHECKS:
+        if args.pattern and args.pattern not in name:
+            continue
+        try:
+            check()
+        except Exception:
+            failed += 1
+            print(f"FAIL {name}")
+            traceback.print_exc()
+        else:
+            print(f"ok   {name}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
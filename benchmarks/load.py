@@ -0,0 +1,254 @@
+"""Concurrent-session load test of the app script, driven through Streamlit's AppTest.
+
+    python -m benchmarks.load --sessions 8 --steps 25
+    python -m benchmarks.load --sessions 16 --steps 50 --seed 1 -o load.json
+
+Each session is a thread with its own AppTest (its own session state), like
+browser tabs on one server process: the result, figure and export caches are
+shared, exactly as in production. After a first load, every step makes one
+random interaction and reruns the script:
+
+* ``slider``    - move one of the duration sliders,
+* ``buildings`` - change the number of buildings or the offset between them
+                  (AppTest cannot edit st.data_editor cells, so the buildings
+                  table is changed through the inputs that rebuild it),
+* ``view``      - switch between Results, Timeline, Equipment List, Risk and Targets.
+
+Reported: p50/p95/p99 rerun latency (overall and per action), throughput in
+reruns per second over the whole run, and the process RSS before, after and
+at peak (null where the platform has neither /proc nor ``resource``).
+Nothing needs a browser or a running server.
+
+AppTest swaps a mock Streamlit runtime in and out around every run, which
+breaks when runs overlap. ``shared_runtime()`` installs one mock for the whole
+load test, and ``ConcurrentAppTest`` skips the per-run swap. Both rely on the
+AppTest internals of the pinned Streamlit version.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from unittest.mock import MagicMock
+from urllib import parse
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "rfs_calculator_app_mano_default_equipment.py")
+ACTIONS = ("slider", "buildings", "view")
+VIEWS = ("Results", "Timeline", "Equipment List", "Risk", "Targets")
+TIMEOUT = 300
+
+
+# ===== AppTest without global setup per run =====
+@contextmanager
+def shared_runtime():
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+    from streamlit.testing.v1.util import patch_config_options
+
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    saved, Runtime._instance = Runtime._instance, runtime
+    try:
+        with patch_config_options({"global.appTest": True}):
+            yield
+    finally:
+        Runtime._instance = saved
+
+
+def _app_test_class():
+    from streamlit.runtime.pages_manager import PagesManager
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1 import AppTest
+    from streamlit.testing.v1.local_script_runner import LocalScriptRunner
+
+    # One bytecode cache for all sessions, as in the server; compiling the script
+    # in several threads at once also trips a CPython AST bug on 3.11
+    script_cache = ScriptCache()
+
+    class ConcurrentAppTest(AppTest):
+        # AppTest._run minus the runtime/secrets/pages-cache swap; call inside shared_runtime()
+        def _run(self, widget_state=None, timeout=None):
+            runner = LocalScriptRunner(
+                self._script_path, self.session_state,
+                PagesManager(self._script_path, setup_watcher=False),
+                args=self.args, kwargs=self.kwargs,
+            )
+            runner._script_cache = script_cache
+            self._tree = runner.run(widget_state, self.query_params, timeout or self.default_timeout, self._page_hash)
+            self._tree._runner = self
+            self.query_params = parse.parse_qs(runner.event_data[-1]["client_state"].query_string)
+            return self
+
+    return ConcurrentAppTest
+
+
+# ===== Memory =====
+def rss_bytes():
+    try:
+        with open("/proc/self/status", encoding="ascii") as fh:
+            for line in fh:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    # Peak rather than current RSS where /proc is unavailable (macOS reports bytes);
+    # None where neither is (``resource`` is POSIX-only)
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class RssSampler(threading.Thread):
+    def __init__(self, interval=0.1):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak = rss_bytes()
+        self._done = threading.Event()
+
+    def run(self):
+        while self.peak is not None and not self._done.wait(self.interval):
+            self.peak = max(self.peak, rss_bytes())
+
+    def stop(self):
+        self._done.set()
+        self.join()
+        if self.peak is not None:
+            self.peak = max(self.peak, rss_bytes())
+
+
+# ===== Sessions =====
+def _interact(at, action, rng):
+    if action == "slider":
+        slider = rng.choice(list(at.sidebar.slider))
+        slider.set_value(rng.randint(slider.min, slider.max))
+    elif action == "buildings":
+        inputs = {n.label: n for n in at.sidebar.number_input}
+        if rng.random() < 0.5:
+            inputs["Number of Buildings"].set_value(rng.randint(1, 10))
+        else:
+            inputs["Offset between buildings (days)"].set_value(rng.randrange(0, 365, 5))
+    else:
+        at.radio(key="view").set_value(rng.choice(VIEWS))
+
+
+def run_session(index, steps, seed, samples, errors, app_test):
+    rng = random.Random(seed * 1000 + index)
+    at = app_test(APP, default_timeout=TIMEOUT)
+    t = time.perf_counter()
+    at.run()
+    samples.append(("first_load", time.perf_counter() - t))
+    for step in range(steps):
+        action = rng.choice(ACTIONS)
+        try:
+            _interact(at, action, rng)
+        except (IndexError, KeyError) as exc:
+            # The previous rerun did not draw the sidebar or the view switcher
+            errors.append(f"session {index} step {step} {action}: widget missing ({exc!r})")
+            return
+        t = time.perf_counter()
+        at.run()
+        samples.append((action, time.perf_counter() - t))
+        if at.exception:
+            errors.append(f"session {index} step {step} {action}: {at.exception[0].message}")
+
+
+def percentiles(values):
+    values = sorted(values)
+    if not values:
+        return {}
+    q = statistics.quantiles(values, n=100, method="inclusive") if len(values) > 1 else values * 99
+    return {
+        "count": len(values),
+        "p50_ms": round(q[49] * 1e3, 1),
+        "p95_ms": round(q[94] * 1e3, 1),
+        "p99_ms": round(q[98] * 1e3, 1),
+        "max_ms": round(values[-1] * 1e3, 1),
+    }
+
+
+def run_load(sessions, steps, seed=0):
+    """Run ``sessions`` concurrent sessions of ``steps`` interactions each; returns the report dict."""
+    import logging
+
+    logging.getLogger("rfs.timing").setLevel(logging.WARNING)
+    # AppTest reads session state from the session threads, outside any script run
+    logging.getLogger("streamlit.runtime.scriptrunner.script_run_context").setLevel(logging.ERROR)
+    app_test = _app_test_class()
+    samples, errors = [], []
+    rss_start = rss_bytes()
+    sampler = RssSampler()
+    sampler.start()
+    with shared_runtime():
+        threads = [
+            threading.Thread(target=run_session, args=(i, steps, seed, samples, errors, app_test), name=f"session-{i}")
+            for i in range(sessions)
+        ]
+        start = time.perf_counter()
+        for th in threads:
+            th.start()
+        for th in threads:
+            th.join()
+        wall = time.perf_counter() - start
+    sampler.stop()
+
+    reruns = [s for a, s in samples if a != "first_load"]
+    return {
+        "sessions": sessions,
+        "steps": steps,
+        "seed": seed,
+        "wall_s": round(wall, 2),
+        "throughput_rps": round(len(samples) / wall, 2),
+        "latency": percentiles(reruns),
+        "first_load": percentiles([s for a, s in samples if a == "first_load"]),
+        "by_action": {a: percentiles([s for b, s in samples if b == a]) for a in ACTIONS},
+        "rss_mib": None if rss_start is None else {
+            "start": round(rss_start / 2**20, 1),
+            "end": round(rss_bytes() / 2**20, 1),
+            "peak": round(sampler.peak / 2**20, 1),
+        },
+        "errors": errors,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent-session load test of the app through AppTest.")
+    parser.add_argument("--sessions", type=int, default=8, help="Concurrent sessions (threads)")
+    parser.add_argument("--steps", type=int, default=25, help="Interactions per session after the first load")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", help="Write the report as JSON here")
+    args = parser.parse_args(argv)
+
+    report = run_load(args.sessions, args.steps, args.seed)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=1)
+            fh.write("\n")
+
+    lat, rss = report["latency"], report["rss_mib"]
+    print(f"{report['sessions']} sessions x {report['steps']} steps in {report['wall_s']} s: "
+          f"{report['throughput_rps']} reruns/s")
+    print(f"rerun latency  p50 {lat['p50_ms']} ms  p95 {lat['p95_ms']} ms  p99 {lat['p99_ms']} ms  max {lat['max_ms']} ms")
+    for action, stats in [("first_load", report["first_load"])] + list(report["by_action"].items()):
+        if stats:
+            print(f"  {action:<11} n={stats['count']:<5} p50 {stats['p50_ms']} ms  p95 {stats['p95_ms']} ms  p99 {stats['p99_ms']} ms")
+    if rss:
+        print(f"RSS {rss['start']} -> {rss['end']} MiB (peak {rss['peak']} MiB, +{round(rss['end'] - rss['start'], 1)} MiB)")
+    else:
+        print("RSS not available on this platform")
+    if report["errors"]:
+        print(f"{len(report['errors'])} reruns raised; first: {report['errors'][0]}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
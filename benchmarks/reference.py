@@ -0,0 +1,221 @@
+"""The calendar, scheduling and procurement code as it was before the engine existed.
+
+The app computed every date with day-by-day loops over a holiday set,
+scheduled building by building, and modeled equipment row by row. The
+``reference.*`` benchmark cases time these copies next to the current code,
+so the speedups over them are measured on the same machine in the same run.
+Keep this module frozen: it is the yardstick, not a fallback.
+"""
+from datetime import timedelta
+
+import data.equipment as equipment
+from utils.building import _equipment_status, _lead_time_weeks
+from utils.date import clamp
+
+
+# ===== Calendar =====
+def add_workdays(start_date, duration_days, holidays, workdays_per_week=5):
+    if start_date is None or duration_days == 0: return start_date
+    d = start_date
+    step = 1 if duration_days > 0 else -1
+    remaining = abs(int(duration_days))
+    while remaining > 0:
+        d += timedelta(days=step)
+        dow = d.weekday()
+        is_weekend = (dow == 6) or (dow == 5 and workdays_per_week == 5)
+        if is_weekend or d in holidays: continue
+        remaining -= 1
+    return d
+
+
+def workdays_between(d1, d2, ww=5, holidays=set()):
+    if d1 is None or d2 is None: return None
+    days = 0
+    step = 1 if d2 >= d1 else -1
+    d = d1
+    while d != d2:
+        d += timedelta(days=step)
+        dow = d.weekday()
+        is_weekend = (dow == 6) or (dow == 5 and ww == 5)
+        if not is_weekend and d not in holidays:
+            days += 1 if step > 0 else -1
+    return days
+
+
+# ===== Scheduling =====
+class PowerAllocator:
+    def __init__(self, tranche_dates, halls_per_tranche=12):
+        self.tranche_dates = sorted([d for d in tranche_dates if d])
+        self.halls_per_tranche = max(1, int(halls_per_tranche))
+        self.assigned = 0
+
+    def assign(self):
+        if not self.tranche_dates:
+            return None, None
+        idx = min(self.assigned // self.halls_per_tranche, len(self.tranche_dates) - 1)
+        date = self.tranche_dates[idx]
+        self.assigned += 1
+        return idx, date
+
+
+def max_date(*dates):
+    valid = [d for d in dates if d is not None]
+    return max(valid) if valid else None
+
+
+def min_date(*dates):
+    valid = [d for d in dates if d is not None]
+    return min(valid) if valid else None
+
+
+def schedule_building(spec, build_idx, bspec, power_allocator, holidays):
+    # The app's schedule_building, reading a ProjectSpec instead of its widgets
+    g, dur, ww = spec.gates, spec.durations, spec.construction_workdays
+    halls_count = int(bspec.halls)
+    mw_per_hall = bspec.mw_total / halls_count if halls_count > 0 else 0
+
+    offset = (build_idx-1) * int(spec.building_offset)
+    gates = {
+        "ntp": g.ntp + timedelta(days=offset),
+        "ldp": g.ldp + timedelta(days=offset),
+        "bp": g.bp + timedelta(days=offset),
+        "perm_power": g.perm_power + timedelta(days=offset),
+        "temp_power": (g.temp_power + timedelta(days=offset)) if g.temp_power else None,
+    }
+
+    civil_start = max(gates["ntp"], gates["ldp"])
+    civil_finish = add_workdays(civil_start, dur.site_work, holidays, workdays_per_week=ww)
+
+    shell_trigger = add_workdays(civil_start, 80, holidays, workdays_per_week=ww)
+    shell_start = max(shell_trigger, gates["bp"])
+    shell_finish = add_workdays(shell_start, dur.shell, holidays, workdays_per_week=ww)
+    dryin_wd = max(1, min(dur.shell, int(round(dur.dryin_offset))))
+    dryin_date = add_workdays(shell_start, dryin_wd, holidays, workdays_per_week=ww)
+
+    mep_finish = shell_finish
+    mep_start = add_workdays(mep_finish, -dur.mep_yard, holidays, workdays_per_week=ww)
+    fitup_gate = add_workdays(mep_start, 40, holidays, workdays_per_week=ww)
+    fitup_start = max_date(dryin_date, fitup_gate)
+    fitup_finish = add_workdays(fitup_start, dur.fitup, holidays, workdays_per_week=ww)
+
+    def commissioning_power_gate(power_gate):
+        if gates["temp_power"]:
+            return min_date(power_gate, gates["temp_power"])
+        return power_gate
+
+    def schedule_one_hall(prev_l3_start):
+        tranche_idx, tranche_date = power_allocator.assign() if power_allocator else (None, None)
+        power_gate = max_date(gates["perm_power"], tranche_date)
+        pwr_gate_L34 = commissioning_power_gate(power_gate)
+
+        l3_candidates = [fitup_finish, pwr_gate_L34]
+        if prev_l3_start:
+            l3_candidates.append(add_workdays(prev_l3_start, 5, holidays, workdays_per_week=ww))
+        L3_start = max_date(*l3_candidates)
+        L3_finish = add_workdays(L3_start, dur.L3, holidays, workdays_per_week=ww)
+        L4_start = L3_finish
+        L4_finish = add_workdays(L4_start, dur.L4, holidays, workdays_per_week=ww)
+        L5_start = max_date(L4_finish, power_gate)
+        L5_finish = add_workdays(L5_start, dur.L5, holidays, workdays_per_week=ww)
+        return dict(FitupStart=fitup_start, FitupFinish=fitup_finish,
+                    L3Start=L3_start, L3Finish=L3_finish,
+                    L4Start=L4_start, L4Finish=L4_finish,
+                    L5Start=L5_start, L5Finish=L5_finish, RFS=L5_finish,
+                    PowerTranche=(tranche_idx + 1) if tranche_idx is not None else None,
+                    PowerDeliveryDate=tranche_date, PowerGate=power_gate)
+
+    halls = []
+    prev_l3_start = None
+    for _ in range(halls_count):
+        h = schedule_one_hall(prev_l3_start)
+        halls.append(h)
+        prev_l3_start = h["L3Start"]
+
+    return dict(
+        building_name=bspec.name,
+        halls_count=halls_count,
+        mw_per_hall=mw_per_hall,
+        civil_start=civil_start, civil_finish=civil_finish,
+        shell_start=shell_start, shell_finish=shell_finish,
+        mep_start=mep_start, mep_finish=mep_finish,
+        dryin_date=dryin_date, perm_power=gates["perm_power"],
+        halls=halls,
+        gates=gates
+    )
+
+
+def schedule_project(spec, holidays):
+    avg_halls = sum(b.halls for b in spec.buildings) / len(spec.buildings) if spec.buildings else 8
+    power_allocator = PowerAllocator(spec.power_tranches, halls_per_tranche=max(1, int(round(avg_halls * 1.5))))
+    return [
+        schedule_building(spec, i, bspec, power_allocator, holidays)
+        for i, bspec in enumerate(spec.buildings, start=1)
+    ]
+
+
+# ===== Procurement =====
+def get_modeled_equipment_rows(b, ww, holidays, catalog=None):
+    rows = []
+    first_hall = b["halls"][0] if b.get("halls") else None
+
+    for item in equipment.RAW_EQUIPMENT if catalog is None else catalog:
+        lead_wd = int(item.get("lead_time_wd") or 0)
+        buffer_wd = int(item.get("buffer_wd_before_L3") or 0)
+        if item["scope"] == "house":
+            desired = None
+            if first_hall and first_hall.get("L3Start"):
+                ideal = first_hall["L3Start"]
+                if buffer_wd:
+                    ideal = add_workdays(ideal, -buffer_wd, holidays, workdays_per_week=ww)
+                desired = clamp(ideal, b.get("dryin_date"), None)
+
+            release_needed = add_workdays(desired, -lead_wd, holidays, workdays_per_week=ww) if (desired and lead_wd) else None
+            release_date = release_needed
+            site_accept = add_workdays(release_date, lead_wd, holidays, workdays_per_week=ww) if (release_date and lead_wd) else release_date
+
+            roj = desired
+            if site_accept and (roj is None or site_accept > roj):
+                roj = site_accept
+            if roj and b.get("dryin_date") and roj < b["dryin_date"]:
+                roj = b["dryin_date"]
+
+            rows.append({
+                "Building Name": b["building_name"],
+                "Equipment": item["Equipment"],
+                "Location": "House",
+                "Release Needed": release_needed,
+                "Status": _equipment_status(release_needed),
+                "Lead Time (weeks)": _lead_time_weeks(lead_wd),
+                "Site Acceptance": site_accept,
+                "ROJ Target": desired,
+                "ROJ": roj,
+            })
+        else:
+            for idx, hall in enumerate(b.get("halls", []), start=1):
+                ideal = hall.get("L3Start")
+                if ideal and buffer_wd:
+                    ideal = add_workdays(ideal, -buffer_wd, holidays, workdays_per_week=ww)
+                desired = clamp(ideal, hall.get("FitupStart"), hall.get("FitupFinish")) if ideal else None
+
+                release_needed = add_workdays(desired, -lead_wd, holidays, workdays_per_week=ww) if (desired and lead_wd) else None
+                release_date = release_needed
+                site_accept = add_workdays(release_date, lead_wd, holidays, workdays_per_week=ww) if (release_date and lead_wd) else release_date
+
+                roj = desired
+                if roj and hall.get("FitupStart") and roj < hall["FitupStart"]:
+                    roj = hall["FitupStart"]
+                if site_accept and (roj is None or site_accept > roj):
+                    roj = site_accept
+
+                rows.append({
+                    "Building Name": b["building_name"],
+                    "Equipment": f'{item["Equipment"]} (Hall {idx})',
+                    "Location": "Hall",
+                    "Release Needed": release_needed,
+                    "Status": _equipment_status(release_needed),
+                    "Lead Time (weeks)": _lead_time_weeks(lead_wd),
+                    "Site Acceptance": site_accept,
+                    "ROJ Target": desired,
+                    "ROJ": roj,
+                })
+    return rows
@@ -0,0 +1,475 @@
+"""Benchmark suite for the calendar, scheduling, procurement and rendering paths.
+
+    python -m benchmarks.run                                  # full matrix, table to stdout
+    python -m benchmarks.run --quick -k schedule              # 1/10/100 buildings, names containing "schedule"
+    python -m benchmarks.run -o bench.json --compare benchmarks/baseline.json
+    python -m benchmarks.run --save-baseline                  # refresh benchmarks/baseline.json
+
+Every case runs at 1, 10, 100 and 1000 buildings with 4, 8 and 16 halls per
+building; the procurement cases also run against the stock equipment catalog
+and a 4x larger one. Calendar cases do ``buildings x halls x 7`` date
+operations (about one per hall stage). Gates are fixed dates so results do not
+drift with the calendar year.
+
+The ``reference.*`` cases time the pre-engine day-by-day code
+(benchmarks/reference.py) on the same inputs, and the run ends with the
+speedup of each current path over its reference. Every case point starts from
+cleared process-wide caches (calendars, holiday years, crew stores, figures,
+app results), so its timing does not depend on which cases ran before it.
+
+Each case is timed after one warm-up call: loops are calibrated on a second,
+warm call to about MIN_REPEAT_SECONDS and the best and median of REPEATS
+repeats are recorded per call. ``--compare`` compares the best times (the least noisy statistic) and
+exits with status 1 when any case is more than ``--tolerance`` slower than the
+baseline and slower by at least NOISE_FLOOR_SECONDS.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import replace
+from datetime import date, timedelta
+
+BUILDINGS = (1, 10, 100, 1000)
+QUICK_BUILDINGS = (1, 10, 100)
+HALLS = (4, 8, 16)
+QUICK_HALLS = (8,)
+CATALOG_SCALES = (1, 4)
+REPEATS = 7
+MIN_REPEAT_SECONDS = 0.05
+NOISE_FLOOR_SECONDS = 0.0005
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+# ===== Inputs =====
+def make_spec(buildings, halls):
+    from engine.project import spec_from_inputs
+    from engine.spec import BuildingSpec, DEFAULT_MW_PER_HALL
+
+    spec = spec_from_inputs({
+        "ntp": "2026-01-15", "ldp": "2026-02-01", "bp": "2026-05-01", "perm_power": "2026-12-01",
+        "power_tranches": "2026-12-01;2027-03-01;2027-06-01;2027-09-01",
+    }, today=date(2026, 1, 1))
+    return replace(spec, buildings=tuple(
+        BuildingSpec(f"Building {i}", halls, halls * DEFAULT_MW_PER_HALL) for i in range(1, buildings + 1)
+    ))
+
+
+def make_catalog(scale):
+    import data.equipment as equipment
+
+    if scale == 1:
+        return equipment.RAW_EQUIPMENT
+    return [
+        dict(item, Equipment=f"{item['Equipment']} {k}")
+        for k in range(1, scale + 1)
+        for item in equipment.RAW_EQUIPMENT
+    ]
+
+
+def calendar_inputs(n):
+    import numpy as np
+
+    start = date(2026, 1, 15).toordinal()
+    ords = start + (np.arange(n, dtype=np.int64) * 37) % 1500
+    durations = 1 + (np.arange(n, dtype=np.int64) * 13) % 320
+    return ords, durations
+
+
+# ===== Cases =====
+# Each case is (name, setup); setup(buildings, halls, catalog) returns the callable to time.
+def _add_workdays(b, h, c):
+    import utils.date as date_utils
+
+    cal = make_spec(1, 1).calendar
+    ords, durations = calendar_inputs(b * h * 7)
+    starts = [date.fromordinal(int(o)) for o in ords]
+    durations = durations.tolist()
+    return lambda: [date_utils.add_workdays(s, n, cal) for s, n in zip(starts, durations)]
+
+
+def _add_workdays_array(b, h, c):
+    import utils.date as date_utils
+
+    cal = make_spec(1, 1).calendar
+    ords, durations = calendar_inputs(b * h * 7)
+    return lambda: date_utils.add_workdays_array(ords, durations, cal)
+
+
+def _workdays_between(b, h, c):
+    import utils.date as date_utils
+
+    cal = make_spec(1, 1).calendar
+    ords, durations = calendar_inputs(b * h * 7)
+    starts = [date.fromordinal(int(o)) for o in ords]
+    ends = [s + timedelta(days=int(n)) for s, n in zip(starts, durations)]
+    return lambda: [date_utils.workdays_between(s, e, 5, cal) for s, e in zip(starts, ends)]
+
+
+def _workdays_between_array(b, h, c):
+    import utils.date as date_utils
+
+    cal = make_spec(1, 1).calendar
+    ords, durations = calendar_inputs(b * h * 7)
+    starts = [date.fromordinal(int(o)) for o in ords]
+    ends = [s + timedelta(days=int(n)) for s, n in zip(starts, durations)]
+    return lambda: date_utils.workdays_between_array(starts, ends, 5, cal)
+
+
+def _expand_holidays(b, h, c):
+    import utils.date as date_utils
+
+    # Years a b-building campus spans at the default 90-day offset, from a cold cache
+    years = range(2026, 2029 + (b * 90) // 365)
+
+    def run():
+        date_utils.holidays_for_year.cache_clear()
+        return date_utils.expand_holidays("United States", years)
+    return run
+
+
+def _calendar_tables(b, h, c):
+    from utils.workdays import WorkdayCalendar
+    import utils.date as date_utils
+
+    holidays = date_utils.expand_holidays("United States", range(2026, 2029 + (b * 90) // 365))
+    last = date(2029 + (b * 90) // 365, 12, 31)
+    return lambda: WorkdayCalendar(holidays).add_workdays(last, -1)
+
+
+def _schedule_building(b, h, c):
+    from engine.power import power_allocator
+    from engine.schedule import schedule_building
+
+    spec = make_spec(b, h)
+
+    def run():
+        allocator = power_allocator(spec)
+        return [schedule_building(spec, i, bspec, allocator) for i, bspec in enumerate(spec.buildings, start=1)]
+    return run
+
+
+def _schedule_project(b, h, c):
+    from engine.schedule import schedule_project
+
+    spec = make_spec(b, h)
+    return lambda: schedule_project(spec)
+
+
+def _schedule_store(b, h, c):
+    from engine.store import schedule_store
+
+    spec = make_spec(b, h)
+    return lambda: schedule_store(spec)
+
+
+def _modeled_equipment_rows(b, h, c):
+    import utils.building as building
+    from engine.schedule import schedule_project
+
+    spec = make_spec(b, h)
+    buildings = schedule_project(spec)
+    catalog = make_catalog(c)
+    cal = spec.calendar
+    return lambda: [
+        row for bd in buildings for item in catalog
+        for row in building.get_item_rows(bd, item, spec.admin_workdays, cal)
+    ]
+
+
+def _equipment_frame(b, h, c):
+    from engine.store import schedule_store
+
+    spec = make_spec(b, h)
+    store = schedule_store(spec)
+    catalog = make_catalog(c)
+    return lambda: store.equipment_frame(spec, catalog=catalog)
+
+
+def _table_html(b, h, c):
+    from components.table import PAGE_ROWS, filter_sort, table_html
+    from engine.store import schedule_store
+
+    spec = make_spec(b, h)
+    equipment = schedule_store(spec).equipment_frame(spec, catalog=make_catalog(c))
+    # Sort the full frame server-side, then build the one page that is sent
+    return lambda: table_html(
+        filter_sort(equipment, sort_by="Release Needed").iloc[:PAGE_ROWS], highlight_release_within_days=30
+    )
+
+
+def _gantt_full(b, h, c):
+    from components.chart import gantt_figure
+    from engine.store import schedule_store
+
+    store = schedule_store(make_spec(b, h))
+    gdf, milestones = store.gantt_frames()
+    return lambda: gantt_figure(gdf, milestones)
+
+
+def _gantt_summary(b, h, c):
+    from components.chart import SUMMARY_MAX_ROWS, gantt_figure
+    from engine.store import schedule_store, summary_gantt
+
+    windows = schedule_store(make_spec(b, h)).phase_windows()
+    return lambda: gantt_figure(*summary_gantt(windows, SUMMARY_MAX_ROWS))
+
+
+def _reference_holidays(b):
+    # The pre-engine app expanded a fixed holiday set once, over every year the campus spans
+    import utils.date as date_utils
+
+    return date_utils.expand_holidays("United States", range(2025, 2030 + (b * 90) // 365))
+
+
+def _reference_add_workdays(b, h, c):
+    from benchmarks import reference
+
+    holidays = _reference_holidays(b)
+    ords, durations = calendar_inputs(b * h * 7)
+    starts = [date.fromordinal(int(o)) for o in ords]
+    durations = durations.tolist()
+    return lambda: [reference.add_workdays(s, n, holidays) for s, n in zip(starts, durations)]
+
+
+def _reference_workdays_between(b, h, c):
+    from benchmarks import reference
+
+    holidays = _reference_holidays(b)
+    ords, durations = calendar_inputs(b * h * 7)
+    starts = [date.fromordinal(int(o)) for o in ords]
+    ends = [s + timedelta(days=int(n)) for s, n in zip(starts, durations)]
+    return lambda: [reference.workdays_between(s, e, 5, holidays) for s, e in zip(starts, ends)]
+
+
+def _reference_schedule_project(b, h, c):
+    from benchmarks import reference
+
+    spec, holidays = make_spec(b, h), _reference_holidays(b)
+    return lambda: reference.schedule_project(spec, holidays)
+
+
+def _reference_equipment_rows(b, h, c):
+    from benchmarks import reference
+
+    spec, holidays = make_spec(b, h), _reference_holidays(b)
+    buildings = reference.schedule_project(spec, holidays)
+    catalog = make_catalog(c)
+    return lambda: [
+        row for bd in buildings
+        for row in reference.get_modeled_equipment_rows(bd, spec.admin_workdays, holidays, catalog)
+    ]
+
+
+CASES = [
+    ("calendar.add_workdays", _add_workdays, False),
+    ("calendar.add_workdays_array", _add_workdays_array, False),
+    ("calendar.workdays_between", _workdays_between, False),
+    ("calendar.workdays_between_array", _workdays_between_array, False),
+    ("calendar.expand_holidays", _expand_holidays, False),
+    ("calendar.tables", _calendar_tables, False),
+    ("schedule.schedule_building", _schedule_building, False),
+    ("schedule.schedule_project", _schedule_project, False),
+    ("schedule.schedule_store", _schedule_store, False),
+    ("procurement.modeled_equipment_rows", _modeled_equipment_rows, True),
+    ("procurement.equipment_frame", _equipment_frame, True),
+    ("render.table_html", _table_html, True),
+    ("render.gantt_full", _gantt_full, False),
+    ("render.gantt_summary", _gantt_summary, False),
+    ("reference.add_workdays", _reference_add_workdays, False),
+    ("reference.workdays_between", _reference_workdays_between, False),
+    ("reference.schedule_project", _reference_schedule_project, False),
+    ("reference.modeled_equipment_rows", _reference_equipment_rows, True),
+]
+# Per-call row paths that take tens of seconds at the top of the matrix
+SLOW_CASES = {
+    "calendar.add_workdays", "calendar.workdays_between", "procurement.modeled_equipment_rows",
+    "reference.add_workdays", "reference.workdays_between", "reference.schedule_project",
+    "reference.modeled_equipment_rows",
+}
+SLOW_MAX_BUILDINGS = 100
+# Current path -> the pre-engine case it replaces, for the speedup report
+REFERENCES = {
+    "calendar.add_workdays": "reference.add_workdays",
+    "calendar.add_workdays_array": "reference.add_workdays",
+    "calendar.workdays_between": "reference.workdays_between",
+    "calendar.workdays_between_array": "reference.workdays_between",
+    "schedule.schedule_building": "reference.schedule_project",
+    "schedule.schedule_project": "reference.schedule_project",
+    "schedule.schedule_store": "reference.schedule_project",
+    "procurement.modeled_equipment_rows": "reference.modeled_equipment_rows",
+    "procurement.equipment_frame": "reference.modeled_equipment_rows",
+}
+# Process-wide caches cleared before every case point: (module, attribute), if the module is loaded
+PROCESS_CACHES = (
+    ("utils.date", "calendar_for"),
+    ("utils.date", "holidays_for_year"),
+    ("engine.store", "_CREW_STORES"),
+    ("components.chart", "FIGURE_CACHE"),
+    ("engine.cache", "RESULT_CACHE"),
+    ("engine.cache", "RISK_CACHE"),
+    ("engine.cache", "OPTIMIZE_CACHE"),
+    ("engine.cache", "PORTFOLIO_CACHE"),
+    ("engine.cache", "EXPORT_CACHE"),
+)
+
+
+# ===== Timing =====
+def reset_caches():
+    for module, name in PROCESS_CACHES:
+        cache = getattr(sys.modules.get(module), name, None)
+        if cache is not None:
+            (cache.cache_clear if hasattr(cache, "cache_clear") else cache.clear)()
+    gc.collect()
+
+
+def measure(fn, repeats=REPEATS, min_repeat_seconds=MIN_REPEAT_SECONDS):
+    # The warm-up call starts from cleared caches; loops are calibrated on the next, warm one
+    fn()
+    t = time.perf_counter()
+    fn()
+    first = time.perf_counter() - t
+    loops = max(1, int(min_repeat_seconds / first)) if first > 0 else 1000
+    if first > 1.0:
+        repeats = min(repeats, 3)
+    times = []
+    for _ in range(repeats):
+        t = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        times.append((time.perf_counter() - t) / loops)
+    return {"min_s": min(times), "median_s": statistics.median(times), "loops": loops, "repeats": repeats}
+
+
+def case_id(result):
+    return f"{result['name']}[b={result['buildings']},h={result['halls']},c={result['catalog']}]"
+
+
+def run_suite(buildings=BUILDINGS, halls=HALLS, pattern=None, progress=sys.stderr):
+    results = []
+    for name, setup, uses_catalog in CASES:
+        if pattern and pattern not in name:
+            continue
+        for b in buildings:
+            if name in SLOW_CASES and b > SLOW_MAX_BUILDINGS:
+                continue
+            for h in halls:
+                for c in CATALOG_SCALES if uses_catalog else (1,):
+                    result = {"name": name, "buildings": b, "halls": h, "catalog": c}
+                    reset_caches()
+                    result.update(measure(setup(b, h, c)))
+                    results.append(result)
+                    if progress is not None:
+                        progress.write(f"{case_id(result):<60} {_fmt(result['median_s'])}\n")
+    return results
+
+
+# ===== Reporting =====
+def environment():
+    import numpy
+    import pandas
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "numpy": numpy.__version__,
+        "pandas": pandas.__version__,
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def _fmt(seconds):
+    if seconds >= 1:
+        return f"{seconds:8.3f} s "
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:8.2f} ms"
+    return f"{seconds * 1e6:8.1f} µs"
+
+
+def speedups(results):
+    """(case, reference best time, current best time, speedup) for every case whose reference also ran."""
+    ref = {case_id(r): r for r in results if r["name"].startswith("reference.")}
+    rows = []
+    for r in results:
+        other = ref.get(case_id(dict(r, name=REFERENCES.get(r["name"], ""))))
+        if other is not None:
+            rows.append((case_id(r), other["min_s"], r["min_s"], other["min_s"] / r["min_s"] if r["min_s"] else float("inf")))
+    return rows
+
+
+def compare(results, baseline, tolerance):
+    """(rows, regressions): per case baseline vs current best time and their ratio."""
+    base = {case_id(r): r for r in baseline["results"]}
+    rows, regressions = [], []
+    for r in results:
+        b = base.get(case_id(r))
+        if b is None:
+            continue
+        ratio = r["min_s"] / b["min_s"] if b["min_s"] else float("inf")
+        row = (case_id(r), b["min_s"], r["min_s"], ratio)
+        rows.append(row)
+        if ratio > 1 + tolerance and r["min_s"] - b["min_s"] > NOISE_FLOOR_SECONDS:
+            regressions.append(row)
+    return rows, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the calendar, scheduling, procurement and rendering paths.")
+    parser.add_argument("-k", dest="pattern", help="Only cases whose name contains this")
+    parser.add_argument("--quick", action="store_true", help="1/10/100 buildings with 8 halls")
+    parser.add_argument("-o", "--output", help="Write results as JSON here")
+    parser.add_argument("--compare", metavar="BASELINE", help="Compare best times with a results/baseline JSON")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="Allowed slowdown before failing (default 0.5 = 50%%)")
+    parser.add_argument("--save-baseline", action="store_true", help=f"Also write the results to {os.path.relpath(BASELINE)}")
+    args = parser.parse_args(argv)
+
+    results = run_suite(
+        QUICK_BUILDINGS if args.quick else BUILDINGS,
+        QUICK_HALLS if args.quick else HALLS,
+        args.pattern,
+    )
+    faster = speedups(results)
+    report = {
+        "environment": environment(),
+        "results": results,
+        "speedups": [{"case": cid, "reference_s": ref, "current_s": cur, "speedup": x} for cid, ref, cur, x in faster],
+    }
+    for path in ([args.output] if args.output else []) + ([BASELINE] if args.save_baseline else []):
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=1)
+            fh.write("\n")
+
+    if faster:
+        print(f"{'case':<60} {'reference':>11} {'current':>11}  speedup")
+        for cid, ref, cur, x in faster:
+            print(f"{cid:<60} {_fmt(ref)} {_fmt(cur)}  {x:7.1f}x")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fh:
+            baseline = json.load(fh)
+        rows, regressions = compare(results, baseline, args.tolerance)
+        print(f"{'case':<60} {'baseline':>11} {'current':>11}  ratio")
+        for cid, before, after, ratio in rows:
+            flag = "  REGRESSION" if (cid, before, after, ratio) in regressions else ""
+            print(f"{cid:<60} {_fmt(before)} {_fmt(after)}  {ratio:5.2f}x{flag}")
+        print(f"{len(rows)} cases compared, {len(regressions)} regressions (tolerance {args.tolerance:.0%})")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,8 @@
 import streamlit as st
 import utils.colors as colors
+import engine.diagnostics as diagnostics
+from engine.cache import frame_key
+from engine.lru import LRUCache
 
 # ---- Plotly guard (clear message if missing on Cloud) ----
 try:
@@ -10,20 +13,80 @@ except ModuleNotFoundError:
     st.stop()
 
 
-def render_gantt(gdf, milestones=None):
-    color_map = {
-        "Site Work": colors.SITE_WORK_COLOR,
-        "Shell": colors.MANO_BLUE,
-        "MEP Yard": colors.MANO_GREY,
-        "Fitup": colors.FITOUT_COLOR,
-        "L3": colors.L3_COLOR,
-        "L4": colors.L4_COLOR,
-        "L5": colors.L5_COLOR,
-    }
+PHASE_COLORS = {
+    "Site Work": colors.SITE_WORK_COLOR,
+    "Shell": colors.MANO_BLUE,
+    "MEP Yard": colors.MANO_GREY,
+    "Fitup": colors.FITOUT_COLOR,
+    "L3": colors.L3_COLOR,
+    "L4": colors.L4_COLOR,
+    "L5": colors.L5_COLOR,
+}
 
+# Built figures keyed by a hash of their frames: reruns that redraw the same
+# Gantt skip px.timeline entirely. Streamlit only re-serializes the figure.
+FIGURE_CACHE = LRUCache(max_entries=16)
+
+# ---- Level of detail ----
+GANTT_MODES = ("All halls", "Per building", "Single building")
+FULL_DETAIL_MAX_HALLS = 100   # "All halls" (3 rows per hall) is offered up to this many halls
+SUMMARY_MAX_ROWS = 300        # more buildings than this are grouped into bands
+WEBGL_MIN_BARS = 1000         # bars past which the figure is drawn with WebGL
+SELECTBOX_MAX_OPTIONS = 500   # larger portfolios pick a building by number
+
+
+def render_timeline(windows, building_detail, full=None, key="timeline"):
+    """Gantt with a detail selector.
+
+    ``windows`` is ScheduleStore.phase_windows() for every building,
+    ``building_detail(i)`` returns (gdf, milestones) with the halls of building
+    ``i`` and ``full`` is the all-halls (gdf, milestones), offered only while
+    the hall count is at most FULL_DETAIL_MAX_HALLS.
+    """
+    if not len(windows):
+        st.info("Nothing to draw yet.")
+        return
+    modes = GANTT_MODES if full is not None else GANTT_MODES[1:]
+    mode = st.radio("Detail", modes, horizontal=True, key=f"{key}_mode")
+    if mode == "All halls":
+        render_gantt(*full)
+    elif mode == "Per building":
+        from engine.store import summary_gantt
+        if len(windows) > SUMMARY_MAX_ROWS:
+            st.caption(f"{len(windows):,} buildings grouped into {SUMMARY_MAX_ROWS} bands; pick Single building for hall detail.")
+        render_gantt(*summary_gantt(windows, SUMMARY_MAX_ROWS))
+    else:
+        names = windows["Building Name"].tolist()
+        if len(names) <= SELECTBOX_MAX_OPTIONS:
+            i = st.selectbox("Building", range(len(names)), format_func=names.__getitem__, key=f"{key}_building")
+        else:
+            i = int(st.number_input(f"Building # (1–{len(names):,})", 1, len(names), 1, key=f"{key}_building_no")) - 1
+            st.caption(names[i])
+        render_gantt(*building_detail(i))
+
+
+def render_gantt(gdf, milestones=None, renderer="auto"):
+    if gdf is None or gdf.empty:
+        st.info("Nothing to draw yet.")
+        return
+    with diagnostics.stage("gantt"):
+        fig = FIGURE_CACHE.get_or_compute(frame_key(gdf, milestones, renderer), lambda: gantt_figure(gdf, milestones, renderer))
+    if diagnostics.measuring_payloads():
+        diagnostics.record_payload("gantt", len(fig.to_json()))
+    st.plotly_chart(fig, use_container_width=True)
+
+
+def gantt_figure(gdf, milestones=None, renderer="auto"):
+    # px.timeline bars, or WebGL line segments past WEBGL_MIN_BARS (or when renderer="webgl")
+    if renderer == "webgl" or (renderer == "auto" and len(gdf) > WEBGL_MIN_BARS):
+        return _webgl_figure(gdf, milestones)
+    return _timeline_figure(gdf, milestones)
+
+
+def _timeline_figure(gdf, milestones=None):
     df = gdf.reset_index(drop=True).copy()
     df["Description"] = df["Task"].astype(str)
-    category_order = df["Description"].tolist()
+    category_order = list(dict.fromkeys(df["Description"]))
 
     fig = px.timeline(
         df,
@@ -31,7 +94,7 @@ def render_gantt(gdf, milestones=None):
         x_end="Finish",
         y="Description",
         color="Phase",
-        color_discrete_map=color_map,
+        color_discrete_map=PHASE_COLORS,
         title="",
         hover_name="Description",
         hover_data={
@@ -41,6 +104,62 @@ def render_gantt(gdf, milestones=None):
             "Phase": True,
         },
     )
+    _style(fig, category_order)
+    fig.update_traces(width=0.6)
+    _add_milestones(fig, df, milestones)
+    return fig
+
+
+def _webgl_figure(gdf, milestones=None):
+    # One Scattergl line trace per phase: each bar is a thick segment, so the
+    # payload is a few flat arrays instead of one SVG shape per bar.
+    df = gdf.reset_index(drop=True).copy()
+    df["Description"] = df["Task"].astype(str)
+    category_order = list(dict.fromkeys(df["Description"]))
+    height = min(max(450, 14 * len(category_order)), 2400)
+    bar_px = max(2, min(12, int(0.6 * height / max(len(category_order), 1))))
+
+    fig = go.Figure()
+    for phase, part in df.groupby("Phase", sort=False):
+        n = len(part)
+        x = [None] * (3 * n)
+        y = [None] * (3 * n)
+        x[0::3], x[1::3] = part["Start"].tolist(), part["Finish"].tolist()
+        y[0::3] = y[1::3] = part["Description"].tolist()
+        fig.add_trace(go.Scattergl(
+            x=x, y=y, mode="lines", name=phase,
+            line=dict(color=PHASE_COLORS.get(phase), width=bar_px),
+            hovertemplate="<b>%{y}</b><br>%{x|%b %d, %Y}<extra>" + phase + "</extra>",
+        ))
+    _style(fig, category_order)
+    fig.update_layout(height=height)
+    _add_milestones(fig, df, milestones)
+    return fig
+
+
+def render_energized_curve(curve, tranches=None):
+    """Step chart of cumulative MW energized; ``tranches`` (PowerAllocator.report()) marks each delivery."""
+    if curve is None or curve.empty:
+        st.info("No hall has a power date yet.")
+        return
+    fig = go.Figure(go.Scatter(
+        x=curve["Date"], y=curve["Cumulative MW"], mode="lines", line_shape="hv",
+        line=dict(color=colors.MANO_BLUE, width=2), name="Energized",
+        hovertemplate="%{x|%b %d, %Y}<br>%{y:,.1f} MW<extra></extra>",
+    ))
+    if tranches is not None and not tranches.empty:
+        fig.add_trace(go.Scatter(
+            x=tranches["Delivery"], y=[0] * len(tranches), mode="markers", name="Tranche delivery",
+            marker=dict(symbol="diamond", size=10, color=colors.POWER_MILESTONE_COLOR),
+            customdata=tranches["Tranche"], hovertemplate="Tranche %{customdata}<br>%{x|%b %d, %Y}<extra></extra>",
+        ))
+    fig.update_xaxes(showgrid=True, gridcolor="lightgray", linewidth=1, linecolor=colors.MANO_BLUE)
+    fig.update_yaxes(showgrid=True, gridcolor="lightgray", linewidth=1, linecolor=colors.MANO_BLUE, title_text="MW")
+    fig.update_layout(plot_bgcolor="#FFFFFF", paper_bgcolor=colors.MANO_OFFWHITE, font_family="Raleway", height=320)
+    st.plotly_chart(fig, use_container_width=True)
+
+
+def _style(fig, category_order):
     fig.update_xaxes(showgrid=True, gridcolor="lightgray", linewidth=1, linecolor=colors.MANO_BLUE)
     fig.update_yaxes(
         showgrid=True,
@@ -50,7 +169,6 @@ def render_gantt(gdf, milestones=None):
         categoryorder="array",
         categoryarray=category_order,
     )
-    fig.update_traces(width=0.6)
     fig.update_layout(
         plot_bgcolor="#FFFFFF",
         paper_bgcolor=colors.MANO_OFFWHITE,
@@ -58,34 +176,34 @@ def render_gantt(gdf, milestones=None):
         legend_title_text="Phase",
     )
 
-    if milestones is not None and not milestones.empty:
-        milestone_df = milestones.copy()
-        row_lookup = dict(zip(df["Task"], df["Description"]))
-        milestone_df["RowLabel"] = milestone_df["Task"].map(row_lookup)
-        milestone_df = milestone_df.dropna(subset=["RowLabel"])
-        if milestone_df.empty:
-            st.plotly_chart(fig, use_container_width=True)
-            return
-
-        customdata_cols = [col for col in ("HoverText", "Task") if col in milestone_df.columns]
-        if not customdata_cols:
-            customdata_cols = ["Task"]
-
-        fig.add_trace(
-            go.Scatter(
-                x=milestone_df["Date"],
-                y=milestone_df["RowLabel"],
-                mode="markers",
-                marker=dict(
-                    symbol="circle",
-                    size=12,
-                    color=colors.POWER_MILESTONE_COLOR,
-                    line=dict(color="white", width=1),
-                ),
-                customdata=milestone_df[customdata_cols],
-                name="Power Available",
-                hovertemplate="<b>%{customdata[0]}</b><br>Power Available: %{x|%b %d, %Y}<extra></extra>",
-            )
-        )
 
-    st.plotly_chart(fig, use_container_width=True)
+def _add_milestones(fig, df, milestones):
+    if milestones is None or milestones.empty:
+        return
+    milestone_df = milestones.copy()
+    row_lookup = dict(zip(df["Task"], df["Description"]))
+    milestone_df["RowLabel"] = milestone_df["Task"].map(row_lookup)
+    milestone_df = milestone_df.dropna(subset=["RowLabel"])
+    if milestone_df.empty:
+        return
+
+    customdata_cols = [col for col in ("HoverText", "Task") if col in milestone_df.columns]
+    if not customdata_cols:
+        customdata_cols = ["Task"]
+
+    fig.add_trace(
+        go.Scatter(
+            x=milestone_df["Date"],
+            y=milestone_df["RowLabel"],
+            mode="markers",
+            marker=dict(
+                symbol="circle",
+                size=12,
+                color=colors.POWER_MILESTONE_COLOR,
+                line=dict(color="white", width=1),
+            ),
+            customdata=milestone_df[customdata_cols],
+            name="Power Available",
+            hovertemplate="<b>%{customdata[0]}</b><br>Power Available: %{x|%b %d, %Y}<extra></extra>",
+        )
+    )
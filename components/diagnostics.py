@@ -0,0 +1,43 @@
+import uuid
+from collections import deque
+
+import pandas as pd
+import streamlit as st
+
+import engine.diagnostics as diagnostics
+
+# Reruns kept per session for the panel
+DIAGNOSTICS_HISTORY = 20
+
+
+def start_run():
+  """Timer for this rerun; ``?diagnostics=1`` shows the panel, ``?profile=1`` adds a cProfile capture."""
+  if "diagnostics_session" not in st.session_state:
+    st.session_state["diagnostics_session"] = uuid.uuid4().hex[:12]
+  params = st.query_params
+  profile = params.get("profile") not in (None, "", "0")
+  show = profile or params.get("diagnostics") not in (None, "", "0")
+  return diagnostics.start_run(st.session_state["diagnostics_session"], profile=profile, measure_payloads=show)
+
+
+def finish_run(timer):
+  """Log this rerun, add it to the session's history and draw the panel when asked for."""
+  record = timer.finish()
+  history = st.session_state.setdefault("diagnostics_history", deque(maxlen=DIAGNOSTICS_HISTORY))
+  history.append(record)
+  if not timer.measure_payloads:
+    return
+
+  with st.expander("Diagnostics", expanded=True):
+    st.caption(f"Session {record['session']} • last {len(history)} reruns, newest first • times in ms")
+    runs = pd.DataFrame([{"Total": r["total_ms"], **r["stages"]} for r in reversed(history)])
+    st.dataframe(runs.round(1), use_container_width=True)
+    if record["payload_bytes"]:
+      st.markdown("**Payloads this rerun**")
+      st.dataframe(
+        pd.DataFrame({"Element": list(record["payload_bytes"]), "Bytes": list(record["payload_bytes"].values())}),
+        hide_index=True, use_container_width=True,
+      )
+    if timer.profile_text:
+      st.markdown("**cProfile (cumulative)**")
+      st.code(timer.profile_text, language=None)
@@ -0,0 +1,33 @@
+import importlib.util
+
+import streamlit as st
+
+from engine.cache import cached_export, csv_bytes, export_ready
+from engine.export import XLSX_MIME, parquet_zip_bytes, xlsx_bytes
+
+
+def render_download(spec, name, label, file_name, mime, build):
+  """Download button whose bytes are only built after "Prepare" is clicked, then cached per schedule."""
+  ready = export_ready(spec, name)
+  if not ready and st.button(f"Prepare {label}", key=f"prepare_{name}"):
+    with st.spinner(f"Preparing {label}…"):
+      cached_export(spec, name, build)
+    ready = True
+  if ready:
+    st.download_button(f"Download {label}", cached_export(spec, name, build), file_name, mime, key=f"download_{name}")
+
+
+def render_csv_download(spec, name, label, df, file_name):
+  render_download(spec, name, f"{label} (CSV)", file_name, "text/csv", lambda: csv_bytes(df))
+
+
+def render_exports(spec, prefix, tables):
+  """XLSX workbook (RFS, Equipment, Gantt, Inputs) and a zip of Parquet tables; ``tables()`` gives sheet name -> frame."""
+  c1, c2 = st.columns(2)
+  with c1:
+    render_download(spec, f"{prefix}_xlsx", "Workbook (XLSX)", "rfs_schedule.xlsx", XLSX_MIME, lambda: xlsx_bytes(spec, [tables()]))
+  with c2:
+    if importlib.util.find_spec("pyarrow") is None:
+      st.caption("Parquet export needs `pyarrow`.")
+    else:
+      render_download(spec, f"{prefix}_parquet", "Tables (Parquet)", "rfs_schedule_parquet.zip", "application/zip", lambda: parquet_zip_bytes(tables()))
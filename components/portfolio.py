@@ -0,0 +1,49 @@
+import pandas as pd
+import streamlit as st
+
+from components.chart import render_timeline
+from components.export import render_csv_download, render_exports
+from engine.export import sheet_tables
+from engine.store import schedule_store
+
+
+def render_portfolio_results(spec, portfolio):
+  buildings = portfolio.buildings
+  c1, c2, c3, c4 = st.columns(4)
+  c1.metric("Buildings", f"{len(buildings):,}")
+  c2.metric("Data Halls", f"{len(portfolio.rfs):,}")
+  c3.metric("First RFS", _fmt(buildings["First RFS"].min()))
+  c4.metric("Last RFS", _fmt(buildings["Last RFS"].max()))
+
+  st.subheader("Key Milestones per Building")
+  st.dataframe(buildings, hide_index=True, use_container_width=True)
+  render_csv_download(spec, "portfolio_buildings", "Buildings", buildings, "portfolio_buildings.csv")
+
+  st.divider()
+  st.subheader("Data Hall RFS (All Buildings)")
+  st.dataframe(portfolio.rfs, hide_index=True, use_container_width=True)
+  render_csv_download(spec, "portfolio_rfs", "RFS", portfolio.rfs, "rfs_multi_building.csv")
+
+  st.divider()
+  st.subheader("Export")
+  render_exports(spec, "portfolio", lambda: sheet_tables(portfolio.rfs, portfolio.equipment, portfolio.phases, datetimes=True))
+
+
+def render_portfolio_timeline(spec, portfolio):
+  # Buildings are banded past SUMMARY_MAX_ROWS; a single building's halls are rescheduled on demand.
+  render_timeline(portfolio.phases, lambda i: schedule_store(spec, i, i + 1).gantt_frames(), key="portfolio_timeline")
+
+
+def render_portfolio_equipment(spec, portfolio):
+  equipment = portfolio.equipment
+  counts = equipment["Status"].value_counts()
+  c1, c2, c3 = st.columns(3)
+  c1.metric("🔴 Overdue", f"{counts.get('Overdue', 0):,}")
+  c2.metric("🟡 At Risk", f"{counts.get('At Risk', 0):,}")
+  c3.metric("🟢 On Track", f"{counts.get('On Track', 0):,}")
+  st.dataframe(equipment, hide_index=True, use_container_width=True)
+  render_csv_download(spec, "portfolio_equipment", "Equipment", equipment, "equipment_roj.csv")
+
+
+def _fmt(value):
+  return "—" if pd.isna(value) else value.strftime("%Y-%m-%d")
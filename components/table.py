@@ -1,79 +1,119 @@
-from datetime import date, datetime, timedelta
+from datetime import date, timedelta
+from html import escape
 
+import numpy as np
 import pandas as pd
 import streamlit as st
 
+from engine.diagnostics import record_payload, stage
 
-def _coerce_date(value):
-  if pd.isna(value):
-    return None
-  if isinstance(value, date) and not isinstance(value, datetime):
-    return value
-  if isinstance(value, (pd.Timestamp, datetime)):
-    return value.date()
-  return None
+# Tables longer than this get filter/sort/page controls; only the visible page is sent as HTML.
+PAGE_ROWS = 100
 
+STATUS_ICONS = {
+  "Overdue": "🔴",
+  "At Risk": "🟡",
+  "On Track": "🟢",
+}
+# Cell classes; the colors live in utils/css.py
+STATUS_CLASSES = {
+  "Overdue": "status-overdue",
+  "At Risk": "status-at-risk",
+  "On Track": "status-on-track",
+}
 
-def render_styled_table(df, col_space=110, highlight_release_within_days=None):
+
+def render_styled_table(df, col_space=110, highlight_release_within_days=None, key=None):
   """Render a styled table in Streamlit."""
-  display_df = df.copy()
-
-  status_icon_map = {
-    "Overdue": "🔴",
-    "At Risk": "🟡",
-    "On Track": "🟢",
-  }
-  status_color_map = {
-    "Overdue": "#d62828",
-    "At Risk": "#f4a261",
-    "On Track": "#2a9d8f",
-  }
-
-  if "Status" in display_df.columns:
-    display_df["Status"] = display_df["Status"].map(
-      lambda s: f"{status_icon_map.get(s, '')} {s}".strip()
-      if isinstance(s, str) and s
-      else s
-    )
-
-  styler = (
-    display_df.style
-      .hide(axis="index")
-      .set_table_attributes('class="styled-table"')
-      .set_table_styles([
-        {"selector": "th", "props": [("min-width", f"{col_space}px"), ("white-space", "nowrap")]},
-        {"selector": "td", "props": [("min-width", f"{col_space}px"), ("white-space", "nowrap")]},
-      ])
+  key = key or "table_" + "_".join(map(str, df.columns))
+  view = df
+  if len(df) > PAGE_ROWS:
+    view, start = _table_controls(df, key)
+  else:
+    start = 0
+  page = view.iloc[start:start + PAGE_ROWS]
+  with stage(f"table:{key}"):
+    html = table_html(page, col_space, highlight_release_within_days, key)
+  record_payload(f"table:{key}", len(html))
+  st.markdown("""<div class="table-container">""" + html + "</div>", unsafe_allow_html=True)
+
+
+def _table_controls(df, key):
+  # Filter, sort and page the full frame on the server; returns (rows to show, first row of the page)
+  c1, c2, c3, c4 = st.columns([3, 2, 1, 1])
+  query = c1.text_input("Filter", key=f"{key}_filter", placeholder="Contains…")
+  sort_by = c2.selectbox("Sort by", ["—"] + list(df.columns), key=f"{key}_sort")
+  descending = c3.toggle("Descending", key=f"{key}_desc")
+
+  view = filter_sort(df, query, None if sort_by == "—" else sort_by, descending)
+  pages = max(1, -(-len(view) // PAGE_ROWS))
+  page = int(c4.number_input(f"Page (of {pages:,})", 1, pages, 1, key=f"{key}_page"))
+  start = (page - 1) * PAGE_ROWS
+  st.caption(f"Rows {min(start + 1, len(view)):,}–{min(start + PAGE_ROWS, len(view)):,} of {len(view):,}"
+             + (f" (filtered from {len(df):,})" if len(view) != len(df) else ""))
+  return view, start
+
+
+def filter_sort(df, query="", sort_by=None, descending=False):
+  """Rows of ``df`` containing ``query`` (any column, case-insensitive), sorted by ``sort_by``."""
+  view = df
+  if query:
+    mask = np.zeros(len(df), dtype=bool)
+    for col in df.columns:
+      mask |= df[col].astype(str).str.contains(query, case=False, regex=False).to_numpy()
+    view = view[mask]
+  if sort_by is not None:
+    try:
+      view = view.sort_values(sort_by, ascending=not descending, kind="stable", na_position="last")
+    except TypeError:
+      view = view.sort_values(sort_by, ascending=not descending, kind="stable", key=lambda s: s.astype(str))
+  return view
+
+
+def _format_column(values):
+  # Same text as Styler's default formatter: floats to 6 places, everything else via str()
+  if values.dtype.kind == "f":
+    text = [f"{x:.6f}" for x in values]
+  else:
+    text = [str(x) for x in values]
+  return pd.Series([escape(t) for t in text], dtype=object)
+
+
+def _release_classes(release, within_days):
+  # Row class per Release Needed: overdue (before today), soon (within the window) or none
+  release = pd.to_datetime(release, errors="coerce").to_numpy()
+  today = np.datetime64(date.today())
+  window_end = np.datetime64(date.today() + timedelta(days=within_days))
+  classes = np.select(
+    [release < today, release <= window_end],
+    [' class="release-overdue"', ' class="release-soon"'],
+    "",
   )
+  return pd.Series(classes, dtype=object)
 
-  if highlight_release_within_days is not None and not display_df.empty:
-    today = date.today()
-    window_end = today + timedelta(days=highlight_release_within_days)
-
-    def highlight_release(row):
-      release_date = _coerce_date(row.get("Release Needed"))
-      if release_date is None:
-        return [""] * len(row)
-      if release_date < today:
-        return ["background-color: #f8d7da"] * len(row)
-      if release_date <= window_end:
-        return ["background-color: #fff3cd"] * len(row)
-      return [""] * len(row)
-
-    styler = styler.apply(highlight_release, axis=1)
-
-  if "Status" in display_df.columns:
-    def style_status(val):
-      if isinstance(val, str):
-        if val.startswith("🔴"):
-          return f"color: {status_color_map['Overdue']}; font-weight: 600;"
-        if val.startswith("🟡"):
-          return f"color: {status_color_map['At Risk']}; font-weight: 600;"
-        if val.startswith("🟢"):
-          return f"color: {status_color_map['On Track']}; font-weight: 600;"
-      return ""
-
-    styler = styler.applymap(style_status, subset=["Status"])
-
-  html = styler.to_html()
-  st.markdown("""<div class="table-container">""" + html + "</div>", unsafe_allow_html=True)
+
+def table_html(page, col_space=110, highlight_release_within_days=None, key="table"):
+  # HTML for one page of rows (the part render_styled_table sends to the browser)
+  page = page.reset_index(drop=True)
+  rows = pd.Series("<tr", index=page.index, dtype=object)
+  if highlight_release_within_days is not None and len(page) and "Release Needed" in page.columns:
+    rows = rows + _release_classes(page["Release Needed"], highlight_release_within_days)
+  rows = rows + ">"
+
+  for col in page.columns:
+    text = _format_column(page[col])
+    if col == "Status":
+      text = (page[col].map(STATUS_ICONS) + " " + text).fillna(text)
+      cells = ('<td class="' + page[col].map(STATUS_CLASSES) + '">').fillna("<td>")
+      rows = rows + cells + text + "</td>"
+    else:
+      rows = rows + "<td>" + text + "</td>"
+  rows = rows + "</tr>"
+
+  table_id = "tbl_" + "".join(ch if ch.isalnum() else "_" for ch in key)
+  head = "".join(f"<th>{escape(str(c))}</th>" for c in page.columns)
+  return (
+    f"<style>#{table_id} th, #{table_id} td {{ min-width: {col_space}px; white-space: nowrap; }}</style>"
+    f'<table id="{table_id}" class="styled-table"><thead><tr>{head}</tr></thead>'
+    f"<tbody>{''.join(rows)}</tbody></table>"
+  )
@@ -0,0 +1,251 @@
+import heapq
+
+import numpy as np
+
+from engine.schedule import FITUP_AFTER_MEP_WD, L3_LAG_WD, SHELL_TRIGGER_WD
+
+# ======================= Batched scheduling (NumPy, workday ordinals) =======================
+# The same rules as engine.schedule, evaluated on arrays of date ordinals so
+# that many samples (rows) and halls (columns) are scheduled in one pass.
+# Workday arithmetic is a lookup into the calendar's tables, so results are
+# identical to add_workdays date for date.
+
+
+class TableTooSmall(Exception):
+    pass
+
+
+class WorkdayTable:
+    """Snapshot of a WorkdayCalendar's tables for vectorized lookups."""
+
+    def __init__(self, calendar, first, last, workdays_per_week=5):
+        self.lo, self.days, self.cum = calendar.span(first, last, workdays_per_week)
+
+    def _check(self, idx, size):
+        if idx.size and (idx.min() < 0 or idx.max() >= size):
+            raise TableTooSmall()
+
+    def position(self, ords):
+        # Working days on or before each ordinal
+        i = np.asarray(ords) - self.lo
+        self._check(i, len(self.cum))
+        return self.cum[i]
+
+    def at_position(self, pos):
+        # Ordinal of the pos-th working day (1-based, as returned by position())
+        i = np.asarray(pos) - 1
+        self._check(i, len(self.days))
+        return self.days[i]
+
+    def add(self, ords, n):
+        # Vector add_workdays: n > 0 forward, n < 0 backward, n == 0 unchanged
+        ords, n = np.broadcast_arrays(np.asarray(ords, dtype=np.int64), np.asarray(n, dtype=np.int64))
+        out = ords.copy()
+        fwd = n > 0
+        if fwd.any():
+            out[fwd] = self.at_position(self.position(ords[fwd]) + n[fwd])
+        bwd = n < 0
+        if bwd.any():
+            out[bwd] = self.at_position(self.position(ords[bwd] - 1) + n[bwd] + 1)
+        return out
+
+
+def _per_row(v):
+    # (n,) per-row values -> (n, 1) so they broadcast across halls
+    return v[:, None] if v.ndim == 1 else v
+
+
+def building_arrays(table, gates, d):
+    # Building-level stages (site work through fitup) as (n,) ordinal arrays
+    add = table.add
+    civil_start = np.maximum(gates["ntp"], gates["ldp"])
+    civil_finish = add(civil_start, d["site_work"])
+    shell_start = np.maximum(add(civil_start, SHELL_TRIGGER_WD), gates["bp"])
+    shell_finish = add(shell_start, d["shell"])
+    dryin_wd = np.maximum(1, np.minimum(d["shell"], d["dryin_offset"]))
+    dryin_date = add(shell_start, dryin_wd)
+    mep_finish = shell_finish
+    mep_start = add(mep_finish, -d["mep_yard"])
+    fitup_start = np.maximum(dryin_date, add(mep_start, FITUP_AFTER_MEP_WD))
+    fitup_finish = add(fitup_start, d["fitup"])
+    return dict(
+        civil_start=civil_start, civil_finish=civil_finish,
+        shell_start=shell_start, shell_finish=shell_finish,
+        dryin_date=dryin_date, mep_start=mep_start, mep_finish=mep_finish,
+        fitup_start=fitup_start, fitup_finish=fitup_finish,
+    )
+
+
+def schedule_arrays(table, gates, durations, power_gate, temp_power=None):
+    """Schedule one building for a batch of rows.
+
+    ``gates`` maps ntp/ldp/bp to ordinal arrays of shape (n,); ``durations``
+    maps Durations field names to int arrays of shape (n,) (or scalars);
+    ``power_gate`` is the (n, halls) L5 power gate per hall and ``temp_power``
+    an optional (n,) temporary-power ordinal. Returns ordinal arrays: (n,) for
+    building stages, (n, halls) for hall stages.
+    """
+    d = {k: np.asarray(v, dtype=np.int64) for k, v in durations.items()}
+    out = building_arrays(table, gates, d)
+    fitup_finish = out["fitup_finish"]
+
+    power_gate = np.asarray(power_gate, dtype=np.int64)
+
+    # L3_i = max(A_i, L3_{i-1} + 5 WD) with A_i = max(fitup finish, L3/L4 power gate).
+    # In workday positions this is a running maximum: Q_i = 5i + cummax_j(P(A_j) - 5j).
+    temp_power = None if temp_power is None else _per_row(np.asarray(temp_power))
+    ready = hall_ready(fitup_finish[:, None], power_gate, temp_power)
+    halls = ready.shape[1]
+    L3_start = ready.copy()
+    if halls > 1:
+        lag = L3_LAG_WD * np.arange(halls)
+        q = lag + np.maximum.accumulate(table.position(ready) - lag, axis=1)
+        L3_start[:, 1:] = np.maximum(ready[:, 1:], table.at_position(q[:, :-1] + L3_LAG_WD))
+
+    out.update(hall_arrays(table, d, L3_start, power_gate))
+    return out
+
+
+def hall_ready(fitup_finish, power_gate, temp_power=None):
+    # Dates each hall's L3 could start: fitup finish and the L3/L4 power gate (temporary power
+    # where it comes first). Arguments broadcast against each other; -1 = no permanent power gate.
+    if temp_power is None:
+        gate_L34 = power_gate
+    else:
+        gate_L34 = np.where(power_gate >= 0, np.minimum(power_gate, temp_power), temp_power)
+    return np.maximum(fitup_finish, gate_L34)
+
+
+def hall_arrays(table, d, L3_start, power_gate):
+    # L3 finish through RFS from L3 starts, (n, halls) or one flat row of halls;
+    # durations are scalars, (n,) or shaped like the starts
+    add = table.add
+    L3_finish = add(L3_start, _per_row(d["L3"]))
+    L4_finish = add(L3_finish, _per_row(d["L4"]))
+    L5_start = np.maximum(L4_finish, power_gate)
+    L5_finish = add(L5_start, _per_row(d["L5"]))
+    return dict(
+        L3Start=L3_start, L3Finish=L3_finish, L4Start=L3_finish, L4Finish=L4_finish,
+        L5Start=L5_start, L5Finish=L5_finish, RFS=L5_finish,
+    )
+
+
+# ======================= Portfolio hall chain (ragged halls, one flat pass) =======================
+# Every hall of every building sits in one flat array, ordered by building and
+# then hall. The SS+5 running maximum is restarted per building by lifting each
+# building's values a full table span above the previous building's.
+
+
+def l3_chain(table, ready, rank, building):
+    """L3 start ordinals for flat ``ready`` ordinals; ``rank`` is the hall index within its building."""
+    lag = L3_LAG_WD * rank
+    span = len(table.cum) + int(lag.max(initial=0)) + 1
+    lift = building * span
+    q = lag + np.maximum.accumulate(table.position(ready) - lag + lift) - lift
+    prev = np.empty_like(q)
+    prev[1:] = q[:-1]
+    prev[:1] = 0
+    first = rank == 0
+    out = ready.copy()
+    out[~first] = np.maximum(ready[~first], table.at_position(prev[~first] + L3_LAG_WD))
+    return out
+
+
+# ======================= Shared commissioning crews (discrete events) =======================
+# With ProjectSpec.commissioning_crews set, L3/L4 is done by a fixed pool of
+# crews shared by every building: a crew takes a hall on its L3 start and is
+# free again on its L4 finish. Halls are released in the order they become
+# ready (ties: building, then hall), each taking the crew that frees up first,
+# so scheduling n halls costs O(n log n). A building's next hall is only
+# released once the previous one has started, keeping the SS+5 lag.
+
+
+def crew_chain(table, ready, rank, building, crews, busy_wd):
+    """(L3 start ordinals, 0-based crew per hall) for flat ``ready`` ordinals, as l3_chain but with ``crews`` crews.
+
+    ``busy_wd`` is the working days a crew spends per hall (L3 + L4). With at
+    least as many crews as halls the starts equal l3_chain's.
+    """
+    n = len(ready)
+    starts = np.empty(n, dtype=np.int64)
+    crew = np.empty(n, dtype=np.int64)
+    if not n:
+        return starts, crew
+    ready_ords = np.asarray(ready, dtype=np.int64).tolist()
+    ready_pos = table.position(ready).tolist()
+    days = table.days
+    rank, building = np.asarray(rank).tolist(), np.asarray(building).tolist()
+
+    # Halls waiting to start: (ready ordinal, building, flat index, ready position)
+    queue = [(ready_ords[i], building[i], i, ready_pos[i]) for i in range(n) if rank[i] == 0]
+    heapq.heapify(queue)
+    # Crews: (free from ordinal, position, crew)
+    free = [(-1, 0, c) for c in range(min(int(crews), n))]
+    try:
+        while queue:
+            ord_, b, i, pos = heapq.heappop(queue)
+            free_ord, free_pos, c = heapq.heappop(free)
+            if free_ord > ord_:
+                ord_, pos = free_ord, free_pos
+            starts[i], crew[i] = ord_, c
+            heapq.heappush(free, (int(days[pos + busy_wd - 1]), pos + busy_wd, c))
+            j = i + 1
+            if j < n and rank[j]:
+                lag_pos = pos + L3_LAG_WD
+                lag_ord = int(days[lag_pos - 1])
+                if lag_ord > ready_ords[j]:
+                    heapq.heappush(queue, (lag_ord, b, j, lag_pos))
+                else:
+                    heapq.heappush(queue, (ready_ords[j], b, j, ready_pos[j]))
+    except IndexError:
+        raise TableTooSmall() from None
+    return starts, crew
+
+
+def crew_chain_rows(table, ready, rank, building, crews, busy_wd):
+    """crew_chain for every row of (n, halls) ``ready`` at once; returns the (n, halls) L3 starts.
+
+    ``busy_wd`` is (n, halls). The queue holds at most one hall per building,
+    so each of the ``halls`` steps is an argmin over buildings and crews for
+    all rows together, with the same tie-breaking as crew_chain.
+    """
+    ready = np.asarray(ready, dtype=np.int64)
+    n, halls = ready.shape
+    starts = np.empty_like(ready)
+    if not halls:
+        return starts
+    rank, building = np.asarray(rank), np.asarray(building)
+    first = np.flatnonzero(rank == 0)
+    end = np.append(first[1:], halls)
+    rows = np.arange(n)
+    ready_pos = table.position(ready)
+    never = np.iinfo(np.int64).max
+
+    # Per row and building: the hall waiting to start, its ordinal and position
+    hall = np.tile(first, (n, 1))
+    wait_ord, wait_pos = ready[:, first].copy(), ready_pos[:, first].copy()
+    # Per row and crew: free from ordinal and position
+    free_ord = np.full((n, min(int(crews), halls)), -1, dtype=np.int64)
+    free_pos = np.zeros_like(free_ord)
+    for _ in range(halls):
+        b = wait_ord.argmin(axis=1)
+        i, ord_, pos = hall[rows, b], wait_ord[rows, b], wait_pos[rows, b]
+        c = free_ord.argmin(axis=1)
+        late = free_ord[rows, c] > ord_
+        ord_ = np.where(late, free_ord[rows, c], ord_)
+        pos = np.where(late, free_pos[rows, c], pos)
+        starts[rows, i] = ord_
+        free_pos[rows, c] = pos + busy_wd[rows, i]
+        free_ord[rows, c] = table.at_position(free_pos[rows, c])
+
+        j = i + 1
+        more = j < end[b]
+        nxt = np.where(more, j, i)
+        lag_pos = pos + L3_LAG_WD
+        lag_ord = np.full(n, never)
+        lag_ord[more] = table.at_position(lag_pos[more])
+        lagged = more & (lag_ord > ready[rows, nxt])
+        hall[rows, b] = nxt
+        wait_ord[rows, b] = np.where(more, np.where(lagged, lag_ord, ready[rows, nxt]), never)
+        wait_pos[rows, b] = np.where(lagged, lag_pos, ready_pos[rows, nxt])
+    return starts
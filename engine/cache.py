@@ -0,0 +1,96 @@
+import hashlib
+from datetime import date
+
+import pandas as pd
+
+from engine.frames import build_result
+from engine.lru import LRUCache
+from engine.montecarlo import simulate_rfs
+from engine.optimize import optimize_offset_tranches
+from engine.portfolio import csv_ready, schedule_portfolio
+
+# ======================= Input-hash result cache =======================
+# Reruns that don't change a scheduling input (tab switches, downloads, ...)
+# reuse the previous result. Entries are keyed by a canonical hash of the
+# ProjectSpec plus today's date, since equipment Status is relative to today.
+
+
+def spec_key(spec, *extra):
+    # Frozen dataclasses of dates/ints/floats/strings have a deterministic repr.
+    payload = repr((spec,) + extra).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+def frame_key(*parts):
+    # Content hash of DataFrames (None and plain values allowed), e.g. a Gantt frame and its milestones.
+    h = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, pd.DataFrame):
+            h.update(repr((list(part.columns), len(part))).encode("utf-8"))
+            h.update(pd.util.hash_pandas_object(part, index=False).to_numpy().tobytes())
+        else:
+            h.update(repr(part).encode("utf-8"))
+        h.update(b"|")
+    return h.hexdigest()
+
+
+RESULT_CACHE = LRUCache(max_entries=32)
+
+
+def cached_result(spec, cache=None):
+    """Schedule, equipment and display frames for ``spec``, reused across reruns."""
+    cache = RESULT_CACHE if cache is None else cache
+    key = spec_key(spec, date.today())
+    return cache.get_or_compute(key, lambda: build_result(spec))
+
+
+RISK_CACHE = LRUCache(max_entries=8)
+
+
+def cached_risk(spec, risk, cache=None):
+    """Monte Carlo RFS percentiles for ``spec`` under ``risk``, reused across reruns."""
+    cache = RISK_CACHE if cache is None else cache
+    return cache.get_or_compute(spec_key(spec, risk), lambda: simulate_rfs(spec, risk))
+
+
+OPTIMIZE_CACHE = LRUCache(max_entries=8)
+
+
+def cached_optimize(spec, targets, cache=None):
+    """optimize_offset_tranches for ``spec`` and ``targets`` (building name -> date), reused across reruns."""
+    cache = OPTIMIZE_CACHE if cache is None else cache
+    key = spec_key(spec, tuple(sorted(targets.items())))
+    return cache.get_or_compute(key, lambda: optimize_offset_tranches(spec, targets))
+
+
+PORTFOLIO_CACHE = LRUCache(max_entries=4)
+
+
+def cached_portfolio(spec, progress=None, cache=None):
+    """Portfolio-mode tables for ``spec``; ``progress(done, total)`` is only called on a miss."""
+    cache = PORTFOLIO_CACHE if cache is None else cache
+    key = spec_key(spec, date.today(), "portfolio")
+    return cache.get_or_compute(key, lambda: schedule_portfolio(spec, progress=progress))
+
+
+EXPORT_CACHE = LRUCache(max_entries=16)
+
+
+def _export_key(spec, name):
+    return (spec_key(spec, date.today()), name)
+
+
+def export_ready(spec, name, cache=None):
+    """True once the ``name`` export of ``spec`` has been built (and is still cached)."""
+    cache = EXPORT_CACHE if cache is None else cache
+    return cache.get(_export_key(spec, name)) is not None
+
+
+def cached_export(spec, name, build, cache=None):
+    """Bytes of one of ``spec``'s downloads; ``build()`` runs once per schedule."""
+    cache = EXPORT_CACHE if cache is None else cache
+    return cache.get_or_compute(_export_key(spec, name), build)
+
+
+def csv_bytes(df):
+    return csv_ready(df).to_csv(index=False).encode("utf-8")
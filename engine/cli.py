@@ -0,0 +1,94 @@
+"""Command-line RFS calculator (no Streamlit, Plotly or pandas).
+
+    python -m engine.cli project.json                  # both tables to stdout
+    python -m engine.cli project.json --table rfs      # just the RFS table
+    python -m engine.cli portfolio/*.json -o out/      # one pair of CSVs per project
+
+A project file is a CSV, JSON or YAML project definition (see engine.project);
+a file holding several definitions yields one project per record. The tables
+have the same columns as the app's CSV downloads.
+"""
+import argparse
+import csv
+import io
+import os
+import sys
+
+from engine.project import load_records, spec_from_inputs
+from engine.schedule import equipment_rows, rfs_rows, schedule_project
+
+# Same file names as the app's download buttons
+TABLES = {
+    "rfs": "rfs_multi_building.csv",
+    "equipment": "equipment_roj.csv",
+}
+
+
+def _cell(value):
+    return "" if value is None else value
+
+
+def write_csv(rows, fh):
+    if not rows:
+        return
+    writer = csv.writer(fh, lineterminator="\n")
+    writer.writerow(list(rows[0]))
+    for row in rows:
+        writer.writerow([_cell(v) for v in row.values()])
+
+
+def run_project(inputs):
+    spec = spec_from_inputs(inputs)
+    buildings = schedule_project(spec)
+    return {
+        "rfs": rfs_rows(buildings),
+        "equipment": equipment_rows(spec, buildings),
+    }
+
+
+def _projects(paths):
+    for path in paths:
+        records = load_records(path)
+        stem = os.path.splitext(os.path.basename(path))[0]
+        for i, record in enumerate(records, start=1):
+            name = record.get("project") or record.get("scenario_id") or (stem if len(records) == 1 else f"{stem}_{i}")
+            yield str(name), {k: v for k, v in record.items() if k not in ("project", "scenario_id")}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compute RFS and equipment ROJ tables for project definition files.")
+    parser.add_argument("projects", nargs="+", help="CSV, JSON or YAML project definitions")
+    parser.add_argument("--table", choices=("rfs", "equipment", "both"), default="both")
+    parser.add_argument("-o", "--output-dir", help="Write <project>_<table>.csv files here instead of stdout")
+    args = parser.parse_args(argv)
+
+    tables = list(TABLES) if args.table == "both" else [args.table]
+    try:
+        projects = list(_projects(args.projects))
+    except (ImportError, ValueError) as exc:
+        parser.error(str(exc))
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    for name, inputs in projects:
+        try:
+            result = run_project(inputs)
+        except ValueError as exc:
+            parser.error(f"{name}: {exc}")
+        for table in tables:
+            if args.output_dir:
+                filename = TABLES[table] if len(projects) == 1 else f"{name}_{TABLES[table]}"
+                with open(os.path.join(args.output_dir, filename), "w", newline="", encoding="utf-8") as fh:
+                    write_csv(result[table], fh)
+            else:
+                if len(projects) > 1 or len(tables) > 1:
+                    sys.stdout.write(f"# {name}: {TABLES[table]}\n")
+                buf = io.StringIO()
+                write_csv(result[table], buf)
+                sys.stdout.write(buf.getvalue())
+                if len(tables) > 1:
+                    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
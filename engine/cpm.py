@@ -0,0 +1,331 @@
+import numpy as np
+import pandas as pd
+
+from engine.batched import WorkdayTable
+from engine.schedule import FITUP_AFTER_MEP_WD, L3_LAG_WD, SHELL_TRIGGER_WD
+
+from utils.workdays import dates_from_ordinals
+
+# ======================= Critical path (CPM) =======================
+# The schedule as an activity-on-node network. Gates are milestones fixed to
+# their dates, stages are activities lasting a number of working days, and
+# every rule of schedule_building is a precedence link (FS/SS/FF plus a lag in
+# working days). The forward pass over the topological order reproduces the
+# schedule's dates; the backward pass starts from each building's last RFS, so
+# total float is how many working days an activity can slip before that
+# building's last hall is late. Both passes work in workday positions
+# (WorkdayTable), so every link costs O(1) and the network O(nodes + links).
+
+FS, SS, FF = "FS", "SS", "FF"
+
+GATE_LABELS = {
+    "ntp": "Notice to Proceed",
+    "ldp": "Land Disturbance Permit",
+    "bp": "Building Permit",
+    "perm_power": "Permanent Power",
+    "temp_power": "Temporary Power",
+}
+FLOAT_COLUMNS = ["Total Float (WD)", "Critical", "Driving Gate"]
+ACTIVITY_COLUMNS = [
+    "Building Name", "Hall", "Activity", "Duration (WD)", "Early Start", "Early Finish",
+    "Late Start", "Late Finish", "Total Float (WD)", "Critical", "Driven By",
+]
+
+
+class Network:
+    """Activities (durations in working days) and precedence links between them."""
+
+    def __init__(self):
+        self.names = []
+        self.durations = []
+        self.fixed = []      # date ordinal of a gate milestone, None for activities
+        self.preds = []      # per node: [(pred, kind, lag)]
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, name, duration=0, fixed=None):
+        self.names.append(name)
+        self.durations.append(int(duration))
+        self.fixed.append(fixed)
+        self.preds.append([])
+        return len(self.names) - 1
+
+    def link(self, pred, succ, kind=FS, lag=0):
+        self.preds[succ].append((pred, kind, int(lag)))
+
+    def order(self):
+        # Kahn's algorithm over the links
+        succs = [[] for _ in self.names]
+        indegree = [len(p) for p in self.preds]
+        for i, preds in enumerate(self.preds):
+            for p, _, _ in preds:
+                succs[p].append(i)
+        ready = [i for i, n in enumerate(indegree) if n == 0]
+        order = []
+        while ready:
+            i = ready.pop()
+            order.append(i)
+            for s in succs[i]:
+                indegree[s] -= 1
+                if not indegree[s]:
+                    ready.append(s)
+        if len(order) != len(self.names):
+            raise ValueError("Cycle in schedule network")
+        return order
+
+    def solve(self, table):
+        """Early/late positions, early ordinals and driving predecessors of every node.
+
+        Nodes without successors are the network's ends; their late finish is
+        their early finish. Links compare workday positions, where adding N
+        working days is +N.
+        """
+        n = len(self.names)
+        lo, days, cum = table.lo, table.days.tolist(), table.cum.tolist()
+        dur = self.durations
+        es_pos, ef_pos, es_ord, ef_ord = [0] * n, [0] * n, [0] * n, [0] * n
+        driver = [-1] * n
+        order = self.order()
+
+        for i in order:
+            if self.fixed[i] is not None:
+                es_ord[i] = ef_ord[i] = self.fixed[i]
+                es_pos[i] = ef_pos[i] = cum[self.fixed[i] - lo]
+                continue
+            best_ord = best_pos = None
+            for p, kind, lag in self.preds[i]:
+                if kind == SS:
+                    pos, ord_, shift = es_pos[p], es_ord[p], lag
+                elif kind == FF:
+                    pos, ord_, shift = ef_pos[p], ef_ord[p], lag - dur[i]
+                else:
+                    pos, ord_, shift = ef_pos[p], ef_ord[p], lag
+                if shift:
+                    pos += shift
+                    ord_ = days[pos - 1]
+                if best_ord is None or ord_ > best_ord:
+                    best_ord, best_pos, driver[i] = ord_, pos, p
+            if best_ord is None:
+                raise ValueError(f"'{self.names[i]}' has neither a date nor a predecessor")
+            es_ord[i], es_pos[i] = best_ord, best_pos
+            ef_pos[i] = best_pos + dur[i]
+            ef_ord[i] = days[ef_pos[i] - 1] if dur[i] else best_ord
+
+        lf_pos = self._backward(order, [None] * n, ef_pos)
+        es_pos, ef_pos, lf_pos = np.array(es_pos), np.array(ef_pos), np.array(lf_pos)
+        ls_pos = lf_pos - np.array(dur)
+        es_ord, ef_ord = np.array(es_ord), np.array(ef_ord)
+        # Late dates equal to the early position keep the early date (a gate on a weekend)
+        ls_ord = np.where(ls_pos == es_pos, es_ord, table.at_position(ls_pos))
+        lf_ord = np.where(lf_pos == ef_pos, ef_ord, table.at_position(lf_pos))
+        return {
+            "es": es_ord, "ef": ef_ord, "ls": ls_ord, "lf": lf_ord,
+            "float": ls_pos - es_pos, "driver": np.array(driver), "order": order,
+        }
+
+
+    def _backward(self, order, lf_pos, ends=None):
+        # Late finish positions in reverse topological order. A node still without
+        # one when reached is an end: pinned to ``ends[i]``, or left unconstrained
+        # (None) without ``ends``.
+        dur = self.durations
+        for i in reversed(order):
+            if lf_pos[i] is None:
+                if ends is None:
+                    continue
+                lf_pos[i] = ends[i]
+            ls = lf_pos[i] - dur[i]
+            for p, kind, lag in self.preds[i]:
+                if kind == SS:
+                    cand = ls - lag + dur[p]
+                elif kind == FF:
+                    cand = lf_pos[i] - lag
+                else:
+                    cand = ls - lag
+                if lf_pos[p] is None or cand < lf_pos[p]:
+                    lf_pos[p] = cand
+        return lf_pos
+
+    def latest(self, table, deadlines):
+        """Late finish positions (None = unconstrained) for ``deadlines``: node -> latest finish ordinal.
+
+        Only the backward pass runs, so the deadlines need not be feasible for
+        the gates' current dates.
+        """
+        lf_pos = [None] * len(self.names)
+        for node, ord_ in deadlines.items():
+            pos = int(table.position(ord_))
+            lf_pos[node] = pos if lf_pos[node] is None else min(lf_pos[node], pos)
+        return self._backward(self.order(), lf_pos)
+
+
+def _gate_ords(spec, store):
+    # Per building: gate ordinals shifted by the building offset (-1 = no gate)
+    g = spec.gates
+    offset = np.arange(len(store), dtype=np.int64) * int(spec.building_offset)
+    return {k: (getattr(g, k).toordinal() + offset) if getattr(g, k) else np.full(len(store), -1)
+            for k in GATE_LABELS}
+
+
+def schedule_network(spec, store, temp_for_l3=False):
+    """(network, node info, hall nodes) for a scheduled store: a node per gate, building stage and hall stage.
+
+    ``node info`` is (building index or -1, hall number or 0, label) per node and
+    ``hall nodes`` the (L3, L4, L5) nodes of every row of ``store.halls``.
+
+    Links follow schedule_building: Site Work after NTP and LDP, Shell SS+80
+    after Site Work and after the building permit, Dry-In SS after Shell, MEP
+    Yard FF with Shell, Fitup after Dry-In and SS+40 after MEP Yard, each hall's
+    L3 after Fitup, its L3/L4 power gate and SS+5 after the previous hall, L4
+    after L3 and L5 after L4 and its power gates. With shared crews a hall's L3
+    also follows the L4 of the crew's previous hall. Only the power gates that
+    actually applied are linked (temporary power where it came first), unless
+    ``temp_for_l3``: then temporary power, when set, gates every L3 and the
+    permanent and tranche gates only L5.
+    """
+    dur = spec.durations
+    b, h = store.buildings, store.halls
+    gates = _gate_ords(spec, store)
+    net = Network()
+    info = []
+
+    def add(building, hall, label, duration=0, fixed=None):
+        info.append((building, hall, label))
+        return net.add(label, duration, fixed)
+
+    tranche_nodes = {}
+    hall_nodes = np.empty((len(h), 3), dtype=np.int64)
+    temp_ords = gates["temp_power"]
+    for i in range(len(store)):
+        gate = {}
+
+        def gate_node(key):
+            if key not in gate:
+                gate[key] = add(i, 0, GATE_LABELS[key], fixed=int(gates[key][i]))
+            return gate[key]
+
+        site = add(i, 0, "Site Work", dur.site_work)
+        net.link(gate_node("ntp"), site)
+        net.link(gate_node("ldp"), site)
+        shell = add(i, 0, "Shell", dur.shell)
+        net.link(site, shell, SS, SHELL_TRIGGER_WD)
+        net.link(gate_node("bp"), shell)
+        dryin = add(i, 0, "Dry‑In")
+        net.link(shell, dryin, SS, max(1, min(dur.shell, int(round(dur.dryin_offset)))))
+        mep = add(i, 0, "MEP Yard", dur.mep_yard)
+        net.link(shell, mep, FF)
+        complete = add(i, 0, "Last RFS")
+        net.link(site, complete)
+        net.link(mep, complete)
+        first, count = int(b["first_hall"][i]), int(b["halls_count"][i])
+        if not count:
+            net.link(dryin, complete)
+            continue
+        fitup = add(i, 0, "Fitup", dur.fitup)
+        net.link(dryin, fitup)
+        net.link(mep, fitup, SS, FITUP_AFTER_MEP_WD)
+        prev = None
+        for k in range(first, first + count):
+            hall = int(h["hall"][k])
+            power = []
+            if h["PowerTranche"][k] > 0:
+                t = int(h["PowerTranche"][k])
+                if t not in tranche_nodes:
+                    tranche_nodes[t] = add(-1, 0, f"Power Tranche {t}", fixed=int(h["PowerDelivery"][k]))
+                power.append(tranche_nodes[t])
+            if gates["perm_power"][i] >= 0:
+                power.append(gate_node("perm_power"))
+            power_gate = int(h["PowerGate"][k])
+            l3 = add(i, hall, "L3", dur.L3)
+            net.link(fitup, l3)
+            if temp_ords[i] >= 0 and (temp_for_l3 or power_gate < 0 or temp_ords[i] < power_gate):
+                net.link(gate_node("temp_power"), l3)
+            else:
+                for p in power:
+                    net.link(p, l3)
+            if prev is not None:
+                net.link(prev, l3, SS, L3_LAG_WD)
+            l4 = add(i, hall, "L4", dur.L4)
+            net.link(l3, l4)
+            l5 = add(i, hall, "L5", dur.L5)
+            net.link(l4, l5)
+            for p in power:
+                net.link(p, l5)
+            net.link(l5, complete)
+            hall_nodes[k] = (l3, l4, l5)
+            prev = l3
+
+    if len(h) and (h["Crew"] > 0).any():
+        # Each crew's halls in start order: L3 waits for the crew's previous L4
+        crew = h["Crew"].astype(np.int64)
+        for k_prev, k in _crew_pairs(crew, h["L3Start"]):
+            net.link(int(hall_nodes[k_prev, 1]), int(hall_nodes[k, 0]))
+    return net, info, hall_nodes
+
+
+def _crew_pairs(crew, starts):
+    order = np.lexsort((starts, crew))
+    order = order[crew[order] > 0]
+    same = crew[order[1:]] == crew[order[:-1]]
+    return zip(order[:-1][same].tolist(), order[1:][same].tolist())
+
+
+def _table(spec, store):
+    b, h = store.buildings, store.halls
+    first = min(int(v[v >= 0].min()) for v in _gate_ords(spec, store).values() if (v >= 0).any())
+    last = max([int(b[f].max()) for f in ("civil_finish", "shell_finish", "fitup_finish")] + [int(h["L5Finish"].max(initial=0))])
+    return WorkdayTable(spec.calendar, first - 14, max(first, last) + 14, spec.construction_workdays)
+
+
+def critical_path(spec, store):
+    """(activities, hall floats) of the schedule's CPM network.
+
+    ``activities`` has one row per gate, building stage and hall stage with early
+    and late dates, total float in working days, a critical flag and the
+    predecessor that drove its early start. ``hall floats`` is aligned with
+    ``store.halls`` and holds FLOAT_COLUMNS: the float of each hall's L5 (how far
+    its RFS can slip before the building's last RFS does), whether it is
+    critical, and the gate at the start of its driving chain.
+    """
+    if not len(store):
+        return pd.DataFrame(columns=ACTIVITY_COLUMNS), pd.DataFrame(columns=FLOAT_COLUMNS)
+    net, info, hall_nodes = schedule_network(spec, store)
+    out = net.solve(_table(spec, store))
+    driver = out["driver"]
+
+    # Gate at the root of each node's driving chain, in topological order
+    root = np.arange(len(net))
+    for i in out["order"]:
+        if driver[i] >= 0:
+            root[i] = root[driver[i]]
+    building, hall, label = (list(c) for c in zip(*info))
+    names = store.names.tolist()
+
+    def describe(node, own_building):
+        # Nodes of another building carry its name (shared crews); campus tranches never do
+        text = f"Hall {hall[node]} {label[node]}" if hall[node] else label[node]
+        return text if building[node] in (-1, own_building) else f"{names[building[node]]} {text}"
+
+    total_float = out["float"]
+    activities = pd.DataFrame({
+        "Building Name": [names[i] if i >= 0 else None for i in building],
+        "Hall": pd.array([j or None for j in hall], dtype="Int64"),
+        "Activity": label,
+        "Duration (WD)": net.durations,
+        "Early Start": dates_from_ordinals(out["es"]),
+        "Early Finish": dates_from_ordinals(out["ef"]),
+        "Late Start": dates_from_ordinals(out["ls"]),
+        "Late Finish": dates_from_ordinals(out["lf"]),
+        "Total Float (WD)": total_float,
+        "Critical": total_float == 0,
+        "Driven By": [None if d < 0 else describe(d, b) for d, b in zip(driver.tolist(), building)],
+    }, columns=ACTIVITY_COLUMNS)
+
+    l5 = hall_nodes[:, 2]
+    floats = pd.DataFrame({
+        "Total Float (WD)": total_float[l5],
+        "Critical": total_float[l5] == 0,
+        "Driving Gate": [describe(r, hb) for r, hb in zip(root[l5].tolist(), store.halls["building"].tolist())],
+    }, columns=FLOAT_COLUMNS)
+    return activities, floats
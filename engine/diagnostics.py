@@ -0,0 +1,120 @@
+"""Per-rerun stage timings, payload sizes and an optional cProfile capture.
+
+The app starts a RunTimer at the top of the script, marks a lap after each
+section and finishes it at the end. Code further down (build_result, the table
+and chart components) records into whichever timer is current for the thread,
+and does nothing when there is none, so the engine stays usable headless.
+
+Every finished run is logged as one JSON line on the ``rfs.timing`` logger:
+
+    {"event": "rerun", "session": "...", "total_ms": 412.3,
+     "stages": {"css": 1.2, "schedule": 80.4, ...}, "payload_bytes": {"table:rfs": 21548}}
+"""
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger("rfs.timing")
+if not logger.handlers:
+    # One bare JSON object per line on stderr, whatever the root logging config is
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(os.environ.get("RFS_TIMING_LOG", "INFO").upper())
+    logger.propagate = False
+
+PROFILE_TOP = 25
+
+_local = threading.local()
+
+
+class RunTimer:
+    """Stage timings (ms) and payload sizes (bytes) for one script run."""
+
+    def __init__(self, session=None, profile=False, measure_payloads=False):
+        self.session = session
+        self.measure_payloads = measure_payloads
+        self.stages = {}
+        self.payloads = {}
+        self.profile_text = None
+        self._start = self._lap = time.perf_counter()
+        self._profiler = cProfile.Profile() if profile else None
+        if self._profiler is not None:
+            self._profiler.enable()
+
+    def lap(self, name):
+        # Time since the previous lap (or the start) is booked to ``name``
+        now = time.perf_counter()
+        self.stages[name] = self.stages.get(name, 0.0) + (now - self._lap) * 1e3
+        self._lap = now
+
+    @contextmanager
+    def stage(self, name):
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + (time.perf_counter() - t) * 1e3
+
+    def payload(self, name, nbytes):
+        self.payloads[name] = self.payloads.get(name, 0) + int(nbytes)
+
+    def finish(self):
+        """Stop the timer and profiler, log the run and return it as a dict."""
+        if getattr(_local, "timer", None) is self:
+            _local.timer = None
+        if self._profiler is not None:
+            self._profiler.disable()
+            out = io.StringIO()
+            pstats.Stats(self._profiler, stream=out).sort_stats("cumulative").print_stats(PROFILE_TOP)
+            self.profile_text = out.getvalue()
+            self._profiler = None
+        record = {
+            "event": "rerun",
+            "session": self.session,
+            "total_ms": round((time.perf_counter() - self._start) * 1e3, 2),
+            "stages": {k: round(v, 2) for k, v in self.stages.items()},
+            "payload_bytes": dict(self.payloads),
+        }
+        logger.info(json.dumps(record))
+        return record
+
+
+def start_run(session=None, profile=False, measure_payloads=False):
+    """A new RunTimer, current for this thread until it is finished."""
+    timer = RunTimer(session, profile, measure_payloads)
+    _local.timer = timer
+    return timer
+
+
+def current():
+    return getattr(_local, "timer", None)
+
+
+@contextmanager
+def stage(name):
+    # Times the block into the current run, if any
+    timer = current()
+    if timer is None:
+        yield
+        return
+    with timer.stage(name):
+        yield
+
+
+def record_payload(name, nbytes):
+    timer = current()
+    if timer is not None:
+        timer.payload(name, nbytes)
+
+
+def measuring_payloads():
+    # Whether callers should pay for measuring payloads that are not free (e.g. serializing a figure)
+    timer = current()
+    return timer is not None and timer.measure_payloads
@@ -0,0 +1,161 @@
+"""Workbook and Parquet exports of a schedule.
+
+The XLSX export has one sheet each for RFS, Equipment, Gantt (per-building
+phase windows) and Inputs. It is written with openpyxl's write-only mode: rows
+are streamed to the sheets chunk by chunk, so a large portfolio never needs the
+whole workbook in memory. Parquet needs pyarrow; both libraries are imported
+on use.
+"""
+import io
+import itertools
+import zipfile
+from dataclasses import asdict, fields
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from engine.store import RFS_COLUMNS, window_frame
+
+from utils.building import EQUIPMENT_COLUMNS
+
+GANTT_COLUMNS = ["Building Name", "Phase", "Start", "Finish"]
+SHEETS = {
+    "RFS": RFS_COLUMNS,
+    "Equipment": EQUIPMENT_COLUMNS,
+    "Gantt": GANTT_COLUMNS,
+}
+XLSX_MAX_ROWS = 1_048_576  # per sheet, header included; longer tables continue on "<Sheet> 2", ...
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+# ===== Sheets =====
+def sheet_tables(rfs, equipment, windows, datetimes=False):
+    # Sheet name -> frame for one chunk; ``windows`` is ScheduleStore.phase_windows()
+    return {"RFS": rfs, "Equipment": equipment, "Gantt": window_frame(windows, datetimes)}
+
+
+def input_rows(spec):
+    """(Input, Value) rows for the Inputs sheet, followed by the building list."""
+    rows = [("Input", "Value")]
+    rows += [(f.name, getattr(spec.gates, f.name)) for f in fields(spec.gates)]
+    rows += [(f"Tranche {i} Delivery", d) for i, d in enumerate(spec.power_tranches, start=1)]
+    rows += [(f"Tranche {i} Capacity (MW)", mw) for i, mw in enumerate(spec.power_tranche_mw, start=1)]
+    rows += list(asdict(spec.durations).items())
+    rows += [
+        ("building_offset", spec.building_offset),
+        ("commissioning_crews", spec.commissioning_crews),
+        ("country", spec.country),
+        ("construction_workdays", spec.construction_workdays),
+        ("admin_workdays", spec.admin_workdays),
+    ]
+    rows += [(), ("Building Name", "Halls", "MW (total)")]
+    rows += [(b.name, b.halls, b.mw_total) for b in spec.buildings]
+    return rows
+
+
+# ===== XLSX =====
+def _cell(value):
+    # numpy scalars / Timestamps -> plain Python values openpyxl can write
+    if value is None or value is pd.NaT:
+        return None
+    if isinstance(value, (pd.Timestamp, datetime)):
+        return value.date()
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+
+def _frame_rows(df):
+    columns = []
+    for c in df.columns:
+        values = df[c]
+        if str(values.dtype).startswith("datetime64"):
+            values = values.dt.date.astype(object).where(values.notna(), None)
+        columns.append(values.tolist())
+    for row in zip(*columns):
+        yield [_cell(v) for v in row]
+
+
+class _SheetWriter:
+    # Appends header + rows to a write-only sheet, continuing on a new sheet at XLSX_MAX_ROWS
+    def __init__(self, workbook, title, columns):
+        self.workbook, self.title, self.columns = workbook, title, columns
+        self.part = 0
+        self._next_sheet()
+
+    def _next_sheet(self):
+        self.part += 1
+        self.sheet = self.workbook.create_sheet(self.title if self.part == 1 else f"{self.title} {self.part}")
+        self.sheet.append(self.columns)
+        self.rows = 1
+
+    def append(self, row):
+        if self.rows >= XLSX_MAX_ROWS:
+            self._next_sheet()
+        self.sheet.append(row)
+        self.rows += 1
+
+
+def write_xlsx(fh, spec, chunks):
+    """Stream ``chunks`` (dicts of sheet name -> DataFrame) plus the inputs to an XLSX file or buffer."""
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    # Headers come from the first chunk, which may carry extra columns (e.g. the RFS floats)
+    chunks = iter(chunks)
+    first = next(chunks, {})
+    writers = {
+        name: _SheetWriter(wb, name, list(first[name].columns) if name in first else columns)
+        for name, columns in SHEETS.items()
+    }
+    for chunk in itertools.chain([first], chunks):
+        for name, df in chunk.items():
+            for row in _frame_rows(df):
+                writers[name].append(row)
+    inputs = wb.create_sheet("Inputs")
+    for row in input_rows(spec):
+        inputs.append([_cell(v) for v in row])
+    wb.save(fh)
+
+
+def xlsx_bytes(spec, chunks):
+    buf = io.BytesIO()
+    write_xlsx(buf, spec, chunks)
+    return buf.getvalue()
+
+
+# ===== Parquet =====
+def parquet_zip_bytes(tables):
+    """Zip of one Parquet file per table (name -> DataFrame); needs pyarrow."""
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_STORED) as zf:
+        for name, df in tables.items():
+            part = io.BytesIO()
+            df.to_parquet(part, index=False)
+            zf.writestr(f"{name}.parquet", part.getvalue())
+    return buf.getvalue()
+
+
+class ParquetChunkWriter:
+    """Appends DataFrame chunks to one Parquet file per table (the portfolio CLI's --format parquet)."""
+
+    def __init__(self, paths):
+        self.paths = paths
+        self.writers = {}
+
+    def write(self, name, df):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        writer = self.writers.get(name)
+        if writer is None:
+            writer = self.writers[name] = pq.ParquetWriter(self.paths[name], table.schema)
+        writer.write_table(table.cast(writer.schema))
+
+    def close(self):
+        for writer in self.writers.values():
+            writer.close()
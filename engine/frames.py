@@ -0,0 +1,58 @@
+from dataclasses import dataclass
+from typing import List, Optional
+
+import pandas as pd
+
+from engine.cpm import critical_path
+from engine.diagnostics import stage
+from engine.power import allocate_halls, energized_curve
+from engine.store import ScheduleStore, crew_report, schedule_store
+
+# ======================= Display frames built from a schedule =======================
+
+
+@dataclass
+class ScheduleResult:
+    # Shared between reruns by the result cache: treat every field as read-only.
+    buildings: List[dict]  # building-level milestones for the KPI cards
+    rfs: pd.DataFrame  # RFS_COLUMNS + cpm.FLOAT_COLUMNS
+    equipment: pd.DataFrame
+    gantt: pd.DataFrame
+    milestones: Optional[pd.DataFrame]
+    store: ScheduleStore
+    tranches: pd.DataFrame  # PowerAllocator.report()
+    energized: pd.DataFrame  # cumulative MW by power gate date
+    over_capacity_mw: float = 0.0
+    crews: Optional[pd.DataFrame] = None  # crew_report(); None with unlimited crews
+    network: Optional[pd.DataFrame] = None  # critical_path() activities
+
+
+def build_result(spec):
+    with stage("schedule.store"):
+        store = schedule_store(spec)
+    with stage("schedule.equipment"):
+        equipment = store.equipment_frame(spec)
+    with stage("schedule.frames"):
+        gdf, milestone_df = store.gantt_frames()
+        buildings, rfs = store.building_records(), store.rfs_frame()
+    with stage("schedule.power"):
+        _, allocator = allocate_halls(spec)
+        tranches, energized = allocator.report(), energized_curve(store)
+    with stage("schedule.crews"):
+        crews = crew_report(spec, store)
+    with stage("schedule.cpm"):
+        network, floats = critical_path(spec, store)
+        rfs = pd.concat([rfs, floats], axis=1)
+    return ScheduleResult(
+        buildings=buildings,
+        rfs=rfs,
+        equipment=equipment,
+        gantt=gdf,
+        milestones=milestone_df,
+        store=store,
+        tranches=tranches,
+        energized=energized,
+        over_capacity_mw=allocator.over_capacity_mw,
+        crews=crews,
+        network=network,
+    )
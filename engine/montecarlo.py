@@ -0,0 +1,185 @@
+from dataclasses import dataclass, field, fields
+from datetime import date
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from engine.batched import (
+    TableTooSmall, WorkdayTable, building_arrays, crew_chain_rows, hall_arrays, hall_ready, schedule_arrays,
+)
+from engine.power import allocate_halls, tranche_order
+from engine.schedule import schedule_project
+from engine.spec import Durations
+
+# ======================= Monte Carlo RFS risk =======================
+# Durations are drawn from triangular distributions scaled around the
+# slider values; permits and power can optionally slip by a triangular number
+# of calendar days. Every draw goes through the batched scheduler, so the
+# whole simulation is a handful of NumPy operations per building. With shared
+# commissioning crews every building's halls go through one crew pool, one
+# step per hall for all iterations at once (crew_chain_rows).
+
+RISK_DURATIONS = ("site_work", "shell", "mep_yard", "fitup", "L3", "L4", "L5")
+PERCENTILES = (50, 80, 90)
+
+
+@dataclass(frozen=True)
+class Triangular:
+    low: float
+    mode: float
+    high: float
+
+    def sample(self, rng, size, scale=1.0):
+        low, mode, high = self.low * scale, self.mode * scale, self.high * scale
+        if high <= low:
+            return np.full(size, mode, dtype=float)
+        return rng.triangular(low, min(max(mode, low), high), high, size)
+
+
+@dataclass(frozen=True)
+class RiskSpec:
+    iterations: int = 10_000
+    # Multipliers applied to each duration in RISK_DURATIONS
+    duration_spread: Triangular = Triangular(0.9, 1.0, 1.25)
+    # Per-duration overrides, e.g. (("shell", Triangular(0.95, 1.0, 1.4)),)
+    duration_overrides: Tuple[Tuple[str, Triangular], ...] = ()
+    # Calendar-day slips; None disables. Permit slip applies to LDP and BP of
+    # each building, power slip to each building's permanent power and to each tranche.
+    permit_slip_days: Optional[Triangular] = None
+    power_slip_days: Optional[Triangular] = None
+    seed: Optional[int] = None
+
+
+@dataclass
+class RiskResult:
+    halls: pd.DataFrame
+    buildings: pd.DataFrame
+    # RFS ordinals per iteration, one (iterations, halls) array per building
+    rfs_samples: list = field(repr=False)
+
+
+def _sample_durations(spec, risk, rng):
+    spreads = dict(risk.duration_overrides)
+    out = {}
+    for f in fields(Durations):
+        base = getattr(spec.durations, f.name)
+        if f.name not in RISK_DURATIONS:
+            out[f.name] = np.full(risk.iterations, base, dtype=np.int64)
+            continue
+        dist = spreads.get(f.name, risk.duration_spread)
+        out[f.name] = np.maximum(1, np.rint(dist.sample(rng, risk.iterations, base))).astype(np.int64)
+    return out
+
+
+def _slip(dist, rng, size):
+    if dist is None:
+        return np.zeros(size, dtype=np.int64)
+    return np.rint(dist.sample(rng, size)).astype(np.int64)
+
+
+def _hall_tranches(spec):
+    # Tranche rank per hall, assigned in building order exactly like the deterministic run
+    idx, _ = allocate_halls(spec)
+    return np.split(idx, np.cumsum([max(int(b.halls), 0) for b in spec.buildings])[:-1])
+
+
+def _simulate(spec, risk, table):
+    rng = np.random.default_rng(risk.seed)
+    n = risk.iterations
+    g = spec.gates
+
+    # Tranches in allocation order; each slips on its own and keeps its rank, so a hall
+    # stays on its tranche even when slips reorder the deliveries
+    tranches = np.array([spec.power_tranches[i].toordinal() for i in tranche_order(spec.power_tranches)], dtype=np.int64)
+    if tranches.size:
+        tranche_ords = tranches[None, :] + _slip(risk.power_slip_days, rng, (n, tranches.size))
+    hall_tranches = _hall_tranches(spec)
+
+    samples, pending = [], []
+    for i in range(len(spec.buildings)):
+        offset = i * int(spec.building_offset)
+        durations = _sample_durations(spec, risk, rng)
+        gates = {
+            "ntp": np.full(n, g.ntp.toordinal() + offset),
+            "ldp": g.ldp.toordinal() + offset + _slip(risk.permit_slip_days, rng, n),
+            "bp": g.bp.toordinal() + offset + _slip(risk.permit_slip_days, rng, n),
+        }
+        perm = g.perm_power.toordinal() + offset + _slip(risk.power_slip_days, rng, n)
+        idx = hall_tranches[i]
+        if tranches.size and idx.size:
+            power_gate = np.maximum(perm[:, None], tranche_ords[:, idx])
+        else:
+            power_gate = np.repeat(perm[:, None], idx.size, axis=1)
+        temp = np.full((n, 1), g.temp_power.toordinal() + offset) if g.temp_power else None
+        if spec.commissioning_crews:
+            # The crews are shared, so L3 waits until every building's halls are ready
+            fitup_finish = building_arrays(table, gates, durations)["fitup_finish"]
+            pending.append((durations, power_gate, hall_ready(fitup_finish[:, None], power_gate, temp)))
+        else:
+            out = schedule_arrays(table, gates, durations, power_gate, temp)
+            samples.append(out["RFS"])
+    if pending:
+        samples = _crew_samples(spec, table, pending)
+    return samples
+
+
+def _crew_samples(spec, table, pending):
+    # The halls of every building share one crew pool (engine.batched.crew_chain_rows)
+    counts = [p[1].shape[1] for p in pending]
+    building = np.repeat(np.arange(len(counts)), counts)
+    rank = np.arange(len(building)) - np.repeat(np.cumsum(counts) - counts, counts)
+    ready = np.concatenate([p[2] for p in pending], axis=1)
+    busy = np.concatenate([
+        np.repeat((d["L3"] + d["L4"])[:, None], c, axis=1) for (d, _, _), c in zip(pending, counts)
+    ], axis=1)
+    L3_start = crew_chain_rows(table, ready, rank, building, spec.commissioning_crews, busy)
+    starts = np.split(L3_start, np.cumsum(counts)[:-1], axis=1)
+    return [hall_arrays(table, d, s, power_gate)["RFS"] for (d, power_gate, _), s in zip(pending, starts)]
+
+
+def _to_date(ordinal):
+    return date.fromordinal(int(ordinal))
+
+
+def simulate_rfs(spec, risk=RiskSpec()):
+    """RFS percentiles per hall and per building under duration and gate uncertainty."""
+    gate_ords = [d.toordinal() for d in (spec.gates.ntp, spec.gates.ldp, spec.gates.bp, spec.gates.perm_power)]
+    first = min(gate_ords) - 2 * 366
+    span = 3 * 366 + len(spec.buildings) * int(spec.building_offset)
+    if spec.commissioning_crews:
+        # Calendar days the crews need for every hall's L3 + L4, with room for the spread
+        halls = sum(max(int(b.halls), 0) for b in spec.buildings)
+        span += 2 * halls * (spec.durations.L3 + spec.durations.L4) // int(spec.commissioning_crews)
+    while True:
+        table = WorkdayTable(spec.calendar, first, max(gate_ords) + span, spec.construction_workdays)
+        try:
+            samples = _simulate(spec, risk, table)
+            break
+        except TableTooSmall:
+            first -= 2 * 366
+            span *= 2
+
+    deterministic = schedule_project(spec)
+    hall_rows, building_rows = [], []
+    for b, rfs in zip(deterministic, samples):
+        q = np.percentile(rfs, PERCENTILES, axis=0, method="inverted_cdf") if rfs.size else None
+        for j, h in enumerate(b["halls"]):
+            row = {"Building Name": b["building_name"], "Hall": j + 1, "Deterministic RFS": h["RFS"]}
+            for k, p in enumerate(PERCENTILES):
+                row[f"P{p} RFS"] = _to_date(q[k, j])
+            hall_rows.append(row)
+        last = rfs.max(axis=1) if rfs.size else None
+        row = {
+            "Building Name": b["building_name"],
+            "Deterministic RFS": max((h["RFS"] for h in b["halls"]), default=None),
+        }
+        for p in PERCENTILES:
+            row[f"P{p} RFS"] = _to_date(np.percentile(last, p, method="inverted_cdf")) if last is not None else None
+        building_rows.append(row)
+
+    return RiskResult(
+        halls=pd.DataFrame(hall_rows),
+        buildings=pd.DataFrame(building_rows),
+        rfs_samples=samples,
+    )
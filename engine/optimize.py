@@ -0,0 +1,191 @@
+import time
+from dataclasses import dataclass, replace
+from datetime import date, timedelta
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from engine.power import tranche_order
+from engine.reverse import latest_dates
+from engine.store import schedule_store
+
+from utils.workdays import dates_from_ordinals
+
+# ======================= Offset / tranche optimizer =======================
+# The cheapest building_offset and power tranche dates that still meet
+# per-building RFS targets, where cheapest means deferring as much as
+# possible: the widest offset between buildings first, then the latest tranche
+# deliveries. Without shared commissioning crews every building's RFS is
+# non-decreasing in the offset and in each tranche date, so the search is:
+#   1. bisect the offset on its step grid, with every tranche at its earliest
+#      allowed date (power then binds as little as it can);
+#   2. at that offset, one reverse pass (engine.reverse) gives the latest date
+#      each tranche can arrive. Dates are clamped to keep the allocation order
+#      (engine.power.tranche_order), so halls keep their tranches.
+# Shared crews break the monotonicity: a wider offset can free crews sooner for
+# the earlier buildings. Crews only ever delay a hall, though, so the bisection
+# without them bounds the offset, and below that bound the grid is scanned
+# downward. The configuration as entered is kept when it meets the targets and
+# nothing wider does.
+# Schedules are memoized per configuration; a typical project needs about a
+# dozen of them.
+
+OFFSET_STEP = 5  # days, as the sidebar input
+OPTIMIZE_BUILDING_COLUMNS = ["Building Name", "Target RFS", "Last RFS", "Slack (days)"]
+
+
+@dataclass
+class OptimizeResult:
+    building_offset: int
+    power_tranches: Tuple[date, ...]  # same order as ProjectSpec.power_tranches
+    perm_power: Optional[date]
+    feasible: bool  # False: the targets are missed at every offset, even with the earliest power
+    buildings: pd.DataFrame  # OPTIMIZE_BUILDING_COLUMNS at the returned configuration
+    evaluations: int  # schedules computed
+    seconds: float
+
+    def spec(self, spec):
+        """``spec`` with the optimized offset, tranches and permanent power."""
+        return _configure(spec, self.building_offset, self.power_tranches, self.perm_power)
+
+
+def _configure(spec, offset, tranches, perm_power):
+    gates = replace(spec.gates, perm_power=perm_power) if perm_power != spec.gates.perm_power else spec.gates
+    return replace(spec, building_offset=int(offset), power_tranches=tuple(tranches), gates=gates)
+
+
+def _last_rfs(store):
+    b, rfs = store.buildings, store.halls["L5Finish"]
+    out = np.full(len(b), -1, dtype=np.int64)
+    has_halls = b["halls_count"] > 0
+    if rfs.size:
+        out[has_halls] = np.maximum.reduceat(rfs, b["first_hall"][has_halls])
+    return out
+
+
+def optimize_offset_tranches(spec, targets, max_offset=3650, step=OFFSET_STEP, earliest_power=None):
+    """The widest building offset, then the latest power tranches, meeting ``targets``.
+
+    ``targets`` maps building names to the date their last hall must be RFS;
+    buildings without a target are unconstrained. Offsets are multiples of
+    ``step`` up to ``max_offset``. No tranche is moved before
+    ``earliest_power`` (default: the notice to proceed). When permanent power
+    is the first tranche's date, as in the app, the two move together;
+    otherwise permanent power stays a fixed gate. With shared commissioning
+    crews the offset is scanned rather than bisected, and never narrowed below
+    ``spec.building_offset`` when that already meets the targets.
+    """
+    start = time.perf_counter()
+    names = [b.name for b in spec.buildings]
+    unknown = set(targets) - set(names)
+    if unknown:
+        raise ValueError(f"Unknown building '{sorted(unknown)[0]}'")
+    no_target = np.iinfo(np.int64).max
+    target = np.array([targets[n].toordinal() if n in targets else no_target for n in names], dtype=np.int64)
+
+    coupled = bool(spec.power_tranches) and spec.gates.perm_power == spec.power_tranches[0]
+    earliest = earliest_power or spec.gates.ntp
+    early = tuple(min(d, earliest) if d else d for d in spec.power_tranches)
+    memo = {}
+
+    def evaluate(offset, tranches, crews=spec.commissioning_crews):
+        key = (offset, tranches, crews)
+        if key not in memo:
+            configured = _configure(spec, offset, tranches, tranches[0] if coupled else spec.gates.perm_power)
+            store = schedule_store(replace(configured, commissioning_crews=crews))
+            memo[key] = (configured, store, _last_rfs(store))
+        return memo[key]
+
+    def meets(offset, tranches, crews=spec.commissioning_crews):
+        rfs = evaluate(offset, tranches, crews)[2]
+        return bool(((rfs < 0) | (rfs <= target)).all())
+
+    current = (int(spec.building_offset), tuple(spec.power_tranches))
+    keep = meets(*current)
+
+    # 1. Widest offset on the step grid (bisected without crews, which bound it with them)
+    lo, hi = 0, max(0, int(max_offset) // step)
+    feasible = meets(0, early, 0)
+    if feasible:
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if meets(mid * step, early, 0):
+                lo = mid
+            else:
+                hi = mid - 1
+    offset = lo * step if feasible else None
+    if feasible and spec.commissioning_crews:
+        stop = current[0] // step if keep else -1
+        offset = next((k * step for k in range(lo, stop, -1) if meets(k * step, early)), None)
+    if keep and (offset is None or offset < current[0]):
+        offset = current[0]
+    feasible = offset is not None
+    offset = offset if feasible else 0
+    base = early if not feasible or meets(offset, early) else current[1]
+
+    # 2. Latest tranche dates at that offset
+    tranches = base
+    if feasible and spec.power_tranches:
+        configured, store, _ = evaluate(offset, base)
+        gates, _ = latest_dates(configured, targets, store)
+        tranches = _latest_tranches(spec, base, gates, coupled, offset)
+        if not meets(offset, tranches):
+            tranches = base
+
+    configured, store, rfs = evaluate(offset, tranches)
+    has_target = target != no_target
+    valid = has_target & (rfs >= 0)
+    slack = pd.array(np.where(valid, target - rfs, 0), dtype="Int64")
+    slack[~valid] = pd.NA
+    buildings = pd.DataFrame({
+        "Building Name": names,
+        "Target RFS": dates_from_ordinals(np.where(has_target, target, -1)),
+        "Last RFS": dates_from_ordinals(rfs),
+        "Slack (days)": slack,
+    }, columns=OPTIMIZE_BUILDING_COLUMNS)
+    return OptimizeResult(
+        building_offset=offset,
+        power_tranches=tranches,
+        perm_power=configured.gates.perm_power,
+        feasible=feasible,
+        buildings=buildings,
+        evaluations=len(memo),
+        seconds=time.perf_counter() - start,
+    )
+
+
+def _latest_tranches(spec, evaluated, gates, coupled, offset):
+    # "Power Tranche k" is the k-th tranche in allocation order of the evaluated dates
+    n = len(spec.power_tranches)
+    order = tranche_order(evaluated)
+    latest = [None] * n
+    for gate, d in zip(gates["Gate"], gates["Latest"]):
+        if gate.startswith("Power Tranche "):
+            latest[order[int(gate.rsplit(" ", 1)[1]) - 1]] = d
+    if coupled:
+        perm = gates[gates["Gate"] == "Permanent Power"]
+        index = {name: i for i, name in enumerate(b.name for b in spec.buildings)}
+        # Building i's permanent power is the input shifted by i offsets
+        shifted = [d.toordinal() - index[name] * offset for name, d in zip(perm["Building Name"], perm["Latest"])]
+        if shifted:
+            perm_latest = date.fromordinal(min(shifted))
+            latest[0] = perm_latest if latest[0] is None else min(latest[0], perm_latest)
+
+    # Keep the allocation order: never later than the next tranche in it (a day earlier where
+    # input order would break the tie the other way); tranches no target needs keep their date
+    out = list(spec.power_tranches)
+    bound = [None] * len(order)
+    for p in reversed(range(len(order))):
+        i = order[p]
+        nxt = bound[p + 1] if p + 1 < len(order) else None
+        if nxt is not None and i > order[p + 1]:
+            nxt -= timedelta(days=1)
+        bound[p] = min(d for d in (latest[i], nxt) if d is not None) if (latest[i] or nxt) else None
+    prev = None
+    for p, i in enumerate(order):
+        if bound[p] is None:
+            floor = prev if prev is None or i > order[p - 1] else prev + timedelta(days=1)
+            bound[p] = spec.power_tranches[i] if floor is None else max(spec.power_tranches[i], floor)
+        out[i] = prev = bound[p]
+    return tuple(out)
@@ -0,0 +1,204 @@
+import math
+from operator import attrgetter
+
+# ======================= Power tranche allocation =======================
+# Halls take power from tranches in building order. Without tranche capacities
+# a tranche serves a fixed number of halls (halls_per_tranche). With capacities
+# (ProjectSpec.power_tranche_mw) each hall takes its MW from the earliest
+# tranche that still has that much left; when none has, it goes on the last
+# tranche and the excess is reported as over capacity.
+
+# NumPy and pandas are only imported by the array/frame helpers, so the scalar
+# scheduler (and the CLI) start without them.
+
+MW_EPSILON = 1e-9          # MW rounding slack when a tranche is filled exactly
+
+
+def halls_per_tranche(spec):
+    avg_halls = sum(b.halls for b in spec.buildings) / len(spec.buildings) if spec.buildings else 8
+    return max(1, int(round(avg_halls * 1.5)))
+
+
+def tranche_order(tranche_dates):
+    """Input indices of the delivered tranches in allocation order: by date, ties in input order.
+
+    Tranche k (1-based, as in PowerTranche) is ``tranche_dates[tranche_order(tranche_dates)[k - 1]]``.
+    """
+    return sorted((i for i, d in enumerate(tranche_dates) if d), key=lambda i: tranche_dates[i])
+
+
+class PowerAllocator:
+    """Assigns halls to tranches, by hall count or, given ``capacities_mw``, by MW.
+
+    Tranches are ordered by delivery date. Remaining capacities sit in a
+    tournament tree (max of the two children at every node), so the earliest
+    tranche with room for a hall is found in O(log tranches), and a run of
+    identical halls is placed with one step per tranche it touches (in both modes).
+    """
+
+    def __init__(self, tranche_dates, halls_per_tranche=12, capacities_mw=None):
+        caps = list(capacities_mw or ()) + [None] * (len(tranche_dates) - len(capacities_mw or ()))
+        pairs = [(tranche_dates[i], caps[i]) for i in tranche_order(tranche_dates)]
+        self.tranche_dates = [d for d, _ in pairs]
+        self.halls_per_tranche = max(1, int(halls_per_tranche))
+        self.assigned = 0
+        self.by_mw = bool(capacities_mw)
+        # None (or blank) capacity = unlimited
+        self.capacities_mw = [math.inf if c is None or c != c else float(c) for _, c in pairs]
+        self.allocated_mw = [0.0] * len(pairs)
+        self.halls = [0] * len(pairs)
+        self.over_capacity_mw = 0.0
+        self._size = 1
+        while self._size < len(pairs):
+            self._size *= 2
+        self._tree = [-math.inf] * (2 * self._size)
+        self._tree[self._size:self._size + len(pairs)] = self.capacities_mw
+        for node in range(self._size - 1, 0, -1):
+            self._tree[node] = max(self._tree[2 * node], self._tree[2 * node + 1])
+
+    def _first_fit(self, mw):
+        # Leftmost (earliest) tranche with at least ``mw`` left, or None
+        if self._tree[1] + MW_EPSILON < mw:
+            return None
+        node = 1
+        while node < self._size:
+            node *= 2
+            if self._tree[node] + MW_EPSILON < mw:
+                node += 1
+        return node - self._size
+
+    def _take(self, idx, mw):
+        node = self._size + idx
+        self._tree[node] -= mw
+        node //= 2
+        while node:
+            self._tree[node] = max(self._tree[2 * node], self._tree[2 * node + 1])
+            node //= 2
+
+    def assign(self, mw=0.0):
+        if not self.tranche_dates:
+            return None, None
+        idx = self.assign_many(1, mw)[0]
+        return idx, self.tranche_dates[idx]
+
+    def assign_many(self, count, mw=0.0):
+        """Tranche indices (into the date-sorted tranches) for ``count`` halls of ``mw`` each."""
+        return [idx for idx, n in self.assign_runs(count, mw) for _ in range(n)]
+
+    def assign_runs(self, count, mw=0.0):
+        # As assign_many, as (tranche index, number of halls) runs
+        if not self.tranche_dates or count <= 0:
+            return []
+        last = len(self.tranche_dates) - 1
+        out = []
+        left = count
+        while left:
+            if not self.by_mw:
+                idx = min(self.assigned // self.halls_per_tranche, last)
+                n = left if idx == last else min(left, (idx + 1) * self.halls_per_tranche - self.assigned)
+            else:
+                idx = self._first_fit(mw)
+                if idx is None:
+                    idx, n = last, left
+                    self.over_capacity_mw += mw * n
+                else:
+                    room = self._tree[self._size + idx]
+                    n = left if mw <= 0 or room == math.inf else min(left, int((room + MW_EPSILON) // mw))
+                    self._take(idx, mw * n)
+            out.append((idx, n))
+            self.allocated_mw[idx] += mw * n
+            self.halls[idx] += n
+            self.assigned += n
+            left -= n
+        return out
+
+    def report(self):
+        """One row per tranche: delivery, capacity (when allocating by MW), allocated MW and halls."""
+        import numpy as np
+        import pandas as pd
+
+        report = pd.DataFrame({"Tranche": np.arange(1, len(self.tranche_dates) + 1), "Delivery": self.tranche_dates})
+        if self.by_mw:
+            report["Capacity (MW)"] = [None if c == math.inf else c for c in self.capacities_mw]
+        report["Allocated (MW)"] = np.round(self.allocated_mw, 3)
+        report["Halls"] = self.halls
+        return report
+
+
+def power_allocator(spec):
+    return PowerAllocator(spec.power_tranches, halls_per_tranche(spec), spec.power_tranche_mw)
+
+
+def _hall_mw(bspec):
+    halls = int(bspec.halls)
+    return bspec.mw_total / halls if halls > 0 else 0.0
+
+
+def hall_counts(buildings):
+    # Halls per building as an int64 array (negative counts as none)
+    import numpy as np
+
+    return np.maximum(np.fromiter(map(attrgetter("halls"), buildings), dtype=np.int64, count=len(buildings)), 0)
+
+
+def hall_mw(buildings, counts):
+    # MW per hall of each building (0 without halls)
+    import numpy as np
+
+    mw_total = np.fromiter(map(attrgetter("mw_total"), buildings), dtype=np.float64, count=len(buildings))
+    return np.divide(mw_total, counts, out=np.zeros(len(buildings)), where=counts > 0)
+
+
+def allocate_halls(spec, stop=None):
+    """(0-based tranche index per hall, -1 without tranches; the allocator) for the halls of ``spec.buildings[:stop]``.
+
+    Later buildings never change the tranches of earlier ones, so a prefix is enough.
+    """
+    import numpy as np
+
+    allocator = power_allocator(spec)
+    buildings = spec.buildings[:stop]
+    counts = hall_counts(buildings)
+    if not allocator.tranche_dates:
+        return np.full(int(counts.sum()), -1, dtype=np.int64), allocator
+    if not allocator.by_mw:
+        # By hall count the allocation has a closed form
+        tranches = len(allocator.tranche_dates)
+        idx = np.minimum(np.arange(int(counts.sum())) // allocator.halls_per_tranche, tranches - 1)
+        mw = np.repeat(hall_mw(buildings, counts), counts)
+        allocator.assigned = len(idx)
+        allocator.halls = np.bincount(idx, minlength=tranches).tolist()
+        allocator.allocated_mw = np.bincount(idx, weights=mw, minlength=tranches).tolist()
+        return idx, allocator
+    runs = [run for b in buildings for run in allocator.assign_runs(max(int(b.halls), 0), _hall_mw(b))]
+    if not runs:
+        return np.empty(0, dtype=np.int64), allocator
+    idx, n = np.array(runs, dtype=np.int64).T
+    return np.repeat(idx, n), allocator
+
+
+def tranche_report(spec):
+    return allocate_halls(spec)[1].report()
+
+
+def energized_curve(store):
+    """Cumulative MW energized over time: each hall's MW from its power gate (halls without one are left out)."""
+    import numpy as np
+    import pandas as pd
+
+    from utils.workdays import dates_from_ordinals
+
+    h = store.halls
+    gate = h["PowerGate"].astype(np.int64)
+    mw = store.buildings["mw_per_hall"][h["building"]]
+    keep = gate >= 0
+    if not keep.any():
+        return pd.DataFrame({"Date": pd.Series(dtype=object), "MW": pd.Series(dtype=float),
+                             "Cumulative MW": pd.Series(dtype=float)})
+    days, inverse = np.unique(gate[keep], return_inverse=True)
+    step = np.bincount(inverse, weights=mw[keep])
+    return pd.DataFrame({
+        "Date": dates_from_ordinals(days),
+        "MW": np.round(step, 3),
+        "Cumulative MW": np.round(np.cumsum(step), 3),
+    })
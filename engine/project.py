@@ -0,0 +1,202 @@
+import csv
+import json
+from dataclasses import fields
+from datetime import date, datetime, timedelta
+
+from engine.spec import (
+    DEFAULT_HALLS,
+    DEFAULT_MW_PER_HALL,
+    BuildingSpec,
+    Durations,
+    Gates,
+    ProjectSpec,
+    buildings_from_records,
+    preset_durations,
+)
+
+# ======================= Project definitions (sidebar inputs as plain data) =======================
+# A project definition is a flat mapping that mirrors the sidebar, e.g.
+#   {"ntp": "2026-01-15", "bp": "2026-05-01", "num_buildings": 4,
+#    "power_tranche_count": 2, "preset": "Conservative (+15%)", "L5": 3}
+# Anything omitted falls back to the sidebar's default. CSV/JSON/YAML files of
+# these mappings drive the CLI and the scenario sweep.
+
+DURATION_KEYS = tuple(f.name for f in fields(Durations))
+
+
+def default_inputs(today=None):
+    year = (today or date.today()).year
+    return {
+        "country": "United States",
+        "six_day_construction": False,
+        "preset": "Typical",
+        "base_building_name": "Building",
+        "ntp": date(year, 1, 15),
+        "ldp": date(year, 2, 1),
+        "bp": date(year, 5, 1),
+        "perm_power": date(year, 12, 1),
+        "power_tranche_count": 1,
+        "temp_power": None,
+        "num_buildings": 2,
+        "halls": DEFAULT_HALLS,
+        "mw_total": DEFAULT_HALLS * DEFAULT_MW_PER_HALL,
+        "building_offset": 90,
+        "commissioning_crews": 0,
+    }
+
+
+def _is_blank(value):
+    if value is None:
+        return True
+    if isinstance(value, float) and value != value:
+        return True
+    return isinstance(value, str) and not value.strip()
+
+
+def as_date(value):
+    if _is_blank(value):
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value).strip()[:10])
+
+
+def as_bool(value):
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "y", "on")
+    return bool(value) if not _is_blank(value) else False
+
+
+def as_int(value):
+    return int(round(float(value)))
+
+
+def _split_list(value):
+    if _is_blank(value):
+        return []
+    if isinstance(value, str):
+        value = value.replace(",", ";").split(";")
+    return list(value)
+
+
+def _date_list(value):
+    # "2026-12-01;;2027-03-01" -> [date, None, date]; blanks stay as None so positions line up
+    return [as_date(v) for v in _split_list(value)]
+
+
+def _float_list(value):
+    # "100;100;,250" -> [100.0, 100.0, None, 250.0]; blanks stay as None
+    return [None if _is_blank(v) else float(v) for v in _split_list(value)]
+
+
+def _buildings(inputs):
+    records = inputs.get("buildings")
+    if isinstance(records, str):
+        records = json.loads(records)
+    if records:
+        return buildings_from_records([
+            {
+                "Building Name": r.get("Building Name", r.get("name")),
+                "Halls": r.get("Halls", r.get("halls")),
+                "MW (total)": r.get("MW (total)", r.get("mw_total")),
+            }
+            for r in records
+        ])
+    base = str(inputs["base_building_name"])
+    return tuple(
+        BuildingSpec(f"{base} {i}", as_int(inputs["halls"]), float(inputs["mw_total"]))
+        for i in range(1, as_int(inputs["num_buildings"]) + 1)
+    )
+
+
+def _power_tranches(inputs, perm_power):
+    # (tranche dates, MW capacities) paired by position. A blank date drops its MW
+    # with it, as in the sidebar; a missing MW means unlimited.
+    dates = _date_list(inputs.get("power_tranches"))
+    if not any(dates):
+        # Sidebar default: Tranche 1 is permanent power, each later tranche 90 days apart
+        count = as_int(inputs.get("power_tranche_count") or 1)
+        dates = [perm_power + timedelta(days=90 * (i - 1)) for i in range(1, count + 1)]
+    mw = _float_list(inputs.get("power_tranche_mw"))
+    if any(m is not None for m in mw[len(dates):]):
+        raise ValueError(f"power_tranche_mw has more capacities than power tranches ({len(dates)})")
+    pairs = [(d, m) for d, m in zip(dates, mw + [None] * len(dates)) if d]
+    return tuple(d for d, _ in pairs), (tuple(m for _, m in pairs) if mw else ())
+
+
+def spec_from_inputs(inputs=None, today=None):
+    """Build a ProjectSpec from a (partial) project definition."""
+    merged = default_inputs(today)
+    merged.update({k: v for k, v in (inputs or {}).items() if not _is_blank(v)})
+
+    defaults = preset_durations(merged["preset"])
+    durations = Durations(**{
+        k: as_int(merged[k]) if k in merged else getattr(defaults, k)
+        for k in DURATION_KEYS
+    })
+    perm_power = as_date(merged["perm_power"])
+    power_tranches, power_tranche_mw = _power_tranches(merged, perm_power)
+    return ProjectSpec(
+        gates=Gates(
+            ntp=as_date(merged["ntp"]),
+            ldp=as_date(merged["ldp"]),
+            bp=as_date(merged["bp"]),
+            perm_power=perm_power,
+            temp_power=as_date(merged.get("temp_power")),
+        ),
+        durations=durations,
+        buildings=_buildings(merged),
+        power_tranches=power_tranches,
+        power_tranche_mw=power_tranche_mw,
+        building_offset=as_int(merged["building_offset"]),
+        commissioning_crews=as_int(merged["commissioning_crews"]),
+        country=str(merged["country"]),
+        construction_workdays=6 if as_bool(merged["six_day_construction"]) else 5,
+        admin_workdays=5,
+    )
+
+
+def load_records(path):
+    """Read a CSV, JSON or YAML file of project definitions.
+
+    JSON/YAML may hold a single mapping, a list of mappings, or
+    ``{"base": {...}, "scenarios": [...], "grid": {key: [values, ...]}}`` where
+    ``grid`` expands to the cartesian product of its values (in key order) and
+    every scenario is layered over ``base``. Raises ImportError for YAML
+    without PyYAML and ValueError when the file does not hold mappings.
+    """
+    path = str(path)
+    lower = path.lower()
+    if lower.endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as fh:
+            return [{k: v for k, v in row.items() if v not in ("", None)} for row in csv.DictReader(fh)]
+    with open(path, encoding="utf-8") as fh:
+        if lower.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ModuleNotFoundError:
+                raise ImportError("PyYAML isn't installed. Run `pip install pyyaml` or use a CSV/JSON file.") from None
+            data = yaml.safe_load(fh)
+        else:
+            data = json.load(fh)
+    return expand_records(data)
+
+
+def expand_records(data):
+    if isinstance(data, list):
+        return [dict(r) for r in data]
+    if not isinstance(data, dict):
+        raise ValueError("Project definition must be a mapping or a list of mappings")
+    if not ({"base", "scenarios", "grid"} & set(data)):
+        return [dict(data)]
+    base = dict(data.get("base") or {})
+    records = [dict(base, **s) for s in data.get("scenarios") or []]
+    grid = data.get("grid") or {}
+    if grid:
+        combos = [{}]
+        for key, values in grid.items():
+            combos = [dict(c, **{key: v}) for c in combos for v in values]
+        records += [dict(base, **c) for c in combos]
+    return records or [base]
@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+
+from engine.batched import TableTooSmall, WorkdayTable
+from engine.cpm import schedule_network
+from engine.store import schedule_store
+
+from utils.building import EQUIPMENT_COLUMNS, EQUIPMENT_DATE_COLUMNS, equipment_columns
+from utils.workdays import dates_from_ordinals
+
+# ======================= Reverse scheduling =======================
+# Target RFS dates -> the latest date each gate may arrive and each piece of
+# equipment may be released. One backward pass over the CPM network
+# (engine.cpm) from the targets gives every activity's latest start. Gate
+# deadlines follow directly. The equipment model (utils.building) then runs on
+# the latest dry-in, fitup and L3 dates instead of the scheduled ones.
+# Tranche assignment and crew order come from the current schedule; temporary
+# power, when set, is taken to carry every hall's L3/L4.
+
+LATEST_GATE_COLUMNS = ["Building Name", "Gate", "Scheduled", "Latest", "Slack (WD)"]
+
+
+def _deadlines(store, info, hall_nodes, targets):
+    # Node -> latest finish ordinal for every target
+    index = {name: i for i, name in enumerate(store.names.tolist())}
+    last_rfs = {b: node for node, (b, hall, label) in enumerate(info) if label == "Last RFS"}
+    b = store.buildings
+    out = {}
+    for key, target in targets.items():
+        name, hall = key if isinstance(key, tuple) else (key, None)
+        if name not in index:
+            raise ValueError(f"Unknown building '{name}'")
+        i = index[name]
+        if hall is None:
+            node = last_rfs[i]
+        elif 1 <= int(hall) <= int(b["halls_count"][i]):
+            node = int(hall_nodes[int(b["first_hall"][i]) + int(hall) - 1, 2])
+        else:
+            raise ValueError(f"'{name}' has no hall {hall}")
+        ord_ = target.toordinal()
+        out[node] = min(out.get(node, ord_), ord_)
+    return out
+
+
+def latest_dates(spec, targets, store=None, catalog=None, today=None):
+    """(gates, equipment): latest gate dates and equipment releases that still meet ``targets``.
+
+    ``targets`` maps a building name to the date its last hall must be RFS, or a
+    (building name, hall number) pair to one hall's RFS date. ``gates`` has one
+    row per gate some target depends on, with its scheduled and latest date
+    and the working days between them (negative: already too late).
+    ``equipment`` has the EQUIPMENT_COLUMNS of the equipment list, computed
+    from the latest dates; halls no target depends on have no dates.
+    """
+    store = schedule_store(spec) if store is None else store
+    net, info, hall_nodes = schedule_network(spec, store, temp_for_l3=True)
+    deadlines = _deadlines(store, info, hall_nodes, targets)
+    if not deadlines:
+        return pd.DataFrame(columns=LATEST_GATE_COLUMNS), pd.DataFrame(columns=EQUIPMENT_COLUMNS)
+
+    fixed = [i for i, f in enumerate(net.fixed) if f is not None]
+    first = min([net.fixed[i] for i in fixed] + list(deadlines.values()))
+    last = max(list(deadlines.values()) + [int(store.halls["L5Finish"].max(initial=0))])
+    margin = 366
+    while True:
+        # Late dates of infeasible targets can fall before every scheduled date
+        table = WorkdayTable(spec.calendar, first - margin, last + 14, spec.construction_workdays)
+        try:
+            lf = net.latest(table, deadlines)
+            gates = _gate_frame(store, net, info, table, lf, fixed)
+            late = _late_ordinals(net, info, hall_nodes, table, lf, len(store))
+            break
+        except TableTooSmall:
+            margin *= 2
+
+    hall_building = store.halls["building"]
+    cols = equipment_columns(
+        store.names, store.buildings["halls_count"], late["dryin"], late["L3"],
+        late["fitup_start"][hall_building], late["fitup_finish"][hall_building],
+        spec.admin_workdays, spec.calendar, catalog, today,
+    )
+    if not len(cols["Equipment"]):
+        return gates, pd.DataFrame(columns=EQUIPMENT_COLUMNS)
+    for c in EQUIPMENT_DATE_COLUMNS:
+        cols[c] = dates_from_ordinals(cols[c])
+    return gates, pd.DataFrame(cols, columns=EQUIPMENT_COLUMNS)
+
+
+def _gate_frame(store, net, info, table, lf, fixed):
+    rows = [i for i in fixed if lf[i] is not None]
+    late_pos = np.array([lf[i] for i in rows], dtype=np.int64)
+    scheduled = np.array([net.fixed[i] for i in rows], dtype=np.int64)
+    # Latest calendar day at or before the late position: a gate on a weekend counts from the day before
+    latest = table.at_position(late_pos + 1) - 1 if rows else np.empty(0, dtype=np.int64)
+    names = store.names.tolist()
+    return pd.DataFrame({
+        "Building Name": [names[info[i][0]] if info[i][0] >= 0 else None for i in rows],
+        "Gate": [info[i][2] for i in rows],
+        "Scheduled": dates_from_ordinals(scheduled),
+        "Latest": dates_from_ordinals(latest),
+        "Slack (WD)": late_pos - table.position(scheduled) if rows else np.empty(0, dtype=np.int64),
+    }, columns=LATEST_GATE_COLUMNS)
+
+
+def _late_ordinals(net, info, hall_nodes, table, lf, n_buildings):
+    # Latest dry-in and fitup per building and latest L3 start per hall (-1 = unconstrained)
+    def late_start(node):
+        return -1 if lf[node] is None else int(table.at_position(lf[node] - net.durations[node]))
+
+    def late_finish(node):
+        return -1 if lf[node] is None else int(table.at_position(lf[node]))
+
+    out = {k: np.full(n_buildings, -1, dtype=np.int64) for k in ("dryin", "fitup_start", "fitup_finish")}
+    for node, (b, hall, label) in enumerate(info):
+        if label == "Dry‑In":
+            out["dryin"][b] = late_finish(node)
+        elif label == "Fitup":
+            out["fitup_start"][b], out["fitup_finish"][b] = late_start(node), late_finish(node)
+    out["L3"] = np.array([late_start(int(n)) for n in hall_nodes[:, 0]], dtype=np.int64)
+    return out
@@ -0,0 +1,149 @@
+from datetime import date, timedelta
+
+from engine.power import power_allocator
+
+import data.equipment as equipment
+import utils.building as building
+
+# ======================= Scheduling rules =======================
+# The scalar scheduler, one building and hall at a time in plain Python. The
+# app, portfolio mode and the optimizer schedule through the array store
+# (engine.store), the Monte Carlo through engine.batched; both follow the same
+# rules on workday ordinals and give identical dates.
+SHELL_TRIGGER_WD = 80      # Shell may start 80 WD after Site Work starts
+FITUP_AFTER_MEP_WD = 40    # Fitup waits 40 WD after MEP Yard starts
+L3_LAG_WD = 5              # L3 of each hall starts SS+5 after the previous hall
+
+
+def building_gates(spec, build_idx):
+    # Gate dates shifted by the building offset (build_idx is 1-based)
+    offset = timedelta(days=(build_idx - 1) * int(spec.building_offset))
+    g = spec.gates
+    return {
+        "ntp": g.ntp + offset,
+        "ldp": g.ldp + offset,
+        "bp": g.bp + offset,
+        "perm_power": g.perm_power + offset,
+        "temp_power": (g.temp_power + offset) if g.temp_power else None,
+    }
+
+
+def schedule_building(spec, build_idx, bspec, allocator):
+    # Stages are worked out on date ordinals with the calendar's own table lookups
+    # and turned back into dates once per building and hall.
+    add = spec.calendar.ordinal_adder(spec.construction_workdays)
+    dur = spec.durations
+    to_date = date.fromordinal
+
+    halls_count = int(bspec.halls)
+    mw_per_hall = bspec.mw_total / halls_count if halls_count > 0 else 0
+    gates = building_gates(spec, build_idx)
+    if allocator and allocator.tranche_dates:
+        tranches = [(i, allocator.tranche_dates[i]) for i in allocator.assign_many(halls_count, mw_per_hall)]
+    else:
+        tranches = [(None, None)] * max(halls_count, 0)
+
+    civil_start = max(gates["ntp"], gates["ldp"]).toordinal()
+    civil_finish = add(civil_start, dur.site_work)
+
+    shell_start = max(add(civil_start, SHELL_TRIGGER_WD), gates["bp"].toordinal())
+    shell_finish = add(shell_start, dur.shell)
+    dryin_wd = max(1, min(dur.shell, int(round(dur.dryin_offset))))
+    dryin_date = add(shell_start, dryin_wd)
+
+    mep_finish = shell_finish
+    mep_start = add(mep_finish, -dur.mep_yard)
+    fitup_start = max(dryin_date, add(mep_start, FITUP_AFTER_MEP_WD))
+    fitup_finish = add(fitup_start, dur.fitup)
+    fitup_start_date, fitup_finish_date = to_date(fitup_start), to_date(fitup_finish)
+
+    perm = gates["perm_power"].toordinal()
+    temp = gates["temp_power"].toordinal() if gates["temp_power"] else None
+    # Halls on the same tranche share its power gate and earliest L3 start
+    by_tranche = {}
+    halls = []
+    prev_l3_start = None
+    for tranche_idx, tranche_date in tranches:
+        tranche = by_tranche.get(tranche_idx)
+        if tranche is None:
+            power_gate = perm if tranche_date is None else max(perm, tranche_date.toordinal())
+            pwr_gate_L34 = min(power_gate, temp) if temp else power_gate
+            tranche = by_tranche[tranche_idx] = (
+                power_gate, max(fitup_finish, pwr_gate_L34), to_date(power_gate),
+                (tranche_idx + 1) if tranche_idx is not None else None,
+            )
+        power_gate, ready, power_gate_date, label = tranche
+
+        # L3 waits for fitup, power (L3/L4 gate) and the previous hall's L3 start + 5 WD
+        L3_start = ready if prev_l3_start is None else max(ready, add(prev_l3_start, L3_LAG_WD))
+        prev_l3_start = L3_start
+        L3_finish = add(L3_start, dur.L3)
+        L4_finish = add(L3_finish, dur.L4)
+        L5_start = max(L4_finish, power_gate)
+        L5_finish = to_date(add(L5_start, dur.L5))
+        L3_finish = to_date(L3_finish)
+        halls.append({
+            "FitupStart": fitup_start_date, "FitupFinish": fitup_finish_date,
+            "L3Start": to_date(L3_start), "L3Finish": L3_finish,
+            "L4Start": L3_finish, "L4Finish": to_date(L4_finish),
+            "L5Start": to_date(L5_start), "L5Finish": L5_finish, "RFS": L5_finish,
+            "PowerTranche": label, "PowerDeliveryDate": tranche_date, "PowerGate": power_gate_date,
+        })
+
+    return dict(
+        building_name=bspec.name,
+        halls_count=halls_count,
+        mw_per_hall=mw_per_hall,
+        civil_start=to_date(civil_start), civil_finish=to_date(civil_finish),
+        shell_start=to_date(shell_start), shell_finish=to_date(shell_finish),
+        mep_start=to_date(mep_start), mep_finish=to_date(mep_finish),
+        dryin_date=to_date(dryin_date), perm_power=gates["perm_power"],
+        halls=halls,
+        gates=gates
+    )
+
+
+def schedule_project(spec):
+    """Schedule every building in ``spec``; returns one dict per building, halls as dicts.
+
+    This is the scalar path, without NumPy, for the CLI and other small runs.
+    Shared commissioning crews couple every building, so with them the dicts
+    are read off the array schedule (engine.store) instead; the dates are
+    identical either way.
+    """
+    if spec.commissioning_crews:
+        from engine.store import schedule_store
+        return schedule_store(spec).building_dicts(spec)
+    allocator = power_allocator(spec)
+    return [
+        schedule_building(spec, i, bspec, allocator)
+        for i, bspec in enumerate(spec.buildings, start=1)
+    ]
+
+
+def rfs_rows(buildings):
+    # Hall-level rows of the RFS table (same columns as the CSV download)
+    rows = []
+    for b in buildings:
+        for j, h in enumerate(b["halls"], start=1):
+            rows.append({
+                "Building Name": b["building_name"],
+                "Hall": j,
+                "Fitup Start": h["FitupStart"],
+                "Fitup Finish": h["FitupFinish"],
+                "L3 Start": h["L3Start"],
+                "Power Tranche": h.get("PowerTranche"),
+                "Power Delivery": h.get("PowerDeliveryDate"),
+                "Power Gate": h.get("PowerGate"),
+                "RFS (L5 Finish)": h["RFS"]
+            })
+    return rows
+
+
+def equipment_rows(spec, buildings, catalog=None):
+    catalog = equipment.RAW_EQUIPMENT if catalog is None else catalog
+    rows = []
+    for b in buildings:
+        for item in catalog:
+            rows.extend(building.get_item_rows(b, item, spec.admin_workdays, spec.calendar))
+    return rows
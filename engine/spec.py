@@ -0,0 +1,107 @@
+from dataclasses import dataclass, field, replace
+from datetime import date
+from typing import Optional, Tuple
+
+import utils.date as date_utils
+
+# ======================= Scheduling inputs =======================
+# Everything the scheduler reads, as immutable (and therefore hashable) values.
+# The Streamlit sidebar, the CLI and batch runners all build one of these.
+
+DEFAULT_HALLS = 8
+DEFAULT_MW_PER_HALL = 16.8
+
+PRESET_SCALES = {
+    "Typical": 1.0,
+    "Aggressive (-10%)": 0.9,
+    "Conservative (+15%)": 1.15,
+}
+
+
+@dataclass(frozen=True)
+class Gates:
+    ntp: date
+    ldp: date
+    bp: date
+    perm_power: date
+    # None unless L3/L4 are allowed to run on temporary power
+    temp_power: Optional[date] = None
+
+
+@dataclass(frozen=True)
+class Durations:
+    # Working days
+    site_work: int = 100
+    shell: int = 185
+    mep_yard: int = 65
+    dryin_offset: int = 100
+    fitup: int = 50
+    L3: int = 40
+    L4: int = 15
+    L5: int = 2
+
+
+@dataclass(frozen=True)
+class BuildingSpec:
+    name: str
+    halls: int = DEFAULT_HALLS
+    mw_total: float = DEFAULT_HALLS * DEFAULT_MW_PER_HALL
+
+
+@dataclass(frozen=True)
+class ProjectSpec:
+    gates: Gates
+    durations: Durations = field(default_factory=Durations)
+    buildings: Tuple[BuildingSpec, ...] = ()
+    power_tranches: Tuple[date, ...] = ()
+    # MW capacity per tranche (same order as power_tranches, None = unlimited); empty = by hall count
+    power_tranche_mw: Tuple[Optional[float], ...] = ()
+    building_offset: int = 90
+    # L3/L4 crews shared by all buildings; 0 = unlimited (each building's halls run SS+5)
+    commissioning_crews: int = 0
+    country: str = "United States"
+    construction_workdays: int = 5
+    admin_workdays: int = 5
+
+    @property
+    def calendar(self):
+        return date_utils.calendar_for(self.country)
+
+
+def preset_durations(preset="Typical"):
+    # Slider defaults for a preset; dryin_offset is not scaled.
+    base = Durations()
+    scale = PRESET_SCALES[preset]
+    return replace(
+        base,
+        site_work=int(round(base.site_work * scale)),
+        shell=int(round(base.shell * scale)),
+        mep_yard=max(1, int(round(base.mep_yard * scale))),
+        fitup=max(1, int(round(base.fitup * scale))),
+        L3=int(round(base.L3 * scale)),
+        L4=int(round(base.L4 * scale)),
+        L5=max(1, int(round(base.L5 * scale))),
+    )
+
+
+def _is_missing(value):
+    if value is None:
+        return True
+    try:
+        return bool(value != value)  # NaN
+    except TypeError:
+        return True  # pd.NA
+
+
+def buildings_from_records(records):
+    # Rows shaped like the sidebar editor: "Building Name", "Halls", "MW (total)".
+    buildings = []
+    for r in records:
+        halls = r.get("Halls")
+        mw = r.get("MW (total)")
+        buildings.append(BuildingSpec(
+            name=str(r.get("Building Name")),
+            halls=int(DEFAULT_HALLS if _is_missing(halls) else halls),
+            mw_total=float(DEFAULT_HALLS * DEFAULT_MW_PER_HALL if _is_missing(mw) else mw),
+        ))
+    return tuple(buildings)
@@ -0,0 +1,489 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from engine.batched import (
+    TableTooSmall, WorkdayTable, building_arrays, crew_chain, hall_arrays, hall_ready, l3_chain,
+)
+from engine.lru import LRUCache
+from engine.power import allocate_halls, hall_counts, hall_mw
+from engine.schedule import building_gates
+
+from utils.building import EQUIPMENT_COLUMNS, EQUIPMENT_DATE_COLUMNS, equipment_columns
+from utils.workdays import dates_from_ordinals, datetimes_from_ordinals
+
+# ======================= Compact schedule store =======================
+# One structured array row per building and one per hall, dates as int32 day
+# ordinals (-1 = missing). Tables, Gantt rows and the equipment model read
+# column views of these arrays; dates only become date objects (or datetime64)
+# when a display frame is built.
+
+BUILDING_DTYPE = np.dtype([
+    ("civil_start", "i4"), ("civil_finish", "i4"),
+    ("shell_start", "i4"), ("shell_finish", "i4"),
+    ("mep_start", "i4"), ("mep_finish", "i4"),
+    ("dryin_date", "i4"), ("fitup_start", "i4"), ("fitup_finish", "i4"),
+    ("perm_power", "i4"),
+    ("halls_count", "i4"), ("first_hall", "i4"), ("mw_per_hall", "f8"),
+])
+
+HALL_DTYPE = np.dtype([
+    ("building", "i4"), ("hall", "i4"),
+    ("L3Start", "i4"), ("L3Finish", "i4"), ("L4Finish", "i4"),
+    ("L5Start", "i4"), ("L5Finish", "i4"),
+    ("PowerTranche", "i2"),  # 1-based, 0 = no tranche
+    ("PowerDelivery", "i4"), ("PowerGate", "i4"),
+    ("Crew", "i2"),  # 1-based shared L3/L4 crew, 0 = unlimited crews
+])
+
+RFS_COLUMNS = [
+    "Building Name", "Hall", "Fitup Start", "Fitup Finish", "L3 Start",
+    "Power Tranche", "Power Delivery", "Power Gate", "RFS (L5 Finish)",
+]
+BUILDING_COLUMNS = [
+    "Building Name", "Halls", "Civil Start", "Dry‑In", "Shell Complete",
+    "Permanent Power", "First RFS", "Last RFS",
+]
+# Building-level stage dates, as engine.batched.building_arrays returns them (fitup last)
+STAGE_FIELDS = (
+    "civil_start", "civil_finish", "shell_start", "shell_finish", "mep_start", "mep_finish",
+    "dryin_date", "fitup_start", "fitup_finish",
+)
+CARD_FIELDS = ("civil_start", "dryin_date", "shell_finish", "perm_power")
+AGGREGATE_PHASES = (
+    ("Site Work", "civil_start", "civil_finish"),
+    ("Shell", "shell_start", "shell_finish"),
+    ("MEP Yard", "mep_start", "mep_finish"),
+)
+HALL_PHASES = (
+    ("L3", "L3Start", "L3Finish"),
+    ("L4", "L3Finish", "L4Finish"),
+    ("L5", "L5Start", "L5Finish"),
+)
+GANTT_PHASES = ("Site Work", "Shell", "MEP Yard", "Fitup", "L3", "L4", "L5")
+
+
+class ScheduleStore:
+    """Scheduled buildings and halls as structured arrays."""
+
+    __slots__ = ("names", "buildings", "halls")
+
+    def __init__(self, names, buildings, halls):
+        self.names = np.asarray(names, dtype=object)
+        self.buildings = buildings
+        self.halls = halls
+
+    def __len__(self):
+        return len(self.buildings)
+
+    def subset(self, start, stop=None):
+        # Buildings ``start:stop`` (just ``start`` by default) and their halls as a store of their own
+        stop = start + 1 if stop is None else stop
+        b = self.buildings[start:stop].copy()
+        first = int(b["first_hall"][0]) if len(b) else 0
+        h = self.halls[first:first + int(b["halls_count"].sum())].copy()
+        b["first_hall"] -= first
+        h["building"] -= start
+        return ScheduleStore(self.names[start:stop], b, h)
+
+    def _convert(self, ords, datetimes):
+        return datetimes_from_ordinals(ords) if datetimes else dates_from_ordinals(ords)
+
+    def _per_hall(self, field):
+        return self.buildings[field][self.halls["building"]]
+
+    def building_records(self):
+        # Building-level milestones for the KPI cards (no hall data)
+        cols = {f: dates_from_ordinals(self.buildings[f]) for f in CARD_FIELDS}
+        return [
+            dict({f: cols[f][i] for f in CARD_FIELDS}, building_name=name, halls_count=int(n))
+            for i, (name, n) in enumerate(zip(self.names, self.buildings["halls_count"]))
+        ]
+
+    def building_dicts(self, spec):
+        """One dict per building, shaped like engine.schedule.schedule_building's, for a store of all of ``spec``."""
+        b, h = self.buildings, self.halls
+        bcols = {f: dates_from_ordinals(b[f]).tolist() for f in STAGE_FIELDS + ("perm_power",)}
+        hcols = {f: dates_from_ordinals(h[f]).tolist() for f in ("L3Start", "L3Finish", "L4Finish", "L5Start",
+                                                                  "L5Finish", "PowerDelivery", "PowerGate")}
+        tranche = [int(t) if t > 0 else None for t in h["PowerTranche"].tolist()]
+        out = []
+        for i, name in enumerate(self.names.tolist()):
+            first, n = int(b["first_hall"][i]), int(b["halls_count"][i])
+            fitup_start, fitup_finish = bcols["fitup_start"][i], bcols["fitup_finish"][i]
+            halls = [
+                dict(FitupStart=fitup_start, FitupFinish=fitup_finish,
+                     L3Start=hcols["L3Start"][k], L3Finish=hcols["L3Finish"][k],
+                     L4Start=hcols["L3Finish"][k], L4Finish=hcols["L4Finish"][k],
+                     L5Start=hcols["L5Start"][k], L5Finish=hcols["L5Finish"][k], RFS=hcols["L5Finish"][k],
+                     PowerTranche=tranche[k], PowerDeliveryDate=hcols["PowerDelivery"][k],
+                     PowerGate=hcols["PowerGate"][k])
+                for k in range(first, first + n)
+            ]
+            out.append(dict(
+                {f: bcols[f][i] for f in STAGE_FIELDS[:-2]},
+                building_name=name, halls_count=n, mw_per_hall=float(b["mw_per_hall"][i]),
+                perm_power=bcols["perm_power"][i], halls=halls, gates=building_gates(spec, i + 1),
+            ))
+        return out
+
+    def rfs_frame(self, datetimes=False):
+        h = self.halls
+        has_tranche = (h["PowerTranche"] > 0).any()
+        if datetimes:
+            tranche = pd.array(np.where(h["PowerTranche"] > 0, h["PowerTranche"], 0), dtype="Int64")
+            if not has_tranche:
+                tranche[:] = pd.NA
+        elif has_tranche or not len(h):
+            tranche = h["PowerTranche"].astype(np.int64)
+        else:
+            tranche = np.full(len(h), None, dtype=object)
+        return pd.DataFrame({
+            "Building Name": self.names[h["building"]],
+            "Hall": h["hall"].astype(np.int64),
+            "Fitup Start": self._convert(self._per_hall("fitup_start"), datetimes),
+            "Fitup Finish": self._convert(self._per_hall("fitup_finish"), datetimes),
+            "L3 Start": self._convert(h["L3Start"], datetimes),
+            "Power Tranche": tranche,
+            "Power Delivery": self._convert(h["PowerDelivery"], datetimes),
+            "Power Gate": self._convert(h["PowerGate"], datetimes),
+            "RFS (L5 Finish)": self._convert(h["L5Finish"], datetimes),
+        }, columns=RFS_COLUMNS)
+
+    def phase_windows(self):
+        """Per building: name, permanent power and (start, finish) ordinals of every phase."""
+        b, h = self.buildings, self.halls
+        out = {"Building Name": self.names, "Permanent Power": b["perm_power"]}
+        for phase, s, f in AGGREGATE_PHASES + (("Fitup", "fitup_start", "fitup_finish"),):
+            has = b["halls_count"] > 0 if phase == "Fitup" else slice(None)
+            out[f"{phase} Start"] = np.where(has, b[s], -1)
+            out[f"{phase} Finish"] = np.where(has, b[f], -1)
+        has_halls = b["halls_count"] > 0
+        seg = b["first_hall"][has_halls]
+        for phase, s, f in HALL_PHASES:
+            start = np.full(len(b), -1, dtype=np.int32)
+            finish = np.full(len(b), -1, dtype=np.int32)
+            if len(h):
+                start[has_halls] = np.minimum.reduceat(h[s], seg)
+                finish[has_halls] = np.maximum.reduceat(h[f], seg)
+            out[f"{phase} Start"] = start
+            out[f"{phase} Finish"] = finish
+        return pd.DataFrame(out)
+
+    def building_frame(self, datetimes=True):
+        # Portfolio summary: one row per building with its first and last hall RFS
+        b, rfs = self.buildings, self.halls["L5Finish"]
+        has_halls = b["halls_count"] > 0
+        first_rfs = np.full(len(b), -1, dtype=np.int32)
+        last_rfs = np.full(len(b), -1, dtype=np.int32)
+        if rfs.size:
+            first_rfs[has_halls] = np.minimum.reduceat(rfs, b["first_hall"][has_halls])
+            last_rfs[has_halls] = np.maximum.reduceat(rfs, b["first_hall"][has_halls])
+        return pd.DataFrame({
+            "Building Name": self.names,
+            "Halls": b["halls_count"].astype(np.int64),
+            "Civil Start": self._convert(b["civil_start"], datetimes),
+            "Dry‑In": self._convert(b["dryin_date"], datetimes),
+            "Shell Complete": self._convert(b["shell_finish"], datetimes),
+            "Permanent Power": self._convert(b["perm_power"], datetimes),
+            "First RFS": self._convert(first_rfs, datetimes),
+            "Last RFS": self._convert(last_rfs, datetimes),
+        }, columns=BUILDING_COLUMNS)
+
+    def equipment_frame(self, spec, datetimes=False, catalog=None, today=None):
+        b, h = self.buildings, self.halls
+        cols = equipment_columns(
+            self.names, b["halls_count"], b["dryin_date"], h["L3Start"],
+            self._per_hall("fitup_start"), self._per_hall("fitup_finish"),
+            spec.admin_workdays, spec.calendar, catalog, today,
+        )
+        if not len(cols["Equipment"]):
+            return pd.DataFrame(columns=EQUIPMENT_COLUMNS)
+        for c in EQUIPMENT_DATE_COLUMNS:
+            cols[c] = self._convert(cols[c], datetimes)
+        return pd.DataFrame(cols, columns=EQUIPMENT_COLUMNS)
+
+    def gantt_frames(self):
+        """(gdf, milestone_df) for the timeline: L3/L4/L5 per hall plus portfolio-wide phase windows."""
+        b, h = self.buildings, self.halls
+        names = self.names[h["building"]]
+        tasks = [
+            f"{name} • Hall {j} • {phase}"
+            for name, j in zip(names.tolist(), h["hall"].tolist())
+            for phase in ("L3", "L4", "L5")
+        ]
+        starts = np.stack([h["L3Start"], h["L3Finish"], h["L5Start"]], axis=1).ravel()
+        finishes = np.stack([h["L3Finish"], h["L4Finish"], h["L5Finish"]], axis=1).ravel()
+        phases = ["L3", "L4", "L5"] * len(h)
+
+        windows = [(phase, b[s], b[f]) for phase, s, f in AGGREGATE_PHASES]
+        has_halls = b["halls_count"] > 0
+        windows.append(("Fitup", b["fitup_start"][has_halls], b["fitup_finish"][has_halls]))
+        extra_s, extra_f = [], []
+        for phase, s, f in windows:
+            s, f = s[s >= 0], f[f >= 0]
+            if s.size and f.size:
+                tasks.append(phase)
+                phases.append(phase)
+                extra_s.append(s.min())
+                extra_f.append(f.max())
+        starts = np.concatenate([starts, np.asarray(extra_s, dtype=starts.dtype)])
+        finishes = np.concatenate([finishes, np.asarray(extra_f, dtype=finishes.dtype)])
+
+        if tasks:
+            # Stable sort by (Finish, Start), missing dates last; keep each task's first row
+            big = np.iinfo(np.int64).max
+            order = np.lexsort((
+                np.where(starts >= 0, starts, big),
+                np.where(finishes >= 0, finishes, big),
+            ))
+            tasks = pd.Series(tasks, dtype=object).iloc[order]
+            keep = ~tasks.duplicated(keep="first").to_numpy()
+            order = order[keep]
+            gdf = pd.DataFrame({
+                "Task": tasks.to_numpy()[keep],
+                "Start": dates_from_ordinals(starts[order]),
+                "Finish": dates_from_ordinals(finishes[order]),
+                "Phase": np.asarray(phases, dtype=object)[order],
+            })
+        else:
+            gdf = pd.DataFrame()
+
+        with_power = b["perm_power"] >= 0
+        if not with_power.any():
+            return gdf, None
+        milestone_df = pd.DataFrame({
+            "Task": np.where(has_halls, "Fitup", "Site Work")[with_power].astype(object),
+            "Date": dates_from_ordinals(b["perm_power"][with_power]),
+            "HoverText": [f"{name} • Permanent Power" for name in self.names[with_power]],
+        })
+        return gdf, milestone_df
+
+
+def _ord(d):
+    return d.toordinal() if d else -1
+
+
+def _table_range(spec):
+    g = spec.gates
+    ords = [_ord(d) for d in (g.ntp, g.ldp, g.bp, g.perm_power, g.temp_power) if d]
+    ords += [_ord(d) for d in spec.power_tranches if d]
+    first = min(ords) - 2 * 366
+    last = max(ords) + max(len(spec.buildings) - 1, 0) * int(spec.building_offset) + 3 * 366
+    return first, last
+
+
+def _schedule_slice(spec, table, start, stop, counts, tranche_ords, hall_tranche, crews=0):
+    g, dur = spec.gates, spec.durations
+    bspecs = spec.buildings[start:stop]
+    offset = np.arange(start, stop, dtype=np.int64) * int(spec.building_offset)
+    gates = {k: _ord(getattr(g, k)) + offset for k in ("ntp", "ldp", "bp")}
+    d = {k: np.int64(getattr(dur, k)) for k in ("site_work", "shell", "mep_yard", "dryin_offset", "fitup", "L3", "L4", "L5")}
+    arrays = building_arrays(table, gates, d)
+
+    building = np.repeat(np.arange(len(bspecs)), counts)
+    first_hall = np.cumsum(counts) - counts
+    rank = np.arange(len(building)) - first_hall[building]
+
+    # hall_tranche is this slice's part of allocate_halls (0-based, -1 = no tranche)
+    perm = (_ord(g.perm_power) + offset) if g.perm_power else np.full(len(bspecs), -1)
+    tranche_idx = hall_tranche
+    tranche = tranche_ords[tranche_idx] if tranche_ords.size else np.full(len(building), -1)
+    power_gate = np.maximum(perm[building], tranche)
+    temp = (_ord(g.temp_power) + offset)[building] if g.temp_power else None
+
+    ready = hall_ready(arrays["fitup_finish"][building], power_gate, temp)
+    if crews:
+        L3_start, crew = crew_chain(table, ready, rank, building, crews, dur.L3 + dur.L4)
+    else:
+        L3_start, crew = l3_chain(table, ready, rank, building), np.full(len(building), -1)
+    stages = hall_arrays(table, d, L3_start, power_gate)
+
+    b = np.empty(len(bspecs), dtype=BUILDING_DTYPE)
+    for field in STAGE_FIELDS:
+        b[field] = arrays[field]
+    b["perm_power"] = perm
+    b["halls_count"] = counts
+    b["first_hall"] = first_hall
+    b["mw_per_hall"] = hall_mw(bspecs, counts)
+
+    h = np.empty(len(building), dtype=HALL_DTYPE)
+    h["building"] = building
+    h["hall"] = rank + 1
+    for field in ("L3Start", "L3Finish", "L4Finish", "L5Start", "L5Finish"):
+        h[field] = stages[field]
+    h["PowerTranche"] = tranche_idx + 1
+    h["PowerDelivery"] = tranche
+    h["PowerGate"] = power_gate
+    h["Crew"] = crew + 1
+    return ScheduleStore([s.name for s in bspecs], b, h)
+
+
+# Shared crews couple every building, so the whole spec is scheduled once and sliced
+_CREW_STORES = LRUCache(max_entries=4)
+
+
+def _crew_store(spec):
+    def build():
+        return next(_iter_slices(spec, None, 0, None, crews=int(spec.commissioning_crews)))
+    return _CREW_STORES.get_or_compute(spec, build)
+
+
+def iter_stores(spec, chunk_buildings=None, start=0, stop=None):
+    """Yield ScheduleStores for consecutive slices of ``spec.buildings[start:stop]`` (one slice by default).
+
+    Dates are identical to schedule_project hall for hall.
+    """
+    if not spec.commissioning_crews:
+        yield from _iter_slices(spec, chunk_buildings, start, stop)
+        return
+    n = len(spec.buildings) if stop is None else min(stop, len(spec.buildings))
+    if start >= n:
+        return
+    full = _crew_store(spec)
+    step = max(1, int(chunk_buildings or (n - start) or 1))
+    for i in range(start, n, step):
+        yield full.subset(i, min(i + step, n))
+
+
+def _iter_slices(spec, chunk_buildings, start, stop, crews=0):
+    first, last = _table_range(spec)
+    tranche_ords = np.array(sorted(_ord(d) for d in spec.power_tranches if d), dtype=np.int64)
+    n = len(spec.buildings) if stop is None else min(stop, len(spec.buildings))
+    # Allocated once up front: halls of earlier buildings use up tranches first
+    hall_tranches, _ = allocate_halls(spec, stop=n)
+    counts = hall_counts(spec.buildings[:n])
+    bounds = np.concatenate(([0], np.cumsum(counts)))
+    step = max(1, int(chunk_buildings or (n - start) or 1))
+    while start < n:
+        stop = min(start + step, n)
+        hall_start, hall_stop = int(bounds[start]), int(bounds[stop])
+        while True:
+            table = WorkdayTable(spec.calendar, first, last, spec.construction_workdays)
+            try:
+                store = _schedule_slice(
+                    spec, table, start, stop, counts[start:stop], tranche_ords, hall_tranches[hall_start:hall_stop], crews,
+                )
+                break
+            except TableTooSmall:
+                first -= 2 * 366
+                last += 2 * (last - first)
+        yield store
+        start = stop
+
+
+def schedule_store(spec, start=0, stop=None):
+    """Schedule the buildings of ``spec`` (or the slice ``start:stop``) into one ScheduleStore."""
+    stores = list(iter_stores(spec, start=start, stop=stop))
+    if stores:
+        return stores[0]
+    return ScheduleStore([], np.empty(0, dtype=BUILDING_DTYPE), np.empty(0, dtype=HALL_DTYPE))
+
+
+def summary_gantt(windows, max_rows=None):
+    """(gdf, milestone_df) with one band per building, or per group of buildings.
+
+    ``windows`` is ScheduleStore.phase_windows() (possibly concatenated across
+    chunks). With more than ``max_rows`` buildings, consecutive buildings are
+    merged into groups so the figure never has more than ``max_rows`` rows.
+    """
+    n = len(windows)
+    if not n:
+        return pd.DataFrame(), None
+    size = max(1, -(-n // max_rows)) if max_rows else 1
+    bounds = np.arange(0, n, size)
+    names = windows["Building Name"].to_numpy()
+    if size == 1:
+        labels = names
+    else:
+        ends = np.minimum(bounds + size, n) - 1
+        labels = np.array([f"{names[a]} – {names[b]}" if b > a else names[a] for a, b in zip(bounds, ends)], dtype=object)
+
+    # Phase envelopes per group; rows come out group by group, phases in GANTT_PHASES order
+    big = np.iinfo(np.int64).max
+    groups, starts, finishes, phases = [], [], [], []
+    for phase in GANTT_PHASES:
+        s = windows[f"{phase} Start"].to_numpy(np.int64)
+        f = windows[f"{phase} Finish"].to_numpy(np.int64)
+        s = np.minimum.reduceat(np.where(s >= 0, s, big), bounds)
+        f = np.maximum.reduceat(f, bounds)
+        ok = np.flatnonzero((s != big) & (f >= 0))
+        groups.append(ok)
+        starts.append(s[ok])
+        finishes.append(f[ok])
+        phases.append(np.full(len(ok), phase, dtype=object))
+    groups = np.concatenate(groups)
+    if not len(groups):
+        return pd.DataFrame(), None
+    order = np.argsort(groups, kind="stable")
+    gdf = pd.DataFrame({
+        "Task": labels[groups[order]],
+        "Start": dates_from_ordinals(np.concatenate(starts)[order]),
+        "Finish": dates_from_ordinals(np.concatenate(finishes)[order]),
+        "Phase": np.concatenate(phases)[order],
+    })
+
+    power = windows["Permanent Power"].to_numpy(np.int64)
+    if size > 1 or not (power >= 0).any():
+        return gdf, None
+    ok = power >= 0
+    milestone_df = pd.DataFrame({
+        "Task": names[ok],
+        "Date": dates_from_ordinals(power[ok]),
+        "HoverText": [f"{name} • Permanent Power" for name in names[ok]],
+    })
+    return gdf, milestone_df
+
+
+def window_frame(windows, datetimes=False):
+    """Long form of phase_windows(): one (Building Name, Phase, Start, Finish) row per scheduled phase."""
+    names = windows["Building Name"].to_numpy()
+    starts = np.stack([windows[f"{p} Start"].to_numpy(np.int64) for p in GANTT_PHASES], axis=1).ravel()
+    finishes = np.stack([windows[f"{p} Finish"].to_numpy(np.int64) for p in GANTT_PHASES], axis=1).ravel()
+    ok = (starts >= 0) & (finishes >= 0)
+    convert = datetimes_from_ordinals if datetimes else dates_from_ordinals
+    return pd.DataFrame({
+        "Building Name": np.repeat(names, len(GANTT_PHASES))[ok],
+        "Phase": np.tile(np.array(GANTT_PHASES, dtype=object), len(names))[ok],
+        "Start": convert(starts[ok]),
+        "Finish": convert(finishes[ok]),
+    })
+
+
+def crew_report(spec, store):
+    """Utilization of the shared commissioning crews (None when crews are unlimited).
+
+    One row per crew: halls taken, first L3 start, last L4 finish, busy working
+    days (L3 + L4 per hall) and the share of the working days between the
+    campus's first L3 start and last L4 finish that the crew was busy.
+    """
+    crews = int(spec.commissioning_crews)
+    if not crews:
+        return None
+    h = store.halls[store.halls["Crew"] > 0]
+    crew = h["Crew"].astype(np.int64) - 1
+    halls = np.bincount(crew, minlength=crews)
+    busy = halls * (spec.durations.L3 + spec.durations.L4)
+    first = np.full(crews, -1, dtype=np.int64)
+    last = np.full(crews, -1, dtype=np.int64)
+    if len(h):
+        big = np.iinfo(np.int64).max
+        first = np.full(crews, big, dtype=np.int64)
+        np.minimum.at(first, crew, h["L3Start"])
+        first[halls == 0] = -1
+        np.maximum.at(last, crew, h["L4Finish"])
+        span = spec.calendar.workdays_between(
+            date.fromordinal(int(h["L3Start"].min())), date.fromordinal(int(h["L4Finish"].max())),
+            spec.construction_workdays,
+        )
+    else:
+        span = 0
+    return pd.DataFrame({
+        "Crew": np.arange(1, crews + 1),
+        "Halls": halls,
+        "First L3 Start": dates_from_ordinals(first),
+        "Last L4 Finish": dates_from_ordinals(last),
+        "Busy (WD)": busy,
+        "Utilization (%)": np.round(100 * busy / span, 1) if span else np.zeros(crews),
+    })
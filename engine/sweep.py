@@ -0,0 +1,158 @@
+"""Scenario sweep: schedule a grid of input overrides across a process pool.
+
+    python -m engine.sweep scenarios.csv -o results.parquet --workers 8
+
+Each scenario is a project definition (see engine.project) layered over an
+optional ``--base`` definition. The output is one hall-level table (the RFS
+table columns plus ``Scenario``), written in scenario order as chunks finish.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import pandas as pd
+
+from engine.project import load_records, spec_from_inputs
+from engine.store import schedule_store
+
+DATE_COLUMNS = ("Fitup Start", "Fitup Finish", "L3 Start", "Power Delivery", "Power Gate", "RFS (L5 Finish)")
+
+
+def scenario_ids(records):
+    return [str(r.get("scenario_id", i + 1)) for i, r in enumerate(records)]
+
+
+def run_chunk(chunk, base=None):
+    # chunk: list of (scenario_id, overrides); runs in a worker process
+    frames = []
+    for sid, overrides in chunk:
+        inputs = dict(base or {})
+        inputs.update({k: v for k, v in overrides.items() if k != "scenario_id"})
+        df = schedule_store(spec_from_inputs(inputs)).rfs_frame(datetimes=True)
+        df.insert(0, "Scenario", sid)
+        frames.append(df)
+    return _normalize(pd.concat(frames, ignore_index=True) if frames else pd.DataFrame())
+
+
+def _normalize(df):
+    # Stable column types across chunks so Parquet row groups share one schema
+    for col in DATE_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col])
+    if "Power Tranche" in df.columns:
+        df["Power Tranche"] = df["Power Tranche"].astype("Int64")
+    return df
+
+
+class _Writer:
+    def __init__(self, path):
+        self.path = path
+        self.rows = 0
+        self._parquet = None
+        self._csv_header = True
+        if os.path.exists(path):
+            os.remove(path)
+
+    def write(self, df):
+        if df.empty:
+            return
+        self.rows += len(df)
+        if self.path.lower().endswith(".parquet"):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.path, table.schema)
+            self._parquet.write_table(table.cast(self._parquet.schema))
+        else:
+            df.to_csv(self.path, mode="a", header=self._csv_header, index=False)
+            self._csv_header = False
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+
+
+def run_sweep(records, output, base=None, workers=None, chunk_size=32, progress=sys.stderr):
+    """Schedule every scenario and stream the hall-level table to ``output`` (.csv or .parquet)."""
+    ids = scenario_ids(records)
+    scenarios = list(zip(ids, records))
+    chunks = [scenarios[i:i + chunk_size] for i in range(0, len(scenarios), chunk_size)]
+    workers = workers or os.cpu_count() or 1
+    writer = _Writer(str(output))
+    start = time.perf_counter()
+    done_scenarios = 0
+
+    def report():
+        if progress is None:
+            return
+        elapsed = max(time.perf_counter() - start, 1e-9)
+        progress.write(
+            f"[sweep] {done_scenarios}/{len(scenarios)} scenarios "
+            f"({100.0 * done_scenarios / max(len(scenarios), 1):.0f}%) "
+            f"{done_scenarios / elapsed:.1f} scenarios/s\n"
+        )
+
+    try:
+        if workers <= 1:
+            for chunk in chunks:
+                writer.write(run_chunk(chunk, base))
+                done_scenarios += len(chunk)
+                report()
+        else:
+            # At most 2 chunks per worker in flight; finished chunks are held
+            # only until every earlier chunk has been written.
+            pending, ready = {}, {}
+            next_submit = next_write = 0
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                while next_write < len(chunks):
+                    while next_submit < len(chunks) and len(pending) + len(ready) < 2 * workers:
+                        fut = pool.submit(run_chunk, chunks[next_submit], base)
+                        pending[fut] = next_submit
+                        next_submit += 1
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for fut in finished:
+                        idx = pending.pop(fut)
+                        ready[idx] = fut.result()
+                        done_scenarios += len(chunks[idx])
+                    while next_write in ready:
+                        writer.write(ready.pop(next_write))
+                        next_write += 1
+                    report()
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - start
+    return {"scenarios": len(scenarios), "rows": writer.rows, "seconds": elapsed, "output": str(output)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a scenario sweep of the RFS schedule.")
+    parser.add_argument("scenarios", help="CSV, JSON or YAML list of input overrides")
+    parser.add_argument("-o", "--output", default="sweep_results.csv", help="Output .csv or .parquet")
+    parser.add_argument("--base", help="Project definition the overrides are applied to")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=32, help="Scenarios per task")
+    parser.add_argument("--quiet", action="store_true", help="No progress output")
+    args = parser.parse_args(argv)
+
+    base = None
+    if args.base:
+        base_records = load_records(args.base)
+        base = base_records[0] if base_records else None
+    summary = run_sweep(
+        load_records(args.scenarios),
+        args.output,
+        base=base,
+        workers=args.workers,
+        chunk_size=max(1, args.chunk_size),
+        progress=None if args.quiet else sys.stderr,
+    )
+    print(json.dumps(summary))
+
+
+if __name__ == "__main__":
+    main()
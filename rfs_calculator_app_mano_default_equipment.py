@@ -2,21 +2,29 @@
 import streamlit as st
 import pandas as pd
 
-from components.chart import render_gantt
+from components.chart import FULL_DETAIL_MAX_HALLS, render_energized_curve, render_timeline
 from components.card import render_kpi_card
 from components.table import render_styled_table
 from components.slider import render_styled_slider
+from components.diagnostics import finish_run, start_run
+from components.export import render_csv_download, render_exports
+from components.portfolio import render_portfolio_equipment, render_portfolio_results, render_portfolio_timeline
 
-import data.equipment as equipment
+from engine.cache import cached_optimize, cached_portfolio, cached_result, cached_risk
+from engine.export import sheet_tables
+from engine.montecarlo import RiskSpec, Triangular
+from engine.portfolio import read_buildings
+from engine.reverse import latest_dates
+from engine.spec import DEFAULT_HALLS, DEFAULT_MW_PER_HALL, Durations, Gates, ProjectSpec, buildings_from_records, preset_durations
 
-import utils.building as building
 import utils.css as styling
 import utils.date as date_utils
-import utils.colors as colors
 
 st.set_page_config(page_title="Mano RFS Calculator", layout="wide")
+timer = start_run()
 styling.inject_custom_css()
 st.logo("./assets/images/Mano_Logo_Main.svg", icon_image="./assets/images/Mano_Mark_Mark.svg")
+timer.lap("css")
 
 
 # ======================= Sidebar (Inputs) =======================
@@ -39,7 +47,7 @@ with st.sidebar:
     ldp = st.date_input("Land Disturbance Permit", value=date_utils.date(today_year, 2, 1))
     bp  = st.date_input("Building Permit", value=date_utils.date(today_year, 5, 1))
     perm_power = st.date_input("Permanent Power Delivery (Tranche 1)", value=date_utils.date(today_year, 12, 1))
-    power_tranche_count = st.number_input("Number of Power Tranches", min_value=1, max_value=5, value=1, step=1)
+    power_tranche_count = st.number_input("Number of Power Tranches", min_value=1, max_value=50, value=1, step=1)
     power_tranche_dates = [perm_power]
     for i in range(2, int(power_tranche_count) + 1):
         default_offset = date_utils.timedelta(days=90 * (i - 1))
@@ -48,182 +56,133 @@ with st.sidebar:
         power_tranche_dates.append(
             st.date_input(label, value=default_value, key=f"power_tranche_{i}")
         )
+    limit_tranche_mw = st.checkbox(
+        "Limit tranches by MW capacity", value=False,
+        help="Each hall takes its MW from the earliest tranche with enough capacity left. Off: each tranche serves a fixed number of halls.",
+    )
+    power_tranche_mw = []
+    if limit_tranche_mw:
+        for i in range(1, int(power_tranche_count) + 1):
+            power_tranche_mw.append(st.number_input(
+                f"Tranche {i} Capacity (MW)", min_value=0.0, value=DEFAULT_HALLS * DEFAULT_MW_PER_HALL, step=10.0,
+                key=f"power_tranche_mw_{i}",
+            ))
     temp_power_allowed = st.checkbox("Allow L3/L4 on Temporary Power", value=False)
     temp_power_date = st.date_input("Temporary Power Available", value=None, disabled=not temp_power_allowed)
 
     st.divider()
     st.header("Buildings")
-    num_buildings = st.number_input("Number of Buildings", min_value=1, max_value=10, value=2, step=1)
+    portfolio_file = st.file_uploader(
+        "Portfolio file (optional)", type=["csv", "xlsx", "json"],
+        help="One row per building with Building Name, Halls and MW (total). Schedules thousands of buildings.",
+    )
+    portfolio_buildings = None
+    if portfolio_file is not None:
+        try:
+            portfolio_buildings = read_buildings(portfolio_file, portfolio_file.name)
+            st.caption(f"Portfolio mode: {len(portfolio_buildings):,} buildings from {portfolio_file.name}.")
+        except ValueError as exc:
+            st.error(str(exc))
+    if portfolio_buildings is None:
+        num_buildings = st.number_input("Number of Buildings", min_value=1, max_value=10, value=2, step=1)
     building_offset = st.number_input("Offset between buildings (days)", min_value=0, max_value=3650, value=90, step=5)
 
-    # Per-building config editor: Name, Halls, MW — defaults prefilled
-    default_rows = []
-    for i in range(1, int(num_buildings)+1):
-        default_rows.append({"Building Name": f"{base_building_name} {i}", "Halls": 8, "MW (total)": 16.8 * 8})
-    st.caption("Edit buildings individually (name, # halls, total MW).")
-    build_df = st.data_editor(pd.DataFrame(default_rows), hide_index=True, num_rows="fixed", use_container_width=True)
+    if portfolio_buildings is None:
+        # Per-building config editor: Name, Halls, MW — defaults prefilled
+        default_rows = []
+        for i in range(1, int(num_buildings)+1):
+            default_rows.append({"Building Name": f"{base_building_name} {i}", "Halls": 8, "MW (total)": 16.8 * 8})
+        st.caption("Edit buildings individually (name, # halls, total MW).")
+        build_df = st.data_editor(pd.DataFrame(default_rows), hide_index=True, num_rows="fixed", use_container_width=True)
 
     st.divider()
     st.header("Durations (working days)")
-    site_work = 100; shell = 185; mep_yard = 65; fitup = 50; L3d = 40; L4d = 15; L5d = 2
-    scale = {"Typical":1.0, "Aggressive (-10%)":0.9, "Conservative (+15%)":1.15}[preset]
-    site_work = int(round(site_work*scale))
-    shell = int(round(shell*scale))
-    mep_yard = max(1, int(round(mep_yard*scale)))
-    fitup = max(1, int(round(fitup*scale)))
-    L3d = int(round(L3d*scale))
-    L4d = int(round(L4d*scale))
-    L5d = max(1,int(round(L5d*scale)))
+    defaults = preset_durations(preset)
 
     # Sliders
-    site_work = render_styled_slider("Site Work", 40, 180, site_work)
-    shell = render_styled_slider("Shell", 60, 300, shell)
-    mep_yard = render_styled_slider("MEP Yard", 30, 180, mep_yard)
+    site_work = render_styled_slider("Site Work", 40, 180, defaults.site_work)
+    shell = render_styled_slider("Shell", 60, 300, defaults.shell)
+    mep_yard = render_styled_slider("MEP Yard", 30, 180, defaults.mep_yard)
     dryin_offset_input = render_styled_slider(
         "Dry‑In point within Shell (working days)",
         10,
         260,
-        100,
+        defaults.dryin_offset,
         "Dry‑In is capped at the shell duration.",
     )
-    fitup = render_styled_slider("Hall Fitup", 20, 200, fitup)
-    L3d = render_styled_slider("Commissioning L3", 5, 90, L3d)
-    L4d = render_styled_slider("Commissioning L4", 5, 60, L4d)
-    L5d = render_styled_slider("Commissioning L5", 1, 30, L5d)
+    fitup = render_styled_slider("Hall Fitup", 20, 200, defaults.fitup)
+    L3d = render_styled_slider("Commissioning L3", 5, 90, defaults.L3)
+    L4d = render_styled_slider("Commissioning L4", 5, 60, defaults.L4)
+    L5d = render_styled_slider("Commissioning L5", 1, 30, defaults.L5)
+    commissioning_crews = st.number_input(
+        "Shared L3/L4 crews (0 = unlimited)", min_value=0, max_value=500, value=0, step=1,
+        help="Commissioning crews shared by all buildings. A crew takes a hall from its L3 start to its L4 finish; halls that are ready wait for the first free crew.",
+    )
 
     # Reset
     if st.button("Reset to Defaults"):
         st.session_state.clear()
         st.rerun()
 
-# Determine a broad year range for holidays automatically (no UI)
-max_year = 2040
-min_year = min(ntp.year, ldp.year, bp.year)
-years = list(range(min_year, max_year+1))
-HOLIDAYS = date_utils.expand_holidays(country, years)
-
-# ======================= Scheduling per building =======================
-WW_CONST = 6 if six_day_construction else 5
-WW_ADMIN = 5
-
-class PowerAllocator:
-    def __init__(self, tranche_dates, halls_per_tranche=12):
-        self.tranche_dates = sorted([d for d in tranche_dates if d])
-        self.halls_per_tranche = max(1, int(halls_per_tranche))
-        self.assigned = 0
-
-    def assign(self):
-        if not self.tranche_dates:
-            return None, None
-        idx = min(self.assigned // self.halls_per_tranche, len(self.tranche_dates) - 1)
-        date = self.tranche_dates[idx]
-        self.assigned += 1
-        return idx, date
-
-def max_date(*dates):
-    valid = [d for d in dates if d is not None]
-    return max(valid) if valid else None
-
-def min_date(*dates):
-    valid = [d for d in dates if d is not None]
-    return min(valid) if valid else None
-
-def schedule_building(build_idx:int, row, power_allocator: PowerAllocator):
-    bname = str(row["Building Name"])
-    halls_count = int(row["Halls"])
-    total_mw = float(row["MW (total)"]) if pd.notna(row["MW (total)"]) else 0.0
-    mw_per_hall = total_mw / halls_count if halls_count > 0 else 0
-
-    offset = (build_idx-1) * int(building_offset)
-    gates = {
-        "ntp": ntp + date_utils.timedelta(days=offset),
-        "ldp": ldp + date_utils.timedelta(days=offset),
-        "bp": bp + date_utils.timedelta(days=offset),
-        "perm_power": perm_power + date_utils.timedelta(days=offset),
-        "temp_power": (temp_power_date + date_utils.timedelta(days=offset)) if (temp_power_allowed and temp_power_date) else None,
-    }
-
-    civil_start = max(gates["ntp"], gates["ldp"])
-    civil_finish = date_utils.add_workdays(civil_start, site_work, HOLIDAYS, workdays_per_week=WW_CONST)
-
-    shell_trigger = date_utils.add_workdays(civil_start, 80, HOLIDAYS, workdays_per_week=WW_CONST)
-    shell_start = max(shell_trigger, gates["bp"])
-    shell_finish = date_utils.add_workdays(shell_start, shell, HOLIDAYS, workdays_per_week=WW_CONST)
-    dryin_wd = max(1, min(shell, int(round(dryin_offset_input))))
-    dryin_date = date_utils.add_workdays(shell_start, dryin_wd, HOLIDAYS, workdays_per_week=WW_CONST)
-
-    mep_finish = shell_finish
-    mep_start = date_utils.add_workdays(mep_finish, -mep_yard, HOLIDAYS, workdays_per_week=WW_CONST)
-    fitup_gate = date_utils.add_workdays(mep_start, 40, HOLIDAYS, workdays_per_week=WW_CONST)
-    fitup_start = max_date(dryin_date, fitup_gate)
-    fitup_finish = date_utils.add_workdays(fitup_start, fitup, HOLIDAYS, workdays_per_week=WW_CONST)
-
-    def commissioning_power_gate(power_gate):
-        if temp_power_allowed and gates["temp_power"]:
-            return min_date(power_gate, gates["temp_power"])
-        return power_gate
-
-    def schedule_one_hall(prev_l3_start):
-        tranche_idx, tranche_date = power_allocator.assign() if power_allocator else (None, None)
-        power_gate = max_date(gates["perm_power"], tranche_date)
-        pwr_gate_L34 = commissioning_power_gate(power_gate)
-
-        l3_candidates = [fitup_finish, pwr_gate_L34]
-        if prev_l3_start:
-            l3_candidates.append(date_utils.add_workdays(prev_l3_start, 5, HOLIDAYS, workdays_per_week=WW_CONST))
-        L3_start = max_date(*l3_candidates)
-        L3_finish = date_utils.add_workdays(L3_start, L3d, HOLIDAYS, workdays_per_week=WW_CONST)
-        L4_start = L3_finish
-        L4_finish = date_utils.add_workdays(L4_start, L4d, HOLIDAYS, workdays_per_week=WW_CONST)
-        L5_start = max_date(L4_finish, power_gate)
-        L5_finish = date_utils.add_workdays(L5_start, L5d, HOLIDAYS, workdays_per_week=WW_CONST)
-        return dict(FitupStart=fitup_start, FitupFinish=fitup_finish,
-                    L3Start=L3_start, L3Finish=L3_finish,
-                    L4Start=L4_start, L4Finish=L4_finish,
-                    L5Start=L5_start, L5Finish=L5_finish, RFS=L5_finish,
-                    PowerTranche=(tranche_idx + 1) if tranche_idx is not None else None,
-                    PowerDeliveryDate=tranche_date, PowerGate=power_gate)
-
-    halls = []
-    prev_l3_start = None
-    for _ in range(halls_count):
-        h = schedule_one_hall(prev_l3_start)
-        halls.append(h)
-        prev_l3_start = h["L3Start"]
-
-    return dict(
-        building_name=bname,
-        halls_count=halls_count,
-        mw_per_hall=mw_per_hall,
-        civil_start=civil_start, civil_finish=civil_finish,
-        shell_start=shell_start, shell_finish=shell_finish,
-        mep_start=mep_start, mep_finish=mep_finish,
-        dryin_date=dryin_date, perm_power=gates["perm_power"],
-        halls=halls,
-        gates=gates
-    )
-
-# Build schedules
-power_tranche_dates = [d for d in power_tranche_dates if d]
-build_df = build_df.fillna({"Halls":8, "MW (total)":16.8 * 8})
-avg_halls = build_df["Halls"].mean() if not build_df.empty else 8
-halls_per_tranche = max(1, int(round(avg_halls * 1.5)))
-power_allocator = PowerAllocator(power_tranche_dates, halls_per_tranche=halls_per_tranche)
-
-buildings = []
-for i in range(len(build_df)):
-    buildings.append(schedule_building(i+1, build_df.iloc[i], power_allocator))
-
-equip_rows = []
-for b in buildings:
-    equip_rows.extend(building.get_modeled_equipment_rows(b, WW_ADMIN, HOLIDAYS))
-EQUIP_DF = pd.DataFrame(equip_rows)
+timer.lap("sidebar")
+
+# ======================= Scheduling (headless engine) =======================
+spec = ProjectSpec(
+    gates=Gates(
+        ntp=ntp, ldp=ldp, bp=bp, perm_power=perm_power,
+        temp_power=temp_power_date if temp_power_allowed else None,
+    ),
+    durations=Durations(
+        site_work=site_work, shell=shell, mep_yard=mep_yard, dryin_offset=dryin_offset_input,
+        fitup=fitup, L3=L3d, L4=L4d, L5=L5d,
+    ),
+    buildings=portfolio_buildings if portfolio_buildings is not None else buildings_from_records(build_df.to_dict("records")),
+    power_tranches=tuple(d for d in power_tranche_dates if d),
+    power_tranche_mw=tuple(mw for d, mw in zip(power_tranche_dates, power_tranche_mw) if d),
+    building_offset=int(building_offset),
+    commissioning_crews=int(commissioning_crews),
+    country=country,
+    construction_workdays=6 if six_day_construction else 5,
+    admin_workdays=5,
+)
+
+FOOTER_HTML = '<p class="small-muted">Calendar uses United States public holidays • Site Work waits for Notice to Proceed & Land Disturbance Permit • Shell waits for the Building Permit and begins 80 working days after Site Work starts • MEP Yard runs finish-to-finish with Shell • Hall Fitup starts once Dry‑In is achieved and at least 40 working days after MEP Yard starts • L3 ties to the prior hall (SS+5) and L3/L4 may use Temporary Power • L5 waits for Permanent Power • House equipment ≥ Dry‑In; Hall equipment during Fitup.</p>'
+
+# Only the selected view runs, so e.g. the Timeline figure is built only when it is shown
+VIEWS = ["Results", "Timeline", "Equipment List", "Risk", "Targets"]
+
+# ======================= Portfolio mode (uploaded building list) =======================
+if portfolio_buildings is not None:
+    st.title("RFS Calculator")
+    progress = st.progress(0.0, text="Scheduling portfolio…")
+    portfolio = cached_portfolio(spec, progress=lambda done, total: progress.progress(done / total, text=f"Scheduling portfolio… {done:,}/{total:,} buildings"))
+    progress.empty()
+    timer.lap("schedule")
+    view = st.radio("View", VIEWS[:3], horizontal=True, label_visibility="collapsed", key="portfolio_view")
+    if view == "Results":
+        render_portfolio_results(spec, portfolio)
+    elif view == "Timeline":
+        st.subheader("Project Timeline")
+        render_portfolio_timeline(spec, portfolio)
+    else:
+        st.subheader("Equipment List")
+        render_portfolio_equipment(spec, portfolio)
+    timer.lap(f"view:{view}")
+    st.markdown(FOOTER_HTML, unsafe_allow_html=True)
+    finish_run(timer)
+    st.stop()
+
+# Reruns with unchanged inputs reuse the cached schedule and frames
+result = cached_result(spec)
+buildings = result.buildings
+EQUIP_DF = result.equipment
+timer.lap("schedule")
 
 # ======================= UI =======================
 st.title("RFS Calculator")
-tab1, tab2, tab3 = st.tabs(["Results", "Timeline", "Equipment List"])
+view = st.radio("View", VIEWS, horizontal=True, label_visibility="collapsed", key="view")
 
-with tab1:
+if view == "Results":
     st.subheader("Key Milestones per Building")
     for b in buildings:
         container = st.container()
@@ -240,82 +199,43 @@ with tab1:
         container.markdown(combinedCards, unsafe_allow_html=True)
     st.divider()
     st.subheader("Data Hall RFS (All Buildings)")
-    rows = []
-    for b in buildings:
-        for j, h in enumerate(b["halls"], start=1):
-            rows.append({
-                "Building Name": b["building_name"],
-                "Hall": j,
-                "Fitup Start": h["FitupStart"],
-                "Fitup Finish": h["FitupFinish"],
-                "L3 Start": h["L3Start"],
-                "Power Tranche": h.get("PowerTranche"),
-                "Power Delivery": h.get("PowerDeliveryDate"),
-                "Power Gate": h.get("PowerGate"),
-                "RFS (L5 Finish)": h["RFS"]
-            })
-    rfs_df = pd.DataFrame(rows)
+    rfs_df = result.rfs
     # st.dataframe(rfs_df, hide_index=True, use_container_width=True)
 
-    render_styled_table(rfs_df)
+    render_styled_table(rfs_df, key="rfs")
+
+    render_csv_download(spec, "rfs", "RFS", rfs_df, "rfs_multi_building.csv")
+    st.caption("Total Float: working days a hall's RFS can slip before its building's last RFS does. Driving Gate: the gate at the start of the chain that sets the hall's dates.")
+    with st.expander("Critical path (all activities)"):
+        st.dataframe(result.network, hide_index=True, use_container_width=True)
 
-    st.download_button("Download RFS (CSV)", rfs_df.to_csv(index=False).encode("utf-8"), "rfs_multi_building.csv", "text/csv")
+    st.divider()
+    st.subheader("Power")
+    if result.over_capacity_mw > 0:
+        st.warning(f"{result.over_capacity_mw:,.1f} MW of halls exceed the tranche capacities and are placed on the last tranche.")
+    render_energized_curve(result.energized, result.tranches)
+    st.dataframe(result.tranches, hide_index=True, use_container_width=True)
+
+    if result.crews is not None:
+        st.divider()
+        st.subheader("Commissioning Crews")
+        st.caption(f"{len(result.crews)} shared L3/L4 crews • average utilization {result.crews['Utilization (%)'].mean():.1f}% of the working days from the first L3 start to the last L4 finish")
+        st.dataframe(result.crews, hide_index=True, use_container_width=True)
+
+    st.divider()
+    st.subheader("Export")
+    render_exports(spec, "project", lambda: sheet_tables(result.rfs, result.equipment, result.store.phase_windows()))
 
-with tab2:
+elif view == "Timeline":
     st.subheader("Project Timeline")
-    gantt_rows = []
-    milestone_rows = []
-    aggregate_windows = {"Site Work": [], "Shell": [], "MEP Yard": [], "Fitup": []}
-    for b in buildings:
-        aggregate_windows["Site Work"].append((b["civil_start"], b["civil_finish"]))
-        aggregate_windows["Shell"].append((b["shell_start"], b["shell_finish"]))
-        aggregate_windows["MEP Yard"].append((b["mep_start"], b["mep_finish"]))
-
-        fitup_window = None
-        for j, h in enumerate(b["halls"], start=1):
-            if fitup_window is None:
-                fitup_window = (h["FitupStart"], h["FitupFinish"])
-                aggregate_windows["Fitup"].append(fitup_window)
-                if b["perm_power"]:
-                    milestone_rows.append({
-                        "Task": "Fitup",
-                        "Date": b["perm_power"],
-                        "HoverText": f"{b['building_name']} • Permanent Power",
-                    })
-            gantt_rows += [
-                {"Task": f"{b['building_name']} • Hall {j} • L3",     "Start": h["L3Start"],    "Finish": h["L3Finish"],   "Phase":"L3"},
-                {"Task": f"{b['building_name']} • Hall {j} • L4",     "Start": h["L4Start"],    "Finish": h["L4Finish"],   "Phase":"L4"},
-                {"Task": f"{b['building_name']} • Hall {j} • L5",     "Start": h["L5Start"],    "Finish": h["L5Finish"],   "Phase":"L5"},
-            ]
-        if fitup_window is None and b["perm_power"]:
-            milestone_rows.append({
-                "Task": "Site Work",
-                "Date": b["perm_power"],
-                "HoverText": f"{b['building_name']} • Permanent Power",
-            })
-    for phase, windows in aggregate_windows.items():
-        starts = [w[0] for w in windows if w[0] is not None]
-        finishes = [w[1] for w in windows if w[1] is not None]
-        if starts and finishes:
-            gantt_rows.append({
-                "Task": phase,
-                "Start": min(starts),
-                "Finish": max(finishes),
-                "Phase": phase,
-            })
-    gdf = pd.DataFrame(gantt_rows)
-    if not gdf.empty:
-        gdf = gdf.sort_values(
-            by=["Finish", "Start"], na_position="last", kind="mergesort"
-        )
-        gdf = gdf[~gdf["Task"].duplicated(keep="first")].reset_index(drop=True)
-    milestone_df = pd.DataFrame(milestone_rows) if milestone_rows else None
-    render_gantt(gdf, milestone_df)
+    store = result.store
+    full = (result.gantt, result.milestones) if len(store.halls) <= FULL_DETAIL_MAX_HALLS else None
+    render_timeline(store.phase_windows(), lambda i: store.subset(i).gantt_frames(), full=full)
 
-with tab3:
+elif view == "Equipment List":
     st.subheader("Equipment List")
     # st.dataframe(EQUIP_DF, hide_index=True, use_container_width=True)
-    render_styled_table(EQUIP_DF, highlight_release_within_days=30)
+    render_styled_table(EQUIP_DF, highlight_release_within_days=30, key="equipment")
     st.markdown(
         """
         <div class="equipment-legend">
@@ -326,6 +246,93 @@ with tab3:
         """,
         unsafe_allow_html=True,
     )
-    st.download_button("Download Equipment (CSV)", EQUIP_DF.to_csv(index=False).encode("utf-8"), "equipment_roj.csv", "text/csv")
+    render_csv_download(spec, "equipment", "Equipment", EQUIP_DF, "equipment_roj.csv")
+
+elif view == "Risk":
+    st.subheader("RFS Risk (Monte Carlo)")
+    st.caption("Durations are drawn from a triangular distribution around the slider values; permits and power may slip by a number of calendar days.")
+    if spec.commissioning_crews:
+        st.caption("Every iteration shares the commissioning crews across all buildings, like the deterministic schedule.")
+    with st.form("risk_form"):
+        c1, c2, c3 = st.columns(3)
+        iterations = c1.number_input("Iterations", min_value=100, max_value=100000, value=10000, step=1000)
+        low_pct = c2.number_input("Best case (% of duration)", min_value=50, max_value=100, value=90, step=5)
+        high_pct = c3.number_input("Worst case (% of duration)", min_value=100, max_value=300, value=125, step=5)
+        c4, c5, c6 = st.columns(3)
+        permit_slip = c4.number_input("Max permit slip (days)", min_value=0, max_value=365, value=0, step=5)
+        power_slip = c5.number_input("Max power slip (days)", min_value=0, max_value=365, value=0, step=5)
+        seed = c6.number_input("Random seed", min_value=0, value=0, step=1)
+        run_risk = st.form_submit_button("Run Simulation")
+    if run_risk:
+        st.session_state["risk_spec"] = RiskSpec(
+            iterations=int(iterations),
+            duration_spread=Triangular(low_pct / 100, 1.0, high_pct / 100),
+            permit_slip_days=Triangular(0, permit_slip / 4, permit_slip) if permit_slip else None,
+            power_slip_days=Triangular(0, power_slip / 4, power_slip) if power_slip else None,
+            seed=int(seed),
+        )
+    if "risk_spec" in st.session_state:
+        risk = cached_risk(spec, st.session_state["risk_spec"])
+        st.markdown("**Per Building (last hall RFS)**")
+        render_styled_table(risk.buildings, key="risk_buildings")
+        st.markdown("**Per Hall**")
+        render_styled_table(risk.halls, key="risk_halls")
+
+elif view == "Targets":
+    st.subheader("Latest Gate Dates for RFS Targets")
+    st.caption("Set a target RFS per building (blank Hall: its last hall) or for one hall. One backward pass over the schedule gives the latest date each gate can arrive, and the latest equipment releases, that still meet every target. Slack is in working days; negative means the gate is already too late.")
+    if spec.commissioning_crews:
+        st.caption("Halls keep their current order on the shared commissioning crews.")
+    last_rfs = result.store.building_frame(datetimes=False)
+    targets_df = st.data_editor(
+        pd.DataFrame({
+            "Building Name": last_rfs["Building Name"],
+            "Hall": pd.array([None] * len(last_rfs), dtype="Int64"),
+            "Target RFS": last_rfs["Last RFS"],
+        }),
+        hide_index=True, num_rows="fixed", use_container_width=True, disabled=["Building Name"], key="rfs_targets",
+        column_config={
+            "Hall": st.column_config.NumberColumn("Hall", min_value=1, step=1, help="Blank: every hall of the building"),
+            "Target RFS": st.column_config.DateColumn("Target RFS"),
+        },
+    )
+    targets = {
+        (row["Building Name"] if pd.isna(row["Hall"]) else (row["Building Name"], int(row["Hall"]))): pd.Timestamp(row["Target RFS"]).date()
+        for row in targets_df.to_dict("records") if not pd.isna(row["Target RFS"])
+    }
+    try:
+        latest_gates, latest_equipment = latest_dates(spec, targets, result.store)
+    except ValueError as exc:
+        st.error(str(exc))
+    else:
+        st.markdown("**Latest Gate Dates**")
+        render_styled_table(latest_gates, key="latest_gates")
+        st.markdown("**Latest Equipment Releases**")
+        render_styled_table(latest_equipment, highlight_release_within_days=30, key="latest_equipment")
+        render_csv_download(spec, "latest_gates", "Latest Gate Dates", latest_gates, "latest_gate_dates.csv")
+
+    st.divider()
+    st.subheader("Optimize Offset and Power Tranches")
+    st.caption("Searches for the widest offset between buildings, then the latest power tranche deliveries, that still meet the building targets above (rows with a Hall are ignored). Tranche 1 moves with Permanent Power.")
+    if st.button("Optimize"):
+        st.session_state["optimize_targets"] = {k: d for k, d in targets.items() if not isinstance(k, tuple)}
+    if "optimize_targets" in st.session_state:
+        optimized = cached_optimize(spec, st.session_state["optimize_targets"])
+        if not optimized.feasible:
+            st.warning("The targets are missed even with no offset and power on the notice to proceed date.")
+        c1, c2 = st.columns(2)
+        c1.metric("Offset between buildings (days)", optimized.building_offset, optimized.building_offset - spec.building_offset)
+        c2.metric("Schedules evaluated", optimized.evaluations, help=f"{optimized.seconds * 1e3:.0f} ms")
+        st.dataframe(
+            pd.DataFrame({
+                "Tranche": range(1, len(spec.power_tranches) + 1),
+                "Current Delivery": spec.power_tranches,
+                "Optimized Delivery": optimized.power_tranches,
+            }),
+            hide_index=True, use_container_width=True,
+        )
+        render_styled_table(optimized.buildings, key="optimized_buildings")
 
-st.markdown('<p class="small-muted">Calendar uses United States public holidays • Site Work waits for Notice to Proceed & Land Disturbance Permit • Shell waits for the Building Permit and begins 80 working days after Site Work starts • MEP Yard runs finish-to-finish with Shell • Hall Fitup starts once Dry‑In is achieved and at least 40 working days after MEP Yard starts • L3 ties to the prior hall (SS+5) and L3/L4 may use Temporary Power • L5 waits for Permanent Power • House equipment ≥ Dry‑In; Hall equipment during Fitup.</p>', unsafe_allow_html=True)
+timer.lap(f"view:{view}")
+st.markdown(FOOTER_HTML, unsafe_allow_html=True)
+finish_run(timer)
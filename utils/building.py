@@ -2,6 +2,7 @@ import math
 from datetime import date, datetime
 
 import utils.date as date_utils
+from utils.workdays import dates_from_ordinals
 import data.equipment as equipment
 
 
@@ -32,34 +33,69 @@ def _equipment_status(release_needed):
 
 
 def get_modeled_equipment_rows(b, ww, holidays):
+    rows = []
+    for item in equipment.RAW_EQUIPMENT:
+        rows.extend(get_item_rows(b, item, ww, holidays))
+    return rows
+
+
+def get_item_rows(b, item, ww, holidays):
+    # Rows for one catalog item: a single House row, or one row per hall
     rows = []
     first_hall = b["halls"][0] if b.get("halls") else None
 
-    for item in equipment.RAW_EQUIPMENT:
-        lead_wd = int(item.get("lead_time_wd") or 0)
-        buffer_wd = int(item.get("buffer_wd_before_L3") or 0)
-        if item["scope"] == "house":
-            desired = None
-            if first_hall and first_hall.get("L3Start"):
-                ideal = first_hall["L3Start"]
-                if buffer_wd:
-                    ideal = date_utils.add_workdays(ideal, -buffer_wd, holidays, workdays_per_week=ww)
-                desired = date_utils.clamp(ideal, b.get("dryin_date"), None)
+    lead_wd = int(item.get("lead_time_wd") or 0)
+    buffer_wd = int(item.get("buffer_wd_before_L3") or 0)
+    if item["scope"] == "house":
+        desired = None
+        if first_hall and first_hall.get("L3Start"):
+            ideal = first_hall["L3Start"]
+            if buffer_wd:
+                ideal = date_utils.add_workdays(ideal, -buffer_wd, holidays, workdays_per_week=ww)
+            desired = date_utils.clamp(ideal, b.get("dryin_date"), None)
+
+        release_needed = date_utils.add_workdays(desired, -lead_wd, holidays, workdays_per_week=ww) if (desired and lead_wd) else None
+        release_date = release_needed
+        site_accept = date_utils.add_workdays(release_date, lead_wd, holidays, workdays_per_week=ww) if (release_date and lead_wd) else release_date
+
+        roj = desired
+        if site_accept and (roj is None or site_accept > roj):
+            roj = site_accept
+        if roj and b.get("dryin_date") and roj < b["dryin_date"]:
+            roj = b["dryin_date"]
+
+        rows.append({
+            "Building Name": b["building_name"],
+            "Equipment": item["Equipment"],
+            "Location": "House",
+            "Release Needed": release_needed,
+            "Status": _equipment_status(release_needed),
+            "Lead Time (weeks)": _lead_time_weeks(lead_wd),
+            "Site Acceptance": site_accept,
+            "ROJ Target": desired,
+            "ROJ": roj,
+        })
+    else:
+        for idx, hall in enumerate(b.get("halls", []), start=1):
+            ideal = hall.get("L3Start")
+            if ideal and buffer_wd:
+                ideal = date_utils.add_workdays(ideal, -buffer_wd, holidays, workdays_per_week=ww)
+            desired = date_utils.clamp(ideal, hall.get("FitupStart"), hall.get("FitupFinish")) if ideal else None
 
             release_needed = date_utils.add_workdays(desired, -lead_wd, holidays, workdays_per_week=ww) if (desired and lead_wd) else None
             release_date = release_needed
             site_accept = date_utils.add_workdays(release_date, lead_wd, holidays, workdays_per_week=ww) if (release_date and lead_wd) else release_date
 
             roj = desired
+            if roj and hall.get("FitupStart") and roj < hall["FitupStart"]:
+                roj = hall["FitupStart"]
             if site_accept and (roj is None or site_accept > roj):
                 roj = site_accept
-            if roj and b.get("dryin_date") and roj < b["dryin_date"]:
-                roj = b["dryin_date"]
 
             rows.append({
                 "Building Name": b["building_name"],
-                "Equipment": item["Equipment"],
-                "Location": "House",
+                "Equipment": f'{item["Equipment"]} (Hall {idx})',
+                "Location": "Hall",
                 "Release Needed": release_needed,
                 "Status": _equipment_status(release_needed),
                 "Lead Time (weeks)": _lead_time_weeks(lead_wd),
@@ -67,32 +103,138 @@ def get_modeled_equipment_rows(b, ww, holidays):
                 "ROJ Target": desired,
                 "ROJ": roj,
             })
-        else:
-            for idx, hall in enumerate(b.get("halls", []), start=1):
-                ideal = hall.get("L3Start")
-                if ideal and buffer_wd:
-                    ideal = date_utils.add_workdays(ideal, -buffer_wd, holidays, workdays_per_week=ww)
-                desired = date_utils.clamp(ideal, hall.get("FitupStart"), hall.get("FitupFinish")) if ideal else None
-
-                release_needed = date_utils.add_workdays(desired, -lead_wd, holidays, workdays_per_week=ww) if (desired and lead_wd) else None
-                release_date = release_needed
-                site_accept = date_utils.add_workdays(release_date, lead_wd, holidays, workdays_per_week=ww) if (release_date and lead_wd) else release_date
-
-                roj = desired
-                if roj and hall.get("FitupStart") and roj < hall["FitupStart"]:
-                    roj = hall["FitupStart"]
-                if site_accept and (roj is None or site_accept > roj):
-                    roj = site_accept
-
-                rows.append({
-                    "Building Name": b["building_name"],
-                    "Equipment": f'{item["Equipment"]} (Hall {idx})',
-                    "Location": "Hall",
-                    "Release Needed": release_needed,
-                    "Status": _equipment_status(release_needed),
-                    "Lead Time (weeks)": _lead_time_weeks(lead_wd),
-                    "Site Acceptance": site_accept,
-                    "ROJ Target": desired,
-                    "ROJ": roj,
-                })
     return rows
+
+
+# ======================= Columnar procurement model =======================
+# Same rules as get_item_rows for every building x item x hall at once: dates
+# are int ordinals (-1 = missing) and workday shifts are table lookups, so the
+# cost is a few array operations however large the catalog or portfolio is.
+EQUIPMENT_COLUMNS = [
+    "Building Name", "Equipment", "Location", "Release Needed", "Status",
+    "Lead Time (weeks)", "Site Acceptance", "ROJ Target", "ROJ",
+]
+
+
+def _ordinal(d):
+    if d is None:
+        return -1
+    if isinstance(d, datetime):
+        d = d.date()
+    return d.toordinal()
+
+
+def _catalog_template(catalog, n_halls):
+    # Row layout for one building with n_halls halls: (item index, hall index or -1, label)
+    import numpy as np
+    items, halls, labels = [], [], []
+    for i, item in enumerate(catalog):
+        if item["scope"] == "house":
+            items.append(i)
+            halls.append(0 if n_halls else -1)
+            labels.append(item["Equipment"])
+        else:
+            for j in range(n_halls):
+                items.append(i)
+                halls.append(j)
+                labels.append(f'{item["Equipment"]} (Hall {j + 1})')
+    return np.array(items, dtype=np.int64), np.array(halls, dtype=np.int64), np.array(labels, dtype=object)
+
+
+EQUIPMENT_DATE_COLUMNS = ("Release Needed", "Site Acceptance", "ROJ Target", "ROJ")
+
+
+def equipment_columns(names, hall_counts, dryin, l3, fitup_start, fitup_finish, ww, holidays, catalog=None, today=None):
+    """Columnar procurement model on date ordinals (-1 = missing).
+
+    ``names``, ``hall_counts`` and ``dryin`` are per building; ``l3``,
+    ``fitup_start`` and ``fitup_finish`` are per hall, flat in building order.
+    Returns the EQUIP_DF columns with the date columns as ordinal arrays.
+    """
+    import numpy as np
+
+    catalog = equipment.RAW_EQUIPMENT if catalog is None else catalog
+    today = (today or date.today()).toordinal()
+    lead = np.array([int(item.get("lead_time_wd") or 0) for item in catalog], dtype=np.int64)
+    buffer = np.array([int(item.get("buffer_wd_before_L3") or 0) for item in catalog], dtype=np.int64)
+    house = np.array([item["scope"] == "house" for item in catalog], dtype=bool)
+
+    hall_counts = np.asarray(hall_counts, dtype=np.int64)
+    templates = {int(n): _catalog_template(catalog, int(n)) for n in np.unique(hall_counts)}
+    layout = [templates[int(n)] for n in hall_counts]
+    if not layout or not sum(len(t[0]) for t in layout):
+        return {c: np.empty(0, dtype=object) for c in EQUIPMENT_COLUMNS}
+    rows_per_building = np.array([len(t[0]) for t in layout], dtype=np.int64)
+    row_building = np.repeat(np.arange(len(layout)), rows_per_building)
+    item_idx = np.concatenate([t[0] for t in layout])
+    hall_local = np.concatenate([t[1] for t in layout])
+    labels = np.concatenate([t[2] for t in layout])
+
+    # Hall-level fields for each row (house rows read the building's first hall)
+    hall_base = np.cumsum(hall_counts) - hall_counts
+    has_hall = hall_local >= 0
+    hall_at = np.where(has_hall, hall_local + hall_base[row_building], 0)
+
+    def per_hall(values):
+        values = np.append(np.asarray(values, dtype=np.int64), -1)
+        return np.where(has_hall, values[hall_at], -1)
+
+    l3, fs, ff = per_hall(l3), per_hall(fitup_start), per_hall(fitup_finish)
+    dry = np.asarray(dryin, dtype=np.int64)[row_building]
+    is_house = house[item_idx]
+    lead_wd = lead[item_idx]
+    buffer_wd = buffer[item_idx]
+
+    # Desired ROJ: L3 start less the buffer, then >= dry-in (house) or within fitup (hall)
+    ideal = date_utils.add_workdays_array(l3, -buffer_wd, holidays, ww)
+    lo = np.where(is_house, dry, fs)
+    hi = np.where(is_house, -1, ff)
+    desired = np.where((ideal >= 0) & (lo >= 0), np.maximum(ideal, lo), ideal)
+    desired = np.where((desired >= 0) & (hi >= 0), np.minimum(desired, hi), desired)
+
+    release = np.where(lead_wd != 0, date_utils.add_workdays_array(desired, -lead_wd, holidays, ww), -1)
+    site_accept = date_utils.add_workdays_array(release, lead_wd, holidays, ww)
+
+    # House: max(desired, site acceptance) then >= dry-in; hall: >= fitup start then max with site acceptance
+    roj = np.where(~is_house & (desired >= 0) & (fs >= 0), np.maximum(desired, fs), desired)
+    roj = np.maximum(roj, site_accept)
+    roj = np.where(is_house & (roj >= 0) & (dry >= 0), np.maximum(roj, dry), roj)
+
+    status = np.where(release < 0, "On Track", np.where(
+        release < today, "Overdue", np.where(release - today <= 30, "At Risk", "On Track")
+    )).astype(object)
+
+    return {
+        "Building Name": np.asarray(names, dtype=object)[row_building],
+        "Equipment": labels,
+        "Location": np.where(is_house, "House", "Hall").astype(object),
+        "Release Needed": release,
+        "Status": status,
+        "Lead Time (weeks)": np.where(lead_wd > 0, -(-lead_wd // 5), 0),
+        "Site Acceptance": site_accept,
+        "ROJ Target": desired,
+        "ROJ": roj,
+    }
+
+
+def modeled_equipment_frame(buildings, ww, holidays, catalog=None, today=None):
+    """EQUIP_DF for all buildings: the rows of get_modeled_equipment_rows as one DataFrame."""
+    import pandas as pd
+
+    names, counts, dryin, l3, fs, ff = [], [], [], [], [], []
+    for b in buildings:
+        b_halls = b.get("halls") or []
+        names.append(b["building_name"])
+        counts.append(len(b_halls))
+        dryin.append(_ordinal(b.get("dryin_date")))
+        for h in b_halls:
+            l3.append(_ordinal(h.get("L3Start")))
+            fs.append(_ordinal(h.get("FitupStart")))
+            ff.append(_ordinal(h.get("FitupFinish")))
+
+    cols = equipment_columns(names, counts, dryin, l3, fs, ff, ww, holidays, catalog, today)
+    if not len(cols["Equipment"]):
+        return pd.DataFrame(columns=EQUIPMENT_COLUMNS)
+    for c in EQUIPMENT_DATE_COLUMNS:
+        cols[c] = dates_from_ordinals(cols[c])
+    return pd.DataFrame(cols, columns=EQUIPMENT_COLUMNS)
@@ -170,6 +170,11 @@ def inject_custom_css():
       .styled-table tr:first-child th:last-child {{border-top-right-radius: var(--border-radius);}}
       .styled-table tr:last-child td:first-child {{border-bottom-left-radius: var(--border-radius);}}
       .styled-table tr:last-child td:last-child {{border-bottom-right-radius: var(--border-radius);}}
+      .styled-table tr.release-overdue td {{ background-color: #f8d7da; }}
+      .styled-table tr.release-soon td {{ background-color: #fff3cd; }}
+      .styled-table td.status-overdue {{ color: #d62828; font-weight: 600; }}
+      .styled-table td.status-at-risk {{ color: #f4a261; font-weight: 600; }}
+      .styled-table td.status-on-track {{ color: #2a9d8f; font-weight: 600; }}
 
   
       div[data-testid='stVerticalBlockBorderWrapper']:has(>div>div>div>div>div[data-testid="stMarkdownContainer"]>.styled-slider){{
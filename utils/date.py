@@ -1,4 +1,7 @@
 from datetime import date, timedelta, datetime
+from functools import lru_cache, partial
+
+from utils.workdays import WorkdayCalendar, is_weekend
 
 # ======================= Holiday helpers (multi-country + Easter) =======================
 def easter_date(year):
@@ -126,54 +129,76 @@ def holidays_spain(year):
     hs.add(easter_date(year) - timedelta(days=2))  # Good Friday
     return hs
 
+HOLIDAY_FUNCTIONS = {
+    "United States": holidays_us,
+    "Mexico": holidays_mexico,
+    "United Kingdom": holidays_uk,
+    "Italy": holidays_italy,
+    "Spain": holidays_spain,
+}
+
+@lru_cache(maxsize=None)
+def holidays_for_year(country: str, year: int):
+    # Memoized per (country, year) for the life of the process; unknown countries use US holidays.
+    return frozenset(HOLIDAY_FUNCTIONS.get(country, holidays_us)(year))
+
 def expand_holidays(country: str, years):
     hs = set()
     for y in years:
-        if country == "United States":
-            hs |= holidays_us(y)
-        elif country == "Mexico":
-            hs |= holidays_mexico(y)
-        elif country == "United Kingdom":
-            hs |= holidays_uk(y)
-        elif country == "Italy":
-            hs |= holidays_italy(y)
-        elif country == "Spain":
-            hs |= holidays_spain(y)
-        else:
-            hs |= holidays_us(y)
+        hs |= holidays_for_year(country, y)
     return hs
 
+@lru_cache(maxsize=None)
+def calendar_for(country: str):
+    # One shared calendar per country; it loads further years of holidays on demand,
+    # so there is no fixed horizon past which schedules silently lose holidays.
+    return WorkdayCalendar(holiday_source=partial(holidays_for_year, country))
+
+def workday_calendar(holidays):
+    # Wrap a holiday set once so every add_workdays call is a table lookup.
+    if isinstance(holidays, WorkdayCalendar): return holidays
+    return WorkdayCalendar(holidays)
+
 def add_workdays(start_date, duration_days, holidays, workdays_per_week=5):
     if start_date is None or duration_days == 0: return start_date
+    if isinstance(holidays, WorkdayCalendar):
+        return holidays.add_workdays(start_date, duration_days, workdays_per_week)
     d = start_date
     step = 1 if duration_days > 0 else -1
     remaining = abs(int(duration_days))
     while remaining > 0:
         d += timedelta(days=step)
-        dow = d.weekday()
-        is_weekend = (dow == 6) or (dow == 5 and workdays_per_week == 5)
-        if is_weekend or d in holidays: continue
+        if is_weekend(d.weekday(), workdays_per_week) or d in holidays: continue
         remaining -= 1
     return d
 
+def add_workdays_array(ords, durations, holidays, workdays_per_week=5):
+    # Date ordinals (-1 = missing) shifted by per-element workday counts.
+    return workday_calendar(holidays).add_workdays_array(ords, durations, workdays_per_week)
+
 def to_date(x):
     if not x: return None
     try: return pd.to_datetime(x).date()
     except: return None
 
-def workdays_between(d1, d2, ww=5, holidays=set()):
+def workdays_between(d1, d2, ww=5, holidays=None):
     if d1 is None or d2 is None: return None
+    if isinstance(holidays, WorkdayCalendar):
+        return holidays.workdays_between(d1, d2, ww)
+    if holidays is None: holidays = ()
     days = 0
     step = 1 if d2 >= d1 else -1
     d = d1
     while d != d2:
         d += timedelta(days=step)
-        dow = d.weekday()
-        is_weekend = (dow == 6) or (dow == 5 and ww == 5)
-        if not is_weekend and d not in holidays:
+        if not is_weekend(d.weekday(), ww) and d not in holidays:
             days += 1 if step > 0 else -1
     return days
 
+def workdays_between_array(starts, finishes, ww=5, holidays=None):
+    # Whole columns at once (e.g. EQUIP_DF["Release Needed"] vs EQUIP_DF["ROJ"]); NaN where a date is missing.
+    return workday_calendar(holidays if holidays is not None else ()).workdays_between_array(starts, finishes, ww)
+
 def clamp(d, lo, hi):
     if d is None: return None
     if lo and d < lo: d = lo
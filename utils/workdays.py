@@ -0,0 +1,263 @@
+import threading
+from datetime import date, timedelta
+
+# ======================= Business-day calendar (ordinal lookup tables) =======================
+# Workday arithmetic is answered from precomputed tables instead of walking the
+# calendar one day at a time. For each weekmask we keep
+#   days[k]  -> ordinal of the k-th working day in the covered range
+#   cum[i]   -> number of working days on or before ordinal ``lo + i``
+# so "start + N workdays" is a pair of list lookups.
+#
+# Outside the covered range the tables are rebuilt over a wider window, so
+# results never depend on how far a schedule runs. A calendar created with a
+# ``holiday_source`` (year -> holidays) pulls in each new year's holidays as
+# the window grows, plus the years either side for observed dates that cross
+# a year boundary; one created from a fixed set treats years outside that
+# set as having no holidays, like the day-by-day loop does.
+#
+# NumPy is only imported by the array helpers so scalar users (the CLI) start fast.
+
+_PAD_DAYS = 366
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def is_weekend(dow, workdays_per_week=5):
+    # Sunday is always off; Saturday is off on a 5-day week.
+    return (dow == 6) or (dow == 5 and workdays_per_week == 5)
+
+
+def _weekmask(workdays_per_week):
+    return 5 if workdays_per_week == 5 else 6
+
+
+class WorkdayCalendar:
+    """Holiday set with constant-time workday arithmetic for 5- and 6-day weeks."""
+
+    def __init__(self, holidays=(), holiday_source=None):
+        self.holidays = set(holidays)
+        self._source = holiday_source
+        self._years = set()
+        if self.holidays:
+            lo = min(self.holidays).year
+            hi = max(self.holidays).year
+        else:
+            lo = hi = date.today().year
+        self._lo = date(lo, 1, 1).toordinal()
+        self._hi = date(hi, 12, 31).toordinal()
+        self._tables = {}
+        self._lock = threading.Lock()
+        self._load_years()
+
+    # ---- set-like access so the calendar can stand in for a holiday set ----
+    def __contains__(self, d):
+        return d in self.holidays
+
+    def __iter__(self):
+        return iter(self.holidays)
+
+    def __len__(self):
+        return len(self.holidays)
+
+    @property
+    def years(self):
+        return range(date.fromordinal(self._lo).year, date.fromordinal(self._hi).year + 1)
+
+    # ---- tables ----
+    def _load_years(self):
+        if self._source is None:
+            return
+        # One year either side: a holiday can be observed in the neighbouring year
+        # (New Year's Day on a Saturday is observed on Dec 31).
+        years = self.years
+        for y in range(years.start - 1, years.stop + 1):
+            if y not in self._years:
+                self.holidays |= set(self._source(y))
+                self._years.add(y)
+
+    def _build(self, mask):
+        holiday_ords = {d.toordinal() for d in self.holidays}
+        lo = self._lo
+        days, cum = [], []
+        for o in range(lo, self._hi + 1):
+            # date.fromordinal(1) is a Monday, so (o - 1) % 7 is the weekday.
+            if not (is_weekend((o - 1) % 7, mask) or o in holiday_ords):
+                days.append(o)
+            cum.append(len(days))
+        return [lo, days, cum, None]
+
+    def _ensure(self, lo, hi):
+        if lo >= self._lo and hi <= self._hi:
+            return
+        with self._lock:
+            if lo >= self._lo and hi <= self._hi:
+                return
+            if lo < self._lo:
+                self._lo = date(date.fromordinal(min(lo, self._lo - _PAD_DAYS)).year, 1, 1).toordinal()
+            if hi > self._hi:
+                self._hi = date(date.fromordinal(max(hi, self._hi + _PAD_DAYS)).year, 12, 31).toordinal()
+            self._load_years()
+            self._tables = {}
+
+    def tables(self, workdays_per_week=5):
+        # Returns [lo, days, cum, (days_array, cum_array)]; callers index with their own copy of
+        # ``lo`` so a concurrent extension never mixes two table generations.
+        mask = _weekmask(workdays_per_week)
+        table = self._tables.get(mask)
+        if table is None:
+            with self._lock:
+                table = self._tables.get(mask)
+                if table is None:
+                    table = self._build(mask)
+                    self._tables[mask] = table
+        return table
+
+    def _arrays(self, workdays_per_week=5):
+        import numpy as np
+        table = self.tables(workdays_per_week)
+        if table[3] is None:
+            table[3] = (np.asarray(table[1], dtype=np.int64), np.asarray(table[2], dtype=np.int64))
+        return (table[0],) + table[3]
+
+    def span(self, first, last, workdays_per_week=5):
+        """``(lo, days, cum)`` NumPy tables covering ordinals ``first..last``.
+
+        ``cum[o - lo]`` is the workday position of ordinal ``o`` (working days on
+        or before it) and ``days[p - 1]`` is the ordinal at position ``p``. In
+        position space, adding N >= 1 workdays is ``p + N`` and max/min commute
+        with the lookup, which is what the batched schedulers rely on.
+        """
+        while True:
+            self._ensure(first, last)
+            lo, days, cum = self._arrays(workdays_per_week)
+            if lo <= first and last < lo + len(cum):
+                return lo, days, cum
+
+    # ---- queries ----
+    def add_workdays(self, start_date, duration_days, workdays_per_week=5):
+        if start_date is None or duration_days == 0:
+            return start_date
+        n = int(duration_days)
+        if n == 0:
+            return start_date
+        s = start_date.toordinal()
+        # Keep one day of slack below ``s`` so the "before start" count is defined.
+        self._ensure(s - 1, s)
+        while True:
+            lo, days, cum, _ = self.tables(workdays_per_week)
+            if not (lo < s < lo + len(cum)):
+                self._ensure(s - 1, s)
+                continue
+            if n > 0:
+                idx = cum[s - lo] + n - 1
+                if idx < len(days):
+                    return start_date + timedelta(days=days[idx] - s)
+                self._ensure(s, lo + len(cum) + 2 * (idx - len(days) + 1) + 7)
+            else:
+                idx = cum[s - 1 - lo] + n
+                if idx >= 0:
+                    return start_date + timedelta(days=days[idx] - s)
+                self._ensure(lo + 2 * idx - 7, s)
+
+    def ordinal_adder(self, workdays_per_week=5):
+        """``add(ordinal, n)``: add_workdays on date ordinals, for tight scalar loops.
+
+        Lookups go straight to the current tables; ordinals or results outside
+        them fall back to add_workdays, which widens the tables.
+        """
+        lo, days, cum, _ = self.tables(workdays_per_week)
+        hi, count = lo + len(cum) - 1, len(days)
+
+        def add(o, n):
+            if lo < o <= hi:
+                if n > 0:
+                    idx = cum[o - lo] + n - 1
+                    if idx < count:
+                        return days[idx]
+                elif n < 0:
+                    idx = cum[o - 1 - lo] + n
+                    if idx >= 0:
+                        return days[idx]
+                else:
+                    return o
+            return self.add_workdays(date.fromordinal(o), n, workdays_per_week).toordinal()
+        return add
+
+    def add_workdays_array(self, ords, durations, workdays_per_week=5):
+        """Vector form of ``add_workdays`` on date ordinals; -1 marks a missing date and stays -1."""
+        import numpy as np
+        ords, n = np.broadcast_arrays(np.asarray(ords, dtype=np.int64), np.asarray(durations, dtype=np.int64))
+        out = ords.copy()
+        move = (ords >= 0) & (n != 0)
+        if not move.any():
+            return out
+        s, n = ords[move], n[move]
+        # Two calendar days per workday plus a week is ample; widen and retry otherwise.
+        first = int(s.min()) - 1 - 2 * max(0, -int(n.min())) - 7
+        last = int(s.max()) + 2 * max(0, int(n.max())) + 7
+        while True:
+            lo, days, cum = self.span(first, last, workdays_per_week)
+            idx = np.where(n > 0, cum[s - lo] + n - 1, cum[s - 1 - lo] + n)
+            if idx.min() >= 0 and idx.max() < len(days):
+                out[move] = days[idx]
+                return out
+            first -= _PAD_DAYS
+            last += _PAD_DAYS
+
+    def workdays_between(self, d1, d2, workdays_per_week=5):
+        # Workdays in (d1, d2] when d2 >= d1, otherwise minus the workdays in [d2, d1).
+        if d1 is None or d2 is None:
+            return None
+        o1, o2 = d1.toordinal(), d2.toordinal()
+        first, last = min(o1, o2) - 1, max(o1, o2)
+        while True:
+            self._ensure(first, last)
+            lo, _, cum, _ = self.tables(workdays_per_week)
+            if lo <= first and last < lo + len(cum):
+                break
+        if o2 >= o1:
+            return cum[o2 - lo] - cum[o1 - lo]
+        return cum[o2 - 1 - lo] - cum[o1 - 1 - lo]
+
+    def workdays_between_array(self, starts, finishes, workdays_per_week=5):
+        """Vector form of ``workdays_between``; missing dates give NaN."""
+        import numpy as np
+        o1 = _to_ordinals(starts)
+        o2 = _to_ordinals(finishes)
+        out = np.full(np.broadcast(o1, o2).shape, np.nan)
+        valid = (o1 >= 0) & (o2 >= 0)
+        if not valid.any():
+            return out
+        o1, o2 = np.broadcast_arrays(o1, o2)
+        a, b = o1[valid], o2[valid]
+        first = int(min(a.min(), b.min())) - 1
+        last = int(max(a.max(), b.max()))
+        lo, _, cum = self.span(first, last, workdays_per_week)
+        shift = np.where(b >= a, 0, 1) + lo
+        out[valid] = cum[b - shift] - cum[a - shift]
+        return out
+
+
+def _to_ordinals(values):
+    # date/datetime/Timestamp/datetime64 columns -> proleptic ordinals, -1 where missing
+    import numpy as np
+    arr = np.asarray(values, dtype="datetime64[D]")
+    ords = arr.astype(np.int64) + _EPOCH_ORDINAL
+    return np.where(np.isnat(arr), -1, ords)
+
+
+def dates_from_ordinals(ords):
+    # Ordinals (-1 = missing) -> object array of date/None, converting each distinct value once
+    import numpy as np
+    uniq, inverse = np.unique(np.asarray(ords), return_inverse=True)
+    values = np.empty(len(uniq), dtype=object)
+    values[:] = [date.fromordinal(int(o)) if o > 0 else None for o in uniq]
+    return values[inverse.reshape(-1)]
+
+
+def datetimes_from_ordinals(ords):
+    # Ordinals (-1 = missing) -> datetime64[s] array with NaT for missing dates
+    import numpy as np
+    ords = np.asarray(ords, dtype=np.int64)
+    out = (ords - _EPOCH_ORDINAL).astype("datetime64[D]")
+    out[ords < 0] = np.datetime64("NaT")
+    return out.astype("datetime64[s]")